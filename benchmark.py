@@ -0,0 +1,278 @@
+#! /usr/bin/env python3
+"""Benchmark measuring how fast cutie handles keypresses for long lists.
+
+The prompts are driven with scripted keypresses and write to a sink that only
+counts what it receives. The timings can be saved and later runs compared to
+them, failing if any got slower than the tolerance allows.
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import readchar
+
+import cutie
+
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# Differences below this many milliseconds are noise, not regressions
+NOISE_MS = 0.01
+
+
+class CountingOutput(io.TextIOBase):
+    """Output stream counting what it receives and discarding it.
+
+    It claims to be a terminal, so cutie writes to it like to one.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.write_count = 0
+        self.byte_count = 0
+        self.frame_count = 0
+
+    def write(self, text):
+        self.write_count += 1
+        self.byte_count += len(text.encode())
+        return len(text)
+
+    def flush(self):
+        # Every frame is flushed once
+        self.frame_count += 1
+
+    def isatty(self):
+        return True
+
+
+class ScriptedKeys:
+    """Context manager feeding keypresses to cutie and timing them.
+
+    Like `InputContext` in the tests it replaces `readchar.readkey`. It also
+    replaces stdin, so keys are not read from a terminal, and stdout. The
+    prompts are shown although stdin is no terminal.
+    """
+
+    def __init__(self, keys: List[str]):
+        self.keys = iter(keys)
+        self.output = CountingOutput()
+        self.times: List[float] = []
+
+    def readkey(self) -> str:
+        self.times.append(time.perf_counter())
+        return next(self.keys)
+
+    def __enter__(self) -> "ScriptedKeys":
+        self.readkey_before = readchar.readkey
+        self.streams_before = sys.stdin, sys.stdout
+        readchar.readkey = self.readkey
+        sys.stdin, sys.stdout = io.StringIO(), self.output
+        self.headless_before = os.environ.get("CUTIE_HEADLESS")
+        os.environ["CUTIE_HEADLESS"] = "0"
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.end = time.perf_counter()
+        readchar.readkey = self.readkey_before
+        sys.stdin, sys.stdout = self.streams_before
+        if self.headless_before is None:
+            del os.environ["CUTIE_HEADLESS"]
+        else:
+            os.environ["CUTIE_HEADLESS"] = self.headless_before
+
+
+def measure(name: str, run: Callable[[], object], keys: List[str]) -> Dict[str, float]:
+    """Run a prompt with scripted keys and print its row of the report.
+
+    Args:
+        name (str): The name of the row.
+        run (Callable[[], object]): Runs the prompt.
+        keys (List[str]): The keys to press.
+
+    Returns:
+        Dict[str, float]: The milliseconds until the first frame and per key.
+    """
+    with ScriptedKeys(keys) as script:
+        run()
+    output = script.output
+    first_frame = script.times[0] - script.start
+    per_key = (script.end - script.times[0]) / len(keys)
+    frames = max(output.frame_count, 1)
+    print(
+        f"{name:<28} {first_frame * 1000:>10.2f} {per_key * 1000:>10.3f}"
+        f" {output.byte_count / frames:>10.1f} {output.write_count / frames:>7.2f}"
+    )
+    return {"first ms": first_frame * 1000, "ms/key": per_key * 1000}
+
+
+def measure_core(
+    name: str, prompt: Callable, keys: List[str], **kwargs
+) -> Dict[str, float]:
+    """Apply keys to the core of a prompt without drawing and print its row.
+
+    Args:
+        name (str): The name of the row.
+        prompt (Callable): The prompt.
+        keys (List[str]): The keys to apply.
+        **kwargs: The arguments of the prompt.
+
+    Returns:
+        Dict[str, float]: The milliseconds per key.
+    """
+    core = cutie.prompt_core(prompt, **kwargs)
+    state = core.reduce(core.state, os.terminal_size((80, 24)))
+    start = time.perf_counter()
+    for key in keys:
+        state = core.reduce(state, key)
+    per_key = (time.perf_counter() - start) / len(keys)
+    print(f"{name:<28} {'':>10} {per_key * 1000:>10.4f}")
+    return {"ms/key": per_key * 1000}
+
+
+def measure_import(runs: int) -> Dict[str, float]:
+    """Time importing cutie in fresh interpreters and print the fastest run.
+
+    Args:
+        runs (int): The number of interpreters started.
+
+    Returns:
+        Dict[str, float]: The milliseconds of the fastest import.
+    """
+    code = (
+        "import time; start = time.perf_counter(); import cutie; "
+        "print(time.perf_counter() - start)"
+    )
+    times = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                stdout=subprocess.PIPE,
+                check=True,
+                universal_newlines=True,
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+    print(f"{'import cutie':<28} {min(times) * 1000:>10.2f}")
+    return {"first ms": min(times) * 1000}
+
+
+def regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+) -> List[str]:
+    """Compare timings to those of an earlier run.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): The timings of every row.
+        baseline (Dict[str, Dict[str, float]]): The timings of the earlier run.
+        tolerance (float): The factor by which timings may grow.
+
+    Returns:
+        List[str]: A description of every timing that got too slow.
+    """
+    slower = []
+    for name, timings in results.items():
+        for column, value in timings.items():
+            before = baseline.get(name, {}).get(column)
+            if before is None:
+                continue
+            if value > before * tolerance and value - before > NOISE_MS:
+                slower.append(f"{name} {column}: {before:.4f} -> {value:.4f}")
+    return slower
+
+
+def main():
+    """Main."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="numbers of options"
+    )
+    parser.add_argument(
+        "--keys", type=int, default=100, help="cursor movements per prompt"
+    )
+    parser.add_argument(
+        "--height", type=int, default=24, help="lines available to the options"
+    )
+    parser.add_argument(
+        "--import-runs", type=int, default=10, help="interpreters timing the import"
+    )
+    parser.add_argument("--save", metavar="FILE", help="save the timings as JSON")
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="fail if timings got slower than those saved in FILE",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="factor by which compared timings may grow",
+    )
+    arguments = parser.parse_args()
+    results = {}
+    moves = arguments.keys
+    print(
+        f"{'prompt':<28} {'first ms':>10} {'ms/key':>10} {'bytes/frm':>10}"
+        f" {'wr/frm':>7}"
+    )
+    results["import cutie"] = measure_import(arguments.import_runs)
+    for size in arguments.sizes:
+        options = [f"Option {i}" for i in range(size)]
+        results[f"select {size}"] = measure(
+            f"select {size}",
+            lambda: cutie.select(options, max_height=arguments.height),
+            [readchar.key.DOWN] * moves + [readchar.key.ENTER],
+        )
+        results[f"select_multiple {size}"] = measure(
+            f"select_multiple {size}",
+            lambda: cutie.select_multiple(options, max_height=arguments.height),
+            [readchar.key.DOWN, " "] * (moves // 2) + [readchar.key.ENTER],
+        )
+        results[f"select filtered {size}"] = measure(
+            f"select filtered {size}",
+            lambda: cutie.select(options, max_height=arguments.height, filterable=True),
+            list("op99") + [readchar.key.BACKSPACE] * 4 + [readchar.key.ENTER],
+        )
+        # Every option contains the query, so no key narrows the matches
+        results[f"select filter kept {size}"] = measure(
+            f"select filter kept {size}",
+            lambda: cutie.select(options, max_height=arguments.height, filterable=True),
+            list("option") + [readchar.key.ENTER],
+        )
+        results[f"select core {size}"] = measure_core(
+            f"select core {size}",
+            cutie.select,
+            [readchar.key.DOWN] * moves,
+            options=options,
+            max_height=arguments.height,
+        )
+    results["prompt_yes_or_no"] = measure(
+        "prompt_yes_or_no",
+        lambda: cutie.prompt_yes_or_no("Continue?"),
+        [readchar.key.DOWN, readchar.key.UP] * (moves // 2) + [readchar.key.ENTER],
+    )
+    if arguments.save:
+        with open(arguments.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if arguments.compare:
+        if not os.path.exists(arguments.compare):
+            print(f"No timings saved in {arguments.compare} to compare to")
+            return
+        with open(arguments.compare) as file:
+            slower = regressions(results, json.load(file), arguments.tolerance)
+        for regression in slower:
+            print(f"Slower: {regression}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,33 +8,2885 @@ __author__ = "Hans / Kamik423"
 __license__ = "MIT"
 
 
+import bisect
+import codecs
+import collections
+import contextlib
+import functools
 import getpass
-from typing import List, Optional
+import itertools
+import os
+import select as _select
+import shutil
+import signal
+import sys
+import time
+import types
+import unicodedata
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-import readchar
-from colorama import init
+try:
+    import termios
+except ImportError:  # Windows
+    termios = None  # type: ignore
 
-init()
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None  # type: ignore
+
+if TYPE_CHECKING:
+    # Imported where used otherwise, as the import takes a while
+    from concurrent import futures
+
+_T = TypeVar("_T")
+
+# The lines of a prompt and the line the cursor is on, if any
+_Frame = Tuple[List[str], Optional[int]]
+
+# What the reducer of a prompt applies: a keypress or the size of the
+# terminal to lay the prompt out for
+_Event = Union[str, os.terminal_size]
+
+
+# Most programs importing cutie only show a prompt some of the time. Modules
+# that take long to load, like readchar, colorama and asyncio, are imported
+# by the functions using them instead.
+_ansi_enabled = False
+
+
+def _enable_ansi() -> None:
+    """Make sure ANSI escape codes work before the first prompt is shown.
+
+    colorama translates them on Windows and strips them from output that is
+    not a terminal. Terminals on other systems understand them, so stdout is
+    left as it is there.
+    """
+    global _ansi_enabled
+    if _ansi_enabled:
+        return
+    _ansi_enabled = True
+    if os.name != "nt" and sys.stdout.isatty():
+        return
+    import colorama
+
+    colorama.init()
+
+
+class _ReadcharKeys:
+    """A key list of DefaultKeys that is built from readchar on first use.
+
+    The list then replaces this descriptor in the class, so it can be changed
+    like any other class attribute.
+    """
+
+    def __init__(self, keys: Callable[[types.ModuleType], List[str]]) -> None:
+        """Describe the key list.
+
+        Args:
+            keys (Callable[[types.ModuleType], List[str]]): Gets the keys
+                from the readchar.key module.
+        """
+        self._keys = keys
+        self._name = ""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+
+    def __get__(self, instance: object, owner: type) -> List[str]:
+        import readchar
+
+        keys = self._keys(readchar.key)
+        setattr(owner, self._name, keys)
+        return keys
 
 
 class DefaultKeys:
     """List of default keybindings.
 
     Attributes:
-        interrupt(List[str]): Keys that cause a keyboard interrupt.
-        select(List[str]): Keys that trigger list element selection.
-        confirm(List[str]): Keys that trigger list confirmation.
-        delete(List[str]): Keys that trigger character deletion.
-        down(List[str]): Keys that select the element below.
-        up(List[str]): Keys that select the element above.
+        interrupt(List[str]): Keys that cause a keyboard interrupt.
+        select(List[str]): Keys that trigger list element selection.
+        confirm(List[str]): Keys that trigger list confirmation.
+        delete(List[str]): Keys that trigger character deletion.
+        down(List[str]): Keys that select the element below.
+        up(List[str]): Keys that select the element above.
+        first(List[str]): Keys that select the first element.
+        last(List[str]): Keys that select the last element.
+        page_down(List[str]): Keys that select the element a page below.
+        page_up(List[str]): Keys that select the element a page above.
+        expand(List[str]): Keys that expand the node of a tree.
+        collapse(List[str]): Keys that collapse the node of a tree.
+        tick_all(List[str]): Keys that tick all options shown.
+        untick_all(List[str]): Keys that untick all options shown.
+        invert(List[str]): Keys that invert which options shown are ticked.
+        tick_group(List[str]): Keys that tick or untick the options between
+            the captions around the cursor.
+        range_down(List[str]): Keys that select the element below, ticking
+            the options from where the range started.
+        range_up(List[str]): Keys that select the element above, ticking
+            the options from where the range started.
+    """
+
+    interrupt: List[str] = _ReadcharKeys(  # type: ignore
+        lambda key: [key.CTRL_C, key.CTRL_D]
+    )
+    select: List[str] = _ReadcharKeys(lambda key: [key.SPACE])  # type: ignore
+    confirm: List[str] = _ReadcharKeys(lambda key: [key.ENTER])  # type: ignore
+    delete: List[str] = _ReadcharKeys(lambda key: [key.BACKSPACE])  # type: ignore
+    down: List[str] = _ReadcharKeys(lambda key: [key.DOWN, "j"])  # type: ignore
+    up: List[str] = _ReadcharKeys(lambda key: [key.UP, "k"])  # type: ignore
+    first: List[str] = _ReadcharKeys(lambda key: [key.HOME])  # type: ignore
+    last: List[str] = _ReadcharKeys(lambda key: [key.END])  # type: ignore
+    page_down: List[str] = _ReadcharKeys(lambda key: [key.PAGE_DOWN])  # type: ignore
+    page_up: List[str] = _ReadcharKeys(lambda key: [key.PAGE_UP])  # type: ignore
+    expand: List[str] = _ReadcharKeys(lambda key: [key.RIGHT, "l"])  # type: ignore
+    collapse: List[str] = _ReadcharKeys(lambda key: [key.LEFT, "h"])  # type: ignore
+    tick_all: List[str] = _ReadcharKeys(lambda key: [key.CTRL_A])  # type: ignore
+    untick_all: List[str] = _ReadcharKeys(lambda key: [key.CTRL_U])  # type: ignore
+    invert: List[str] = _ReadcharKeys(lambda key: [key.CTRL_R])  # type: ignore
+    tick_group: List[str] = _ReadcharKeys(lambda key: [key.CTRL_G])  # type: ignore
+    # Shift and the arrow keys
+    range_down: List[str] = ["\033[1;2B"]
+    range_up: List[str] = ["\033[1;2A"]
+
+
+class Keymap:
+    """Key bindings of a prompt, compiled into a dict from key to action.
+
+    The actions are named after the attributes of DefaultKeys, which also
+    provides the keys of the actions that are not bound. Looking up the action
+    of a key takes the same time no matter how many keys are bound.
+    """
+
+    actions = (
+        "interrupt",
+        "confirm",
+        "select",
+        "delete",
+        "down",
+        "up",
+        "first",
+        "last",
+        "page_down",
+        "page_up",
+        "expand",
+        "collapse",
+        "tick_all",
+        "untick_all",
+        "invert",
+        "tick_group",
+        "range_down",
+        "range_up",
+    )
+
+    def __init__(self, **bindings: Iterable[str]) -> None:
+        """Compile key bindings.
+
+        Args:
+            **bindings (Iterable[str]): The keys of each action to bind.
+
+        Raises:
+            ValueError: If an action does not exist.
+        """
+        unknown_actions = set(bindings) - set(self.actions)
+        if unknown_actions:
+            raise ValueError(f"Unknown actions: {', '.join(sorted(unknown_actions))}")
+        self._actions: Dict[str, str] = {}
+        # Keys bound here take precedence over the defaults of other actions.
+        # A key bound to several actions triggers the first one.
+        for action in self.actions:
+            for key in bindings.get(action, ()):
+                self._actions.setdefault(key, action)
+        for action in self.actions:
+            if action not in bindings:
+                for key in getattr(DefaultKeys, action):
+                    self._actions.setdefault(key, action)
+
+    def action(self, key: str) -> Optional[str]:
+        """Get the action a key is bound to.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            str, optional: The action or None if the key is not bound.
+        """
+        return self._actions.get(key)
+
+
+class FrameStats(NamedTuple):
+    """Statistics about a frame drawn by a prompt.
+
+    Attributes:
+        prompt (str): The name of the prompt.
+        render_time (float): Seconds spent drawing the frame.
+        bytes (int): The number of bytes written to the terminal.
+        latency (float): Seconds from the first key applied in the frame to
+            the end of drawing it. For the first frame of a prompt this is
+            measured from the start of the prompt.
+        keys (int): The number of keys applied since the last frame.
+    """
+
+    prompt: str
+    render_time: float
+    bytes: int
+    latency: float
+    keys: int
+
+
+class LazyOptions:
+    """Options that are only fetched once they are displayed.
+
+    Options are fetched a page at a time and cached, so a prompt can be shown
+    before all options are known.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[int, int], List[str]],
+        length: Optional[int] = None,
+        page_size: int = 100,
+    ) -> None:
+        """Create lazily loaded options.
+
+        Args:
+            fetch (Callable[[int, int], List[str]]): Called with an offset and
+                a limit, returns up to `limit` options starting at `offset`.
+                Returning fewer options marks the end of the options.
+            length (int, optional): The number of options if it is known.
+                Pages can then be fetched in any order.
+            page_size (int, optional): The number of options fetched at once.
+        """
+        self._fetch = fetch
+        self._length = length
+        self._page_size = page_size
+        self._pages: Dict[int, List[str]] = {}
+        self._loaded_count = 0
+
+    @classmethod
+    def from_iterable(
+        cls, iterable: Iterable[str], page_size: int = 100
+    ) -> "LazyOptions":
+        """Create options that are taken from an iterable as needed.
+
+        Args:
+            iterable (Iterable[str]): The options.
+            page_size (int, optional): The number of options taken at once.
+
+        Returns:
+            LazyOptions: The options.
+        """
+        iterator = iter(iterable)
+        return cls(
+            lambda offset, limit: list(itertools.islice(iterator, limit)),
+            page_size=page_size,
+        )
+
+    @property
+    def complete(self) -> bool:
+        """bool: Whether the number of options is known."""
+        return self._length is not None
+
+    def load(self, count: int) -> int:
+        """Fetch pages until at least `count` options are known.
+
+        Args:
+            count (int): The number of options needed.
+
+        Returns:
+            int: The number of options known.
+        """
+        while self._length is None and self._loaded_count < count:
+            page = list(self._fetch(self._loaded_count, self._page_size))
+            self._pages[self._loaded_count // self._page_size] = page
+            self._loaded_count += len(page)
+            if len(page) < self._page_size:
+                self._length = self._loaded_count
+        return self._loaded_count if self._length is None else self._length
+
+    def __getitem__(self, index: int) -> str:
+        page_index, page_offset = divmod(index, self._page_size)
+        if page_index not in self._pages:
+            if self._length is None:
+                self.load(index + 1)
+                if page_index not in self._pages:
+                    raise IndexError("option index out of range")
+            else:
+                offset = page_index * self._page_size
+                limit = min(self._page_size, self._length - offset)
+                self._pages[page_index] = list(self._fetch(offset, limit))
+        return self._pages[page_index][page_offset]
+
+
+_OptionSource = Union[
+    List[str], LazyOptions, Iterable[str], Callable[[int, int], List[str]]
+]
+
+
+def _as_options(options: _OptionSource) -> Union[Sequence[str], LazyOptions]:
+    """Wrap lazy option sources in LazyOptions.
+
+    Args:
+        options (List[str] | LazyOptions | Iterable[str] | Callable): The
+            options, an iterable of them or a page fetcher as taken by
+            LazyOptions.
+
+    Returns:
+        Sequence[str] | LazyOptions: Options supporting access by index.
+    """
+    if isinstance(options, (Sequence, LazyOptions)):
+        return options
+    if callable(options):
+        return LazyOptions(options)
+    return LazyOptions.from_iterable(options)
+
+
+# The size of the terminal while prompts run, None until it is looked up
+_terminal_size: Optional[os.terminal_size] = None
+_terminal_size_users = 0
+
+
+def _get_terminal_size() -> os.terminal_size:
+    """Get the size of the terminal.
+
+    While a prompt runs, the size is looked up once and then only again after
+    the terminal reported being resized, so frames are laid out and drawn
+    without asking the terminal.
+
+    Returns:
+        os.terminal_size: The size.
+    """
+    global _terminal_size
+    if not _terminal_size_users:
+        return shutil.get_terminal_size()
+    if _terminal_size is None:
+        _terminal_size = shutil.get_terminal_size()
+    return _terminal_size
+
+
+def _forget_terminal_size() -> None:
+    """Look the size of the terminal up again the next time it is needed."""
+    global _terminal_size
+    _terminal_size = None
+
+
+@contextlib.contextmanager
+def _terminal_size_cached() -> Iterator[None]:
+    """Cache the size of the terminal for the duration.
+
+    Yields:
+        None: While the size is cached.
+    """
+    global _terminal_size_users
+    if not _terminal_size_users:
+        _forget_terminal_size()
+    _terminal_size_users += 1
+    try:
+        yield
+    finally:
+        _terminal_size_users -= 1
+
+
+class _TerminalResized(Exception):
+    """Raised by key readers when the terminal is resized while waiting."""
+
+
+def _available_lines(max_height: Optional[int], size: os.terminal_size) -> int:
+    """Get the number of lines the options of a prompt may occupy.
+
+    Args:
+        max_height (int, optional): The maximal number of lines.
+            Defaults to the terminal height minus the line of the question
+            printed before the prompt and the line below the options, which
+            the cursor rests on or select_multiple confirms on.
+        size (os.terminal_size): The size of the terminal.
+
+    Returns:
+        int: The number of lines.
+    """
+    if max_height is None:
+        return size.lines - 2
+    return max_height
+
+
+def _viewport_height(option_count: int, max_height: int) -> int:
+    """Get the number of options that can be shown at once.
+
+    Args:
+        option_count (int): The total number of options.
+        max_height (int): The number of lines available for the options.
+
+    Returns:
+        int: The number of options visible in the viewport.
+    """
+    if option_count <= max_height:
+        return option_count
+    # Two lines are reserved for the scroll indicators
+    return max(max_height - 2, 1)
+
+
+def _scroll_viewport(
+    top: int, cursor_index: int, height: int, option_count: int
+) -> int:
+    """Move the viewport so the cursor stays visible.
+
+    Args:
+        top (int): The index of the first visible option.
+        cursor_index (int): The index of the cursor.
+        height (int): The number of visible options.
+        option_count (int): The total number of options.
+
+    Returns:
+        int: The index of the first visible option.
+    """
+    cursor_index = min(cursor_index, option_count - 1)
+    if cursor_index < top:
+        return cursor_index
+    if cursor_index >= top + height:
+        return cursor_index - height + 1
+    return top
+
+
+def _scroll_indicator(hidden_count: Optional[int], arrow: str) -> str:
+    """Get the line showing how many options are scrolled out of view.
+
+    Args:
+        hidden_count (int, optional): The number of options out of view.
+            None if that is not known yet.
+        arrow (str): The symbol pointing in the direction of those options.
+
+    Returns:
+        str: The line to print.
+    """
+    if hidden_count is None:
+        return f"\033[2m  {arrow} more\033[0m"
+    if hidden_count <= 0:
+        return ""
+    return f"\033[2m  {arrow} {hidden_count} more\033[0m"
+
+
+def _hidden_below(source: "_Options", index: int) -> Optional[int]:
+    """Get the number of options after an index.
+
+    Args:
+        source (_Options): The options.
+        index (int): The index after the last visible option.
+
+    Returns:
+        int, optional: The number of options or None if it is not known yet.
+    """
+    return source.count - index if source.complete else None
+
+
+def _move_to_line(line: int, current_line: int) -> str:
+    """Get the escape sequence moving the cursor to the start of a line.
+
+    Args:
+        line (int): The line to move to.
+        current_line (int): The line the cursor is on.
+
+    Returns:
+        str: The escape sequence.
+    """
+    if line < current_line:
+        return f"\033[{current_line - line}A\r"
+    if line > current_line:
+        return f"\033[{line - current_line}B\r"
+    return "\r"
+
+
+class _Navigation:
+    """Lookup tables of the neighbouring selectable index of every index.
+
+    They are built once per prompt, so moving the cursor takes constant time no
+    matter how many captions have to be skipped. They can be extended when
+    more indices become available.
+    """
+
+    def __init__(self, count: int, captions: Set[int]) -> None:
+        """Build the lookup tables.
+
+        Args:
+            count (int): The number of indices the cursor can move between.
+            captions (Set[int]): Non-selectable indices.
+        """
+        self._captions = captions
+        self._count = 0
+        self._last_selectable: Optional[int] = None
+        # The entry at `count` is used for cursors placed after the last index
+        self._previous = array("l", [0])
+        self._next = array("l", [0])
+        self.extend(count)
+
+    def extend(self, count: int) -> None:
+        """Add the indices up to a new count.
+
+        Only the entries that are affected by the new indices are computed.
+
+        Args:
+            count (int): The new number of indices.
+        """
+        old_count = self._count
+        if count <= old_count:
+            return
+        self._previous.extend(range(old_count + 1, count + 1))
+        self._next.extend(range(old_count + 1, count + 1))
+        self._count = count
+        old_last_selectable = self._last_selectable
+        selectable = old_last_selectable
+        for i in range(old_count, count + 1):
+            self._previous[i] = i if selectable is None else selectable
+            if i < count and i not in self._captions:
+                selectable = i
+        self._last_selectable = selectable
+        # Indices after the previously last selectable index had no next one
+        selectable = None
+        stop = 0 if old_last_selectable is None else old_last_selectable
+        for i in reversed(range(stop, count)):
+            self._next[i] = i if selectable is None else selectable
+            if i not in self._captions:
+                selectable = i
+
+    def previous(self, index: int) -> int:
+        """Get the selectable index above an index.
+
+        Args:
+            index (int): The index to start from.
+
+        Returns:
+            int: The selectable index above or `index` if there is none.
+        """
+        clamped_index = min(index, self._count)
+        new_index = self._previous[clamped_index]
+        return index if new_index == clamped_index else new_index
+
+    def next(self, index: int) -> int:
+        """Get the selectable index below an index.
+
+        Args:
+            index (int): The index to start from.
+
+        Returns:
+            int: The selectable index below or `index` if there is none.
+        """
+        if index >= self._count:
+            return index
+        return self._next[index]
+
+
+class _Options:
+    """Uniform access to the options of a prompt, loading lazy ones as needed.
+
+    Attributes:
+        count (int): The number of options known so far.
+        complete (bool): Whether all options are known.
+    """
+
+    def __init__(
+        self,
+        options: Union[Sequence[str], LazyOptions],
+        captions: Set[int],
+        has_confirm: bool = False,
+    ) -> None:
+        """Wrap the options.
+
+        Args:
+            options (Sequence[str] | LazyOptions): The options.
+            captions (Set[int]): Non-selectable indices.
+            has_confirm (bool, optional): Whether the cursor can move to a
+                confirm button after the last option.
+        """
+        self._options = options
+        self._captions = captions
+        self._has_confirm = has_confirm
+        if isinstance(options, LazyOptions):
+            self.count = options.load(0)
+            self.complete = options.complete
+        else:
+            self.count = len(options)
+            self.complete = True
+        self._navigation = _Navigation(self._navigation_count(), captions)
+
+    def _navigation_count(self) -> int:
+        """Get the number of indices the cursor can currently move between.
+
+        Returns:
+            int: The number of indices.
+        """
+        return self.count + (1 if self._has_confirm and self.complete else 0)
+
+    def load(self, count: int) -> None:
+        """Make sure at least `count` options are known if there are as many.
+
+        Args:
+            count (int): The number of options needed.
+        """
+        if self.complete or count <= self.count:
+            return
+        # Only lazy options can be incomplete
+        options = self._options
+        assert isinstance(options, LazyOptions)
+        self.count = options.load(count)
+        self.complete = options.complete
+        self._navigation.extend(self._navigation_count())
+
+    def __getitem__(self, index: int) -> str:
+        return self._options[index]
+
+    def previous(self, index: int) -> int:
+        """Get the selectable index above an index.
+
+        Args:
+            index (int): The index to start from.
+
+        Returns:
+            int: The selectable index above or `index` if there is none.
+        """
+        return self._navigation.previous(index)
+
+    def next(self, index: int) -> int:
+        """Get the selectable index below an index, loading more if needed.
+
+        Args:
+            index (int): The index to start from.
+
+        Returns:
+            int: The selectable index below or `index` if there is none.
+        """
+        new_index = self._navigation.next(index)
+        while new_index == index and not self.complete:
+            self.load(self.count + 1)
+            new_index = self._navigation.next(index)
+        return new_index
+
+    def first(self) -> int:
+        """Get the first selectable index.
+
+        Returns:
+            int: The index.
+        """
+        return self.next(0) if 0 in self._captions else 0
+
+    def last(self) -> int:
+        """Get the last selectable index, loading all options.
+
+        Returns:
+            int: The index, which is the confirm button if there is one.
+        """
+        self.load(sys.maxsize)
+        count = self._navigation_count()
+        index = self._navigation.previous(count)
+        return index if index < count else self.first()
+
+
+class _Filter:
+    """Incremental fuzzy filter over the options of a prompt.
+
+    An option matches if it contains the characters of the query in order,
+    ignoring case. The case folded options are indexed as one bit per
+    character of their text joined by separators, with a mask of the
+    positions of every character typed. Every match keeps a bit at the
+    position after its last matched character. Adding a character then
+    carries all these bits forward to the next occurrence of the character
+    with a single addition of big integers, as a carry stops at the first
+    bit of the mask. Matches whose bit is carried to their separator drop
+    out. A character that does not narrow the matches thus costs a few
+    operations on integers of a bit per character of the options, instead
+    of a search in every match. The matches of all shorter queries are
+    kept, which makes deleting characters free.
+
+    Attributes:
+        query (str): The characters typed so far.
+    """
+
+    def __init__(self, source: _Options, captions: Set[int]) -> None:
+        """Prepare filtering the options. They are only read once typed into.
+
+        Args:
+            source (_Options): The options.
+            captions (Set[int]): Non-selectable indices, which never match.
+        """
+        self._source = source
+        self._captions = captions
+        self._text = ""
+        # The positions of the separators after the options and their mask
+        self._separators: List[int] = []
+        self._separator_mask = 0
+        self._masks: Dict[str, int] = {}
+        # Translates every character of the text to NUL
+        self._blank: Dict[int, str] = {}
+        # All selectable indices and the bits at the start of their text
+        self._start: Optional[Tuple[List[int], int]] = None
+        # The matching indices and the bits after their last matched
+        # character for every prefix of the query
+        self._results: List[Tuple[List[int], int]] = []
+        self.query = ""
+
+    @property
+    def matches(self) -> Optional[List[int]]:
+        """The matching indices in order or None if the query is empty."""
+        return self._results[-1][0] if self._results else None
+
+    def _index(self) -> Tuple[List[int], int]:
+        """Load all options and index their case folded text, only once.
+
+        Returns:
+            Tuple[List[int], int]: All selectable indices and the bits at the
+                start of their text.
+        """
+        if self._start is not None:
+            return self._start
+        self._source.load(sys.maxsize)
+        texts = [self._source[i].lower() for i in range(self._source.count)]
+        text = "\0".join(texts)
+        if text.count("\0") >= len(texts):
+            # NUL separates the options and is never typed
+            texts = [text.replace("\0", "") for text in texts]
+            text = "\0".join(texts)
+        self._text = text + "\0"
+        self._blank = dict.fromkeys(map(ord, set(self._text)), "\0")
+        self._separators = [
+            end + i for i, end in enumerate(itertools.accumulate(map(len, texts)))
+        ]
+        self._separator_mask = self._positions("\0")
+        starts = (self._separator_mask << 1 | 1) & ((1 << len(self._text)) - 1)
+        captions = [i for i in self._captions if i < len(texts)]
+        if captions:
+            flags = bytearray(len(self._text))
+            for i in captions:
+                flags[self._separators[i] - len(texts[i])] = 1
+            starts ^= _bit_mask(bytes(flags))
+        indices = [i for i in range(len(texts)) if i not in self._captions]
+        self._start = indices, starts
+        return self._start
+
+    def _positions(self, character: str) -> int:
+        """Get the positions of a character in the text.
+
+        Args:
+            character (str): The character.
+
+        Returns:
+            int: The mask with a bit at every position.
+        """
+        table = dict(self._blank)
+        table[ord(character)] = "\1"
+        return _bit_mask(self._text.translate(table).encode("latin-1"))
+
+    def _mask(self, character: str) -> int:
+        """Get the positions of a character or a separator, once per character.
+
+        Args:
+            character (str): The case folded character.
+
+        Returns:
+            int: The mask with a bit at every position.
+        """
+        mask = self._masks.get(character)
+        if mask is None:
+            mask = self._positions(character) | self._separator_mask
+            self._masks[character] = mask
+        return mask
+
+    def push(self, character: str) -> None:
+        """Add a character to the query, narrowing down the matches.
+
+        Args:
+            character (str): The character typed.
+        """
+        indices, ends = self._results[-1] if self._results else self._index()
+        everything = (1 << len(self._text)) - 1
+        for needle in character.lower():
+            mask = self._mask(needle)
+            carried = (everything ^ mask) + ends
+            dropped = carried & self._separator_mask
+            if dropped:
+                flags = dropped.to_bytes(len(self._text) // 8 + 1, "little")
+                separators = self._separators
+                indices = [
+                    index
+                    for index in indices
+                    if not flags[separators[index] >> 3] >> (separators[index] & 7) & 1
+                ]
+            ends = (carried & mask ^ dropped) << 1
+        self._results.append((indices, ends))
+        self.query += character
+
+    def pop(self) -> None:
+        """Remove the last character of the query, if any."""
+        if self._results:
+            self._results.pop()
+            self.query = self.query[:-1]
+
+
+def _bit_mask(flags: bytes) -> int:
+    """Pack bytes of zero or one into the bits of an integer.
+
+    Args:
+        flags (bytes): A byte per bit, the first being the lowest bit.
+
+    Returns:
+        int: The integer with a bit set for every byte of one.
+    """
+    return sum(int.from_bytes(flags[bit::8], "little") << bit for bit in range(8))
+
+
+def _is_query_character(keypress: str, action: Optional[str]) -> bool:
+    """Check whether a keypress types a character into a filter query.
+
+    Args:
+        keypress (str): The keypress.
+        action (str, optional): The action the keypress is bound to.
+
+    Returns:
+        bool: Whether it is a printable character not bound to selecting.
+    """
+    return len(keypress) == 1 and keypress.isprintable() and action != "select"
+
+
+# The actions moving the cursor
+_CURSOR_ACTIONS = ("up", "down", "first", "last", "page_up", "page_down")
+
+
+def _move(source: _Options, index: int, action: str, height: int) -> int:
+    """Move the cursor over the options.
+
+    Args:
+        source (_Options): The options.
+        index (int): The index of the cursor.
+        action (str): The action moving the cursor.
+        height (int): The number of options a page holds.
+
+    Returns:
+        int: The new index of the cursor.
+    """
+    if action == "first":
+        return source.first()
+    if action == "last":
+        return source.last()
+    step = source.previous if action in ("up", "page_up") else source.next
+    for _ in range(height if action.startswith("page_") else 1):
+        index = step(index)
+    return index
+
+
+def _move_position(position: int, action: str, height: int, last_position: int) -> int:
+    """Move the cursor over rows that can all be selected.
+
+    Args:
+        position (int): The row of the cursor, e.g. among the matches of a
+            filter.
+        action (str): The action moving the cursor.
+        height (int): The number of rows a page holds.
+        last_position (int): The last row the cursor can move to.
+
+    Returns:
+        int: The new row of the cursor.
+    """
+    if action == "first":
+        new_position = 0
+    elif action == "last":
+        new_position = last_position
+    else:
+        distance = height if action.startswith("page_") else 1
+        if action in ("up", "page_up"):
+            distance = -distance
+        new_position = position + distance
+    return max(min(new_position, last_position), 0)
+
+
+def _caption_group(source: _Options, captions: Set[int], index: int) -> range:
+    """Get the indices between the captions around an index.
+
+    Args:
+        source (_Options): The options.
+        captions (Set[int]): Non-selectable indices.
+        index (int): The index.
+
+    Returns:
+        range: The indices after the caption above the index, or the first
+            index, up to the caption below it or the last index.
+    """
+    start = index + 1 if index in captions else index
+    while start > 0 and start - 1 not in captions:
+        start -= 1
+    end = start
+    source.load(end + 1)
+    while end < source.count and end not in captions:
+        end += 1
+        source.load(end + 1)
+    return range(start, end)
+
+
+def _range_span(
+    source: _Options,
+    captions: Set[int],
+    matches: Optional[List[int]],
+    start: int,
+    end: int,
+) -> List[int]:
+    """Get the selectable indices between two indices, both included.
+
+    Args:
+        source (_Options): The options.
+        captions (Set[int]): Non-selectable indices.
+        matches (List[int], optional): The matches of a filter, if any,
+            which the indices are limited to.
+        start (int): Where the span starts. It may be the confirm button.
+        end (int): Where the span ends. It may be the confirm button.
+
+    Returns:
+        List[int]: The indices in order.
+    """
+    low, high = sorted(min(i, source.count - 1) for i in (start, end))
+    if matches is None:
+        return [i for i in range(low, high + 1) if i not in captions]
+    return matches[
+        bisect.bisect_left(matches, low) : bisect.bisect_right(matches, high)
+    ]
+
+
+def _tick_many(
+    ticked: Dict[int, None],
+    tick: Iterable[int],
+    untick: Iterable[int],
+    minimal_count: int,
+    maximal_count: Optional[int],
+) -> str:
+    """Tick and untick options at once unless that breaks a limit.
+
+    Changes moving the number of ticked options beyond one of the limits
+    are not applied at all.
+
+    Args:
+        ticked (Dict[int, None]): The ticked indices.
+        tick (Iterable[int]): The indices to tick.
+        untick (Iterable[int]): The indices to untick.
+        minimal_count (int): The minimal number of ticked options.
+        maximal_count (int, optional): The maximal number of ticked options.
+
+    Returns:
+        str: The error message if the change was not applied, else "".
+    """
+    tick = [i for i in tick if i not in ticked]
+    untick = [i for i in untick if i in ticked]
+    count = len(ticked) + len(tick) - len(untick)
+    if count > len(ticked) and maximal_count is not None and count > maximal_count:
+        return f"Must select at most {maximal_count} options"
+    if count < len(ticked) and count < minimal_count:
+        return f"Must select at least {minimal_count} options"
+    for i in untick:
+        del ticked[i]
+    ticked.update(dict.fromkeys(tick))
+    return ""
+
+
+@functools.lru_cache(maxsize=None)
+def _character_width(character: str) -> int:
+    """Get the number of terminal columns a character occupies.
+
+    Args:
+        character (str): The character.
+
+    Returns:
+        int: 2 for wide East Asian characters, 0 for combining and control
+            characters and 1 otherwise.
+    """
+    if unicodedata.category(character) in ("Mn", "Me", "Cc", "Cf"):
+        return 0
+    if unicodedata.east_asian_width(character) in ("W", "F"):
+        return 2
+    return 1
+
+
+def _escape_sequence_end(line: str, start: int) -> int:
+    """Find the end of the escape sequence starting at an index.
+
+    Args:
+        line (str): The line.
+        start (int): The index of the escape character.
+
+    Returns:
+        int: The index after the sequence.
+    """
+    end = start + 2
+    if line[start + 1 : end] == "[":
+        # Control sequences end with a final byte
+        while end < len(line) and not "@" <= line[end] <= "~":
+            end += 1
+        return end + 1
+    if line[start + 1 : end] == "]":
+        # Operating system commands end with BEL or a string terminator
+        while end < len(line) and line[end] not in "\007\033":
+            end += 1
+        return end + (2 if line[end : end + 1] == "\033" else 1)
+    return end
+
+
+def _fit_line(line: str, width: int) -> str:
+    """Cut a line down to the width of the terminal so it does not wrap.
+
+    Escape sequences take no space and wide East Asian characters take two
+    columns.
+
+    Args:
+        line (str): The line.
+        width (int): The number of columns available.
+
+    Returns:
+        str: The line, ending with an ellipsis if it had to be cut.
+    """
+    # No character takes more than two columns
+    if len(line) * 2 <= width:
+        return line
+    columns = 0
+    # The end of the part that leaves room for the ellipsis
+    cut: Optional[int] = None
+    index = 0
+    while index < len(line):
+        if line[index] == "\033":
+            index = _escape_sequence_end(line, index)
+            continue
+        columns += _character_width(line[index])
+        if cut is None and columns >= width:
+            cut = index
+        if columns > width:
+            fitted = line[:cut] + "\u2026"
+            # Styles must not leak into the following lines
+            return fitted + "\033[0m" if "\033" in fitted else fitted
+        index += 1
+    return line
+
+
+class _Renderer:
+    """Draws a block of lines and redraws only the lines that changed.
+
+    The block starts at the line the cursor is on when the first frame is
+    rendered. Lines below it are reserved by printing newlines.
+    Between frames the cursor rests at the end of the cursor line or, if there
+    is none, at the start of the line below the block.
+    Each frame is rendered as one string to write at once. Lines are cut to the
+    width of the terminal, so every line occupies a single row. The lines
+    are only measured the first time they are drawn. When the terminal is
+    resized or the number of lines changes, the block is drawn anew.
+    """
+
+    def __init__(self) -> None:
+        self._lines: Optional[List[str]] = None
+        self._current_line = 0
+        self._size: Optional[os.terminal_size] = None
+        self._fit_line: Callable[[str], str] = str
+
+    def render(
+        self, lines: List[str], cursor_line: Optional[int], size: os.terminal_size
+    ) -> str:
+        """Render a frame.
+
+        Args:
+            lines (List[str]): The lines of the frame.
+            cursor_line (int, optional): The line the cursor rests on. It is
+                always redrawn.
+            size (os.terminal_size): The size of the terminal.
+
+        Returns:
+            str: The output to write to the terminal.
+        """
+        buffer: List[str] = []
+        rest_line = len(lines) if cursor_line is None else cursor_line
+        if self._lines is not None and (
+            size != self._size or len(lines) != len(self._lines)
+        ):
+            buffer.append(self._clear())
+            self._lines = None
+        if self._lines is None:
+            if self._size is None or size.columns != self._size.columns:
+                self._fit_line = functools.lru_cache(maxsize=4096)(
+                    functools.partial(_fit_line, width=size.columns)
+                )
+            self._size = size
+            buffer.append(self._begin(lines, cursor_line))
+            self._lines = [""] * len(lines)
+            changed: Iterable[int] = range(len(lines))
+        else:
+            changed = [i for i, line in enumerate(lines) if line != self._lines[i]]
+        for i in changed:
+            if i != cursor_line:
+                self._write_line(buffer, i, lines[i])
+        if cursor_line is not None:
+            self._write_line(buffer, cursor_line, lines[cursor_line])
+        elif self._current_line != rest_line:
+            buffer.append(self._move(rest_line))
+            self._current_line = rest_line
+        self._lines = list(lines)
+        return "".join(buffer)
+
+    def _write_line(self, buffer: List[str], i: int, line: str) -> None:
+        """Overwrite a single line of the block.
+
+        Args:
+            buffer (List[str]): The output of the current frame.
+            i (int): The index of the line.
+            line (str): The new content of the line.
+        """
+        line = self._fit_line(line)
+        buffer.append(f"{self._move(i)}\033[K{line}")
+        self._current_line = i
+
+    def _begin(self, lines: List[str], cursor_line: Optional[int]) -> str:
+        """Make room for the block before the first frame.
+
+        Args:
+            lines (List[str]): The lines of the first frame.
+            cursor_line (int, optional): The line the cursor rests on.
+
+        Returns:
+            str: The output reserving the lines.
+        """
+        reserved = len(lines) if cursor_line is None else len(lines) - 1
+        self._current_line = reserved
+        return "\n" * reserved
+
+    def _clear(self) -> str:
+        """Clear the block to draw it anew.
+
+        Returns:
+            str: The output clearing the block.
+        """
+        move = _move_to_line(0, self._current_line)
+        self._current_line = 0
+        return f"{move}\033[J"
+
+    def _move(self, line: int) -> str:
+        """Move the cursor to the start of a line of the block.
+
+        Args:
+            line (int): The index of the line.
+
+        Returns:
+            str: The escape sequence.
+        """
+        return _move_to_line(line, self._current_line)
+
+    def close(self) -> str:
+        """Finish drawing after the last frame.
+
+        Returns:
+            str: The output to write to the terminal.
+        """
+        return ""
+
+
+class _FullscreenRenderer(_Renderer):
+    """Draws a block of lines on the alternate screen of the terminal.
+
+    The block starts at the top of the screen and lines are addressed by
+    their row, so nothing scrolls and the scrollback is left untouched.
+    Closing the renderer switches back to the original screen as it was.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._entered = False
+
+    def _begin(self, lines: List[str], cursor_line: Optional[int]) -> str:
+        if self._entered:
+            return ""
+        self._entered = True
+        return "\033[?1049h\033[H\033[2J"
+
+    def _clear(self) -> str:
+        return "\033[2J"
+
+    def _move(self, line: int) -> str:
+        return f"\033[{line + 1};1H"
+
+    def close(self) -> str:
+        if not self._entered:
+            return ""
+        return "\033[?1049l"
+
+
+def _profile_writer(path: str) -> Callable[[FrameStats], None]:
+    """Create a frame observer appending the statistics to a file.
+
+    Args:
+        path (str): The file, which gets a line of JSON for every frame.
+
+    Returns:
+        Callable[[FrameStats], None]: The observer.
+    """
+
+    def write(stats: FrameStats) -> None:
+        import json
+
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps({"time": time.time(), **stats._asdict()}) + "\n")
+
+    return write
+
+
+class _Screen:
+    """Draws the frames of a prompt and reports their statistics.
+
+    The statistics go to the observer of the prompt and, if the environment
+    variable CUTIE_PROFILE names a file, to that file.
+    """
+
+    def __init__(
+        self,
+        prompt: str,
+        on_frame: Optional[Callable[[FrameStats], None]],
+        fullscreen: bool,
+        backend: "Backend",
+    ) -> None:
+        """Prepare drawing a prompt.
+
+        Args:
+            prompt (str): The name of the prompt.
+            on_frame (Callable[[FrameStats], None], optional): The observer.
+            fullscreen (bool): Draw on the alternate screen.
+            backend (Backend): The terminal drawn on.
+        """
+        self._prompt = prompt
+        self._backend = backend
+        self._renderer = _FullscreenRenderer() if fullscreen else _Renderer()
+        self._observers = [] if on_frame is None else [on_frame]
+        profile_path = os.environ.get("CUTIE_PROFILE")
+        if profile_path:
+            self._observers.append(_profile_writer(profile_path))
+        self._key_count = 0
+        self._first_key_time = time.perf_counter()
+
+    def key_applied(self) -> None:
+        """Count a key that has been applied to the prompt."""
+        if not self._key_count:
+            self._first_key_time = time.perf_counter()
+        self._key_count += 1
+
+    def draw(self, frame: _Frame) -> None:
+        """Draw a frame.
+
+        Args:
+            frame (_Frame): The lines and the cursor line.
+        """
+        start = time.perf_counter()
+        output = self._renderer.render(*frame, self._backend.size())
+        if output:
+            self._backend.write(output)
+        end = time.perf_counter()
+        if self._observers:
+            stats = FrameStats(
+                prompt=self._prompt,
+                render_time=end - start,
+                bytes=len(output.encode()),
+                latency=end - self._first_key_time,
+                keys=self._key_count,
+            )
+            for observer in self._observers:
+                observer(stats)
+        self._key_count = 0
+
+    def finish(self, farewell: str) -> None:
+        """Write what follows the last frame of a prompt that is done.
+
+        Args:
+            farewell (str): The output, if any.
+        """
+        if farewell:
+            self._backend.write(farewell)
+
+    def close(self) -> None:
+        """Finish drawing the prompt, also if it failed."""
+        output = self._renderer.close()
+        if output:
+            self._backend.write(output)
+
+
+# Seconds to wait for the rest of an escape sequence before taking it as typed
+_ESCAPE_TIMEOUT = 0.05
+
+
+def _escape_sequences() -> Dict[str, str]:
+    """Get the escape sequences terminals send for special keys.
+
+    Returns:
+        Dict[str, str]: The keys by sequence. Keys with several sequences are
+            given as the one readchar uses.
+    """
+    sequences = {"\033[Z": "\033[Z"}
+    for final in "ABCDHF":
+        sequences[f"\033[{final}"] = f"\033[{final}"
+        # Sent in application cursor mode
+        sequences[f"\033O{final}"] = f"\033[{final}"
+    for final in "PQRS":
+        sequences[f"\033O{final}"] = f"\033O{final}"
+    for number in (2, 3, 5, 6, 15, 17, 18, 19, 20, 21, 23, 24):
+        sequences[f"\033[{number}~"] = f"\033[{number}~"
+    for number, final in ((1, "H"), (7, "H"), (4, "F"), (8, "F")):
+        sequences[f"\033[{number}~"] = f"\033[{final}"
+    # Shift, Alt and Control combinations, as in "\033[1;5A" for Control+Up
+    for modifier in range(2, 9):
+        for final in "ABCDHFPQRS":
+            sequences[f"\033[1;{modifier}{final}"] = f"\033[1;{modifier}{final}"
+        for number in (2, 3, 5, 6, 15, 17, 18, 19, 20, 21, 23, 24):
+            sequence = f"\033[{number};{modifier}~"
+            sequences[sequence] = sequence
+    return sequences
+
+
+class _KeyDecoder:
+    """Splits terminal input into keys, a character at a time.
+
+    Escape sequences are followed through a trie, so every character takes a
+    single dict lookup. Input that may still become a longer sequence is held
+    back until the next character arrives or `flush` resolves it, so a lone
+    escape key does not wait for another key. Unknown control sequences are
+    kept together, and an escape followed by any other character is a single
+    key, like readchar reports Alt combinations.
+    """
+
+    _trie: Optional[Dict[str, Any]] = None
+
+    def __init__(self) -> None:
+        trie = _KeyDecoder._trie
+        if trie is None:
+            trie = {}
+            for sequence, key in _escape_sequences().items():
+                node = trie
+                for character in sequence:
+                    node = node.setdefault(character, {})
+                # The empty string can not be a character, it marks a key
+                node[""] = key
+            _KeyDecoder._trie = trie
+        self._root: Dict[str, Any] = trie
+        self._node = trie
+        self._pending = ""
+        self._control_sequence = False
+
+    @property
+    def pending(self) -> bool:
+        """bool: Whether input is held back, waiting for more."""
+        return bool(self._pending)
+
+    def feed(self, text: str) -> List[str]:
+        """Decode input.
+
+        Args:
+            text (str): The input.
+
+        Returns:
+            List[str]: The keys that are complete.
+        """
+        keys: List[str] = []
+        for character in text:
+            self._feed(character, keys)
+        return keys
+
+    def flush(self) -> List[str]:
+        """Stop waiting for the rest of the input held back.
+
+        Returns:
+            List[str]: The key made of the input held back, if any.
+        """
+        if not self._pending:
+            return []
+        key = self._pending
+        if not self._control_sequence:
+            key = self._node.get("", key)
+        self._reset()
+        return [key]
+
+    def _reset(self) -> None:
+        """Start over at the root of the trie."""
+        self._node = self._root
+        self._pending = ""
+        self._control_sequence = False
+
+    def _feed(self, character: str, keys: List[str]) -> None:
+        """Decode a single character.
+
+        Args:
+            character (str): The character.
+            keys (List[str]): The keys that are complete, to append to.
+        """
+        if self._control_sequence:
+            self._pending += character
+            # Final bytes end control sequences
+            if "@" <= character <= "~":
+                keys.append(self._pending)
+                self._reset()
+            return
+        node = self._node.get(character)
+        if node is not None:
+            self._pending += character
+            if len(node) == 1 and "" in node:
+                keys.append(node[""])
+                self._reset()
+            else:
+                self._node = node
+            return
+        if not self._pending:
+            keys.append(character)
+        elif "" in self._node:
+            keys.append(self._node[""])
+            self._reset()
+            self._feed(character, keys)
+        elif self._pending.startswith("\033["):
+            self._control_sequence = True
+            self._feed(character, keys)
+        else:
+            keys.append(self._pending + character)
+            self._reset()
+
+
+class PromptCancelledError(Exception):
+    """Raised by prompts cancelled through their CancelToken."""
+
+
+class PromptTimeoutError(PromptCancelledError):
+    """Raised by prompts whose timeout passed while there was no answer to
+    return."""
+
+
+class CancelToken:
+    """Cancels the prompts it is given to, e.g. from another thread.
+
+    Waiting prompts stop at once instead of when the next key is pressed, as
+    a pipe that becomes readable on cancellation is waited on along with the
+    terminal.
+    """
+
+    def __init__(self) -> None:
+        self._cancelled = False
+        self._pipe: Optional[Tuple[int, int]] = None
+
+    def __del__(self) -> None:
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+
+    def __getstate__(self) -> None:
+        raise TypeError("A CancelToken cannot be passed to other processes")
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token has been cancelled."""
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Cancel the prompts given the token, including those shown later."""
+        if self._cancelled:
+            return
+        self._cancelled = True
+        if self._pipe is not None:
+            os.write(self._pipe[1], b"\0")
+
+    def fileno(self) -> int:
+        """Get a file descriptor that becomes readable on cancellation.
+
+        Returns:
+            int: The file descriptor.
+        """
+        if self._pipe is None:
+            self._pipe = os.pipe()
+            # The token may have been cancelled before the pipe existed
+            if self._cancelled:
+                os.write(self._pipe[1], b"\0")
+        return self._pipe[0]
+
+
+class _KeyReader:
+    """Reads keypresses, keeping track of keys typed ahead.
+
+    On POSIX terminals stdin is switched to non-canonical mode without echo
+    for as long as the reader is used and read directly. Keys that are typed
+    while a frame is drawn are thus not lost, can be seen before reading them
+    and are not echoed. The terminal mode is only switched when the outermost
+    `with` block using the reader is entered and left. Meanwhile SIGWINCH is
+    watched, and a resize of the terminal interrupts waiting for a key.
+    Without a terminal readchar is used.
+    """
+
+    def __init__(self) -> None:
+        self._keys: Deque[str] = collections.deque()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")("replace")
+        self._decoder = _KeyDecoder()
+        self._fd: Optional[int] = None
+        self._terminal_attributes: list = []
+        self._raw_attributes: list = []
+        self._depth = 0
+        self._previous_resize_handler: Any = None
+        self._resized = False
+        self._waiting = False
+
+    def __enter__(self) -> "_KeyReader":
+        self._depth += 1
+        if self._depth == 1:
+            self._start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._stop()
+
+    def _start(self) -> None:
+        """Switch the terminal to the mode keys are read in."""
+        if termios is None or not sys.stdin.isatty():
+            return
+        fd = sys.stdin.fileno()
+        attributes = termios.tcgetattr(fd)
+        raw_attributes = termios.tcgetattr(fd)
+        raw_attributes[3] &= ~(termios.ICANON | termios.ECHO)
+        raw_attributes[6][termios.VMIN] = 1
+        raw_attributes[6][termios.VTIME] = 0
+        termios.tcsetattr(fd, termios.TCSADRAIN, raw_attributes)
+        self._fd = fd
+        self._terminal_attributes = attributes
+        self._raw_attributes = raw_attributes
+        self._watch_resize()
+
+    def _stop(self) -> None:
+        """Restore the terminal mode."""
+        if self._fd is not None:
+            self._unwatch_resize()
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._terminal_attributes)
+            self._fd = None
+
+    def _watch_resize(self) -> None:
+        """Handle SIGWINCH while keys are read."""
+        if not hasattr(signal, "SIGWINCH"):
+            return
+        try:
+            previous = signal.signal(signal.SIGWINCH, self._on_resize)
+        except ValueError:
+            # Signal handlers can only be set in the main thread
+            return
+        self._previous_resize_handler = signal.SIG_DFL if previous is None else previous
+
+    def _unwatch_resize(self) -> None:
+        """Restore the handler of SIGWINCH."""
+        if self._previous_resize_handler is not None:
+            signal.signal(signal.SIGWINCH, self._previous_resize_handler)
+            self._previous_resize_handler = None
+
+    def _on_resize(self, signal_number: int, frame: Optional[types.FrameType]) -> None:
+        """Forget the size of the terminal and stop waiting for a key.
+
+        Args:
+            signal_number (int): SIGWINCH.
+            frame (types.FrameType, optional): The interrupted frame.
+        """
+        _forget_terminal_size()
+        if callable(self._previous_resize_handler):
+            self._previous_resize_handler(signal_number, frame)
+        self._resized = True
+        if self._waiting:
+            self._raise_if_resized()
+
+    def _raise_if_resized(self) -> None:
+        """Report a resize of the terminal that was not reported yet.
+
+        Raises:
+            _TerminalResized: If the terminal was resized.
+        """
+        if self._resized:
+            self._resized = False
+            raise _TerminalResized
+
+    def _wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until stdin can be read.
+
+        Args:
+            timeout (float, optional): The seconds to wait at most.
+
+        Returns:
+            bool: Whether stdin can be read.
+
+        Raises:
+            _TerminalResized: If the terminal was resized.
+        """
+        assert self._fd is not None
+        # Only the wait is interrupted, so no input read gets lost
+        self._waiting = True
+        try:
+            self._raise_if_resized()
+            return bool(_select.select([self._fd], [], [], timeout)[0])
+        finally:
+            self._waiting = False
+
+    @contextlib.contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Restore the terminal mode for the duration, e.g. to read a line.
+
+        Yields:
+            None: While the terminal is in its original mode.
+        """
+        if self._fd is None:
+            yield
+            return
+        termios.tcsetattr(self._fd, termios.TCSADRAIN, self._terminal_attributes)
+        try:
+            yield
+        finally:
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._raw_attributes)
+
+    def _read(self) -> None:
+        """Read a byte from stdin, queueing the key it completes, if any.
+
+        Reading a byte at a time leaves keys no prompt asked for on stdin,
+        for example for a line read after the prompt.
+        """
+        assert self._fd is not None
+        text = self._utf8.decode(os.read(self._fd, 1))
+        self._keys.extend(self._decoder.feed(text))
+
+    def pending(self) -> bool:
+        """Check whether keys have been typed that were not read yet.
+
+        Returns:
+            bool: Whether the next keypress is available without waiting.
+        """
+        if self._fd is None:
+            return msvcrt is not None and msvcrt.kbhit()  # type: ignore
+        while not self._keys and _select.select([self._fd], [], [], 0)[0]:
+            self._read()
+        return bool(self._keys)
+
+    def wait(self, timeout: Optional[float], cancel: Optional[CancelToken]) -> bool:
+        """Wait until a key is typed, the terminal is resized, the time is up
+        or the token is cancelled.
+
+        Without a terminal read directly, readchar cannot be interrupted, so
+        this returns at once.
+
+        Args:
+            timeout (float, optional): The seconds to wait at most.
+            cancel (CancelToken, optional): The token to watch.
+
+        Returns:
+            bool: Whether readkey returns without waiting for the user.
+        """
+        if self._keys or self._resized or self._fd is None:
+            return True
+        watched = [self._fd] if cancel is None else [self._fd, cancel.fileno()]
+        self._waiting = True
+        try:
+            return self._fd in _select.select(watched, [], [], timeout)[0]
+        except _TerminalResized:
+            # Reported by the next readkey
+            self._resized = True
+            return True
+        finally:
+            self._waiting = False
+
+    def readkey(self) -> str:
+        """Wait for the next keypress.
+
+        Returns:
+            str: The keypress.
+
+        Raises:
+            _TerminalResized: If the terminal was resized while waiting.
+        """
+        if self._fd is None:
+            import readchar
+
+            return readchar.readkey()
+        while not self._keys:
+            if self._wait(_ESCAPE_TIMEOUT if self._decoder.pending else None):
+                self._read()
+            else:
+                # Nothing follows, e.g. the escape key was pressed on its own
+                self._keys.extend(self._decoder.flush())
+        return self._keys.popleft()
+
+
+class _AsyncKeyReader(_KeyReader):
+    """Reads keypresses without blocking the event loop.
+
+    On POSIX terminals stdin is watched by the event loop. Otherwise readchar
+    is run in a worker thread.
+    """
+
+    def __init__(self) -> None:
+        import asyncio
+
+        super().__init__()
+        self._loop = asyncio.get_event_loop()
+        self._available = asyncio.Event()
+        self._flush_handle: Optional[asyncio.Handle] = None
+
+    def _start(self) -> None:
+        super()._start()
+        if self._fd is not None:
+            try:
+                self._loop.add_reader(self._fd, self._read)
+            except NotImplementedError:
+                super()._stop()
+
+    def _watch_resize(self) -> None:
+        if not hasattr(signal, "SIGWINCH"):
+            return
+        previous = signal.getsignal(signal.SIGWINCH)
+        try:
+            self._loop.add_signal_handler(
+                signal.SIGWINCH, self._on_resize, signal.SIGWINCH, None
+            )
+        except (NotImplementedError, RuntimeError, ValueError):
+            return
+        self._previous_resize_handler = signal.SIG_DFL if previous is None else previous
+
+    def _unwatch_resize(self) -> None:
+        if self._previous_resize_handler is not None:
+            self._loop.remove_signal_handler(signal.SIGWINCH)
+        super()._unwatch_resize()
+
+    def _on_resize(self, signal_number: int, frame: Optional[types.FrameType]) -> None:
+        super()._on_resize(signal_number, frame)
+        self._available.set()
+
+    def _stop(self) -> None:
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        super()._stop()
+
+    def _read(self) -> None:
+        assert self._fd is not None
+        # Input the loop reported may have been read by pending() meanwhile
+        if not _select.select([self._fd], [], [], 0)[0]:
+            return
+        super()._read()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._decoder.pending:
+            self._flush_handle = self._loop.call_later(_ESCAPE_TIMEOUT, self._flush)
+        if self._keys:
+            self._available.set()
+
+    def _flush(self) -> None:
+        """Resolve input held back when nothing followed it in time."""
+        self._flush_handle = None
+        self._keys.extend(self._decoder.flush())
+        if self._keys:
+            self._available.set()
+
+    async def wait(  # type: ignore
+        self, timeout: Optional[float], cancel: Optional[CancelToken]
+    ) -> bool:
+        """Wait until a key is typed, the terminal is resized, the time is up
+        or the token is cancelled.
+
+        Args:
+            timeout (float, optional): The seconds to wait at most.
+            cancel (CancelToken, optional): The token to watch.
+
+        Returns:
+            bool: Whether readkey returns without waiting for the user.
+        """
+        import asyncio
+
+        if self._keys or self._resized or self._fd is None:
+            return True
+        self._available.clear()
+        if cancel is not None:
+            self._loop.add_reader(cancel.fileno(), self._available.set)
+        try:
+            await asyncio.wait_for(self._available.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if cancel is not None:
+                self._loop.remove_reader(cancel.fileno())
+        return bool(self._keys) or self._resized
+
+    async def readkey(self) -> str:  # type: ignore
+        """Wait for the next keypress.
+
+        Returns:
+            str: The keypress.
+
+        Raises:
+            _TerminalResized: If the terminal was resized while waiting.
+        """
+        if self._fd is None:
+            import readchar
+
+            return await self._loop.run_in_executor(None, readchar.readkey)
+        while not self._keys:
+            self._raise_if_resized()
+            self._available.clear()
+            await self._available.wait()
+        return self._keys.popleft()
+
+
+# The reader shared by the prompts inside a session, if any
+_session_reader: Optional[_KeyReader] = None
+
+
+def _key_reader() -> _KeyReader:
+    """Get the reader of the current session or a new one for a single prompt.
+
+    Returns:
+        _KeyReader: The reader.
+    """
+    return _KeyReader() if _session_reader is None else _session_reader
+
+
+@contextlib.contextmanager
+def session() -> Iterator[None]:
+    """Keep the terminal ready for reading keys across several prompts.
+
+    The terminal mode is switched once instead of for every prompt, keys are
+    not echoed between prompts and keys typed ahead go to the next prompt.
+    The terminal is restored when the block is left, also on exceptions.
+
+    Yields:
+        None: While the session lasts.
+    """
+    global _session_reader
+    if _session_reader is not None:
+        yield
+        return
+    _session_reader = _KeyReader()
+    try:
+        with _session_reader:
+            yield
+    finally:
+        _session_reader = None
+
+
+class Backend:
+    """The terminal a prompt runs in.
+
+    A backend provides the keys, takes the output and knows the size of the
+    screen. Prompts use the terminal the program runs in by default. Subclasses
+    implement `readkey`, `write` and `size` to run prompts elsewhere, for
+    example over a socket. A backend is entered with `with` for the duration
+    of every prompt using it, which it can use to prepare the terminal.
+    """
+
+    def __enter__(self) -> "Backend":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def readkey(self) -> Optional[str]:
+        """Wait for the next keypress.
+
+        Returns:
+            Optional[str]: The keypress, or None if the screen was resized
+                meanwhile, which lays the prompt out again.
+        """
+        raise NotImplementedError
+
+    async def readkey_async(self) -> Optional[str]:
+        """Wait for the next keypress without blocking the event loop.
+
+        Defaults to `readkey`, so backends whose keys may not be there yet
+        should override it.
+
+        Returns:
+            Optional[str]: The keypress, or None if the screen was resized.
+        """
+        return self.readkey()
+
+    def pending(self) -> bool:
+        """Check whether keys are available right away.
+
+        Frames are only drawn once the keys typed ahead are applied.
+
+        Returns:
+            bool: Whether the next readkey returns at once.
+        """
+        return False
+
+    def wait(self, timeout: Optional[float], cancel: Optional[CancelToken]) -> bool:
+        """Wait for a key before reading it, for prompts that can be dismissed.
+
+        The wait ends early when the token is cancelled, which makes the file
+        descriptor of the token readable. Defaults to returning at once, so
+        prompts are only dismissed once a key is pressed, which backends that
+        can wait should override.
+
+        Args:
+            timeout (float, optional): The seconds to wait at most.
+            cancel (CancelToken, optional): The token to watch.
+
+        Returns:
+            bool: Whether readkey returns without waiting for the user.
+        """
+        return True
+
+    async def wait_async(
+        self, timeout: Optional[float], cancel: Optional[CancelToken]
+    ) -> bool:
+        """Wait for a key before reading it without blocking the event loop.
+
+        Defaults to `wait`.
+
+        Args:
+            timeout (float, optional): The seconds to wait at most.
+            cancel (CancelToken, optional): The token to watch.
+
+        Returns:
+            bool: Whether readkey_async returns without waiting for the user.
+        """
+        return self.wait(timeout, cancel)
+
+    def write(self, text: str) -> None:
+        """Write output, including escape sequences, and flush it.
+
+        Args:
+            text (str): The output.
+        """
+        raise NotImplementedError
+
+    def size(self) -> os.terminal_size:
+        """Get the size of the screen.
+
+        Returns:
+            os.terminal_size: The number of columns and lines.
+        """
+        raise NotImplementedError
+
+    def readline(
+        self,
+        prompt: str,
+        echo: bool = True,
+        timeout: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        """Read a line of text, as get_number and secure_input do.
+
+        The backend is not entered meanwhile. The line is read key by key
+        by default.
+
+        Args:
+            prompt (str): Written before the line.
+            echo (bool, optional): Show the keys typed.
+            timeout (float, optional): The seconds to wait for the line.
+            cancel (CancelToken, optional): The token cancelling the input.
+
+        Returns:
+            str: The line.
+
+        Raises:
+            PromptTimeoutError: If the line was not entered in time.
+            PromptCancelledError: If the token was cancelled.
+        """
+        keymap = Keymap()
+        characters: List[str] = []
+        stop_at = None if timeout is None else time.monotonic() + timeout
+        dismissible = timeout is not None or cancel is not None
+        self.write(prompt)
+        while True:
+            if (
+                dismissible
+                and not self.pending()
+                and not _wait_for_key(self, stop_at, cancel)
+            ):
+                self.write("\n")
+                raise _dismissal("readline", cancel)
+            keypress = self.readkey()
+            if keypress is None:
+                continue
+            action = keymap.action(keypress)
+            if action == "confirm":
+                break
+            if action == "interrupt":
+                raise KeyboardInterrupt
+            if action == "delete":
+                if characters:
+                    characters.pop()
+                    if echo:
+                        self.write("\b \b")
+            elif keypress.isprintable():
+                characters.append(keypress)
+                if echo:
+                    self.write(keypress)
+        self.write("\n")
+        return "".join(characters)
+
+
+class TerminalBackend(Backend):
+    """The terminal the program runs in, used by prompts by default.
+
+    Keys are read from stdin as described for sessions and the output is
+    printed to stdout. The size of the terminal is looked up once per prompt
+    and again after it has been resized.
+    """
+
+    def __init__(self) -> None:
+        _enable_ansi()
+        self._reader: Optional[_KeyReader] = None
+        self._exit_stack = contextlib.ExitStack()
+        self._depth = 0
+
+    def _key_reader(self) -> _KeyReader:
+        """Create the reader used while the backend is entered.
+
+        Returns:
+            _KeyReader: The reader.
+        """
+        return _key_reader()
+
+    def __enter__(self) -> "TerminalBackend":
+        self._depth += 1
+        if self._depth == 1:
+            self._reader = self._key_reader()
+            self._exit_stack.enter_context(self._reader)
+            self._exit_stack.enter_context(_terminal_size_cached())
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._exit_stack.close()
+            self._reader = None
+
+    def readkey(self) -> Optional[str]:
+        try:
+            return self._reader.readkey()  # type: ignore
+        except _TerminalResized:
+            return None
+
+    def pending(self) -> bool:
+        return self._reader is not None and self._reader.pending()
+
+    def wait(self, timeout: Optional[float], cancel: Optional[CancelToken]) -> bool:
+        return self._reader.wait(timeout, cancel)  # type: ignore
+
+    def write(self, text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def size(self) -> os.terminal_size:
+        return _get_terminal_size()
+
+    def readline(
+        self,
+        prompt: str,
+        echo: bool = True,
+        timeout: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> str:
+        if timeout is not None or cancel is not None:
+            # Lines read by the terminal cannot be interrupted, keys can
+            with self:
+                return super().readline(prompt, echo, timeout, cancel)
+        if echo:
+            return _input(prompt)
+        with _key_reader().suspended():
+            return getpass.getpass(prompt)
+
+
+class _AsyncTerminalBackend(TerminalBackend):
+    """The terminal the program runs in, read without blocking the event loop."""
+
+    def _key_reader(self) -> _KeyReader:
+        return _AsyncKeyReader()
+
+    async def readkey_async(self) -> Optional[str]:
+        try:
+            return await self._reader.readkey()  # type: ignore
+        except _TerminalResized:
+            return None
+
+    async def wait_async(
+        self, timeout: Optional[float], cancel: Optional[CancelToken]
+    ) -> bool:
+        return await self._reader.wait(timeout, cancel)  # type: ignore
+
+
+class VirtualTerminal(Backend):
+    """A terminal in memory, running prompts without a real one.
+
+    Keys are queued with `press`, before or while a prompt runs. Like keys
+    typed ahead on a terminal, queued keys are applied before the next frame
+    is drawn. Reading a key when none is queued raises EOFError, so a prompt
+    that got too few keys fails instead of waiting forever.
+
+    The output is interpreted like a terminal would, keeping the text on the
+    screen. The escape sequences cutie writes are understood: moving the
+    cursor, erasing lines and the screen and the alternate screen. Others,
+    like colors, take no space and are dropped.
+
+    Attributes:
+        output (List[str]): Everything written, one string per write.
+    """
+
+    def __init__(
+        self, columns: int = 80, lines: int = 24, keys: Iterable[str] = ()
+    ) -> None:
+        """Create an empty screen.
+
+        Args:
+            columns (int, optional): The width of the screen.
+            lines (int, optional): The height of the screen.
+            keys (Iterable[str], optional): Keys queued from the start.
+        """
+        self.output: List[str] = []
+        self._size = os.terminal_size((columns, lines))
+        self._keys: Deque[Optional[str]] = collections.deque(keys)
+        self._screen = self._blank_screen()
+        self._saved_screen: Optional[Tuple[List[List[str]], int, int]] = None
+        self._row = 0
+        self._column = 0
+
+    @property
+    def lines(self) -> List[str]:
+        """The text on the screen, without trailing spaces."""
+        return ["".join(row).rstrip() for row in self._screen]
+
+    @property
+    def cursor(self) -> Tuple[int, int]:
+        """The line and column of the cursor."""
+        return self._row, self._column
+
+    def press(self, *keys: str) -> None:
+        """Queue keys for the prompt.
+
+        Args:
+            *keys (str): The keys, e.g. from readchar.key.
+        """
+        self._keys.extend(keys)
+
+    def resize(self, columns: int, lines: int) -> None:
+        """Change the size of the screen, keeping the text that still fits.
+
+        The prompt is laid out again before the next queued key.
+
+        Args:
+            columns (int): The new width.
+            lines (int): The new height.
+        """
+        self._size = os.terminal_size((columns, lines))
+        screen = self._blank_screen()
+        for row, old_row in zip(screen, self._screen):
+            row[: len(old_row)] = old_row[:columns]
+        self._screen = screen
+        self._row = min(self._row, lines - 1)
+        self._column = min(self._column, columns - 1)
+        self._keys.append(None)
+
+    def readkey(self) -> Optional[str]:
+        if not self._keys:
+            raise EOFError("No keys are queued")
+        return self._keys.popleft()
+
+    def pending(self) -> bool:
+        return bool(self._keys)
+
+    def wait(self, timeout: Optional[float], cancel: Optional[CancelToken]) -> bool:
+        # Keys pressed meanwhile are only noticed once the wait is over
+        if not self._keys:
+            if cancel is not None:
+                _select.select([cancel.fileno()], [], [], timeout)
+            elif timeout is not None:
+                time.sleep(timeout)
+        return bool(self._keys)
+
+    def size(self) -> os.terminal_size:
+        return self._size
+
+    def write(self, text: str) -> None:
+        self.output.append(text)
+        i = 0
+        while i < len(text):
+            character = text[i]
+            if character == "\033":
+                end = _escape_sequence_end(text, i)
+                self._control(text[i:end])
+                i = end
+                continue
+            if character == "\n":
+                self._newline()
+            elif character == "\r":
+                self._column = 0
+            elif character == "\b":
+                self._column = max(self._column - 1, 0)
+            else:
+                self._put(character)
+            i += 1
+
+    def _blank_screen(self) -> List[List[str]]:
+        """Create the rows of an empty screen.
+
+        Returns:
+            List[List[str]]: The cells of every row.
+        """
+        return [[" "] * self._size.columns for _ in range(self._size.lines)]
+
+    def _newline(self) -> None:
+        """Move to the start of the next line, scrolling at the bottom."""
+        self._column = 0
+        if self._row < self._size.lines - 1:
+            self._row += 1
+        else:
+            del self._screen[0]
+            self._screen.append([" "] * self._size.columns)
+
+    def _put(self, character: str) -> None:
+        """Write a character at the cursor, wrapping at the end of the line.
+
+        Args:
+            character (str): The character.
+        """
+        width = _character_width(character)
+        if not width:
+            if self._column:
+                self._screen[self._row][self._column - 1] += character
+            return
+        if self._column + width > self._size.columns:
+            self._newline()
+        row = self._screen[self._row]
+        row[self._column] = character
+        if width == 2:
+            # The second column of a wide character holds nothing
+            row[self._column + 1] = ""
+        self._column += width
+
+    def _control(self, sequence: str) -> None:
+        """Apply an escape sequence.
+
+        Args:
+            sequence (str): The sequence, starting with the escape character.
+        """
+        if sequence[1:2] != "[":
+            return
+        final, parameters = sequence[-1], sequence[2:-1]
+        if parameters == "?1049":
+            self._switch_screen(final == "h")
+            return
+        numbers = [int(n) if n.isdigit() else 0 for n in parameters.split(";")]
+        count = max(numbers[0], 1)
+        lines, columns = self._size.lines, self._size.columns
+        if final == "A":
+            self._row = max(self._row - count, 0)
+        elif final == "B":
+            self._row = min(self._row + count, lines - 1)
+        elif final == "C":
+            self._column = min(self._column + count, columns - 1)
+        elif final == "D":
+            self._column = max(self._column - count, 0)
+        elif final == "H":
+            column = numbers[1] if len(numbers) > 1 else 0
+            self._row = min(max(numbers[0], 1), lines) - 1
+            self._column = min(max(column, 1), columns) - 1
+        elif final == "K":
+            row = self._screen[self._row]
+            if numbers[0] == 0:
+                row[self._column :] = [" "] * (columns - self._column)
+            elif numbers[0] == 2:
+                row[:] = [" "] * columns
+        elif final == "J":
+            if numbers[0] == 0:
+                self._screen[self._row][self._column :] = [" "] * (
+                    columns - self._column
+                )
+                for row in self._screen[self._row + 1 :]:
+                    row[:] = [" "] * columns
+            elif numbers[0] == 2:
+                self._screen = self._blank_screen()
+
+    def _switch_screen(self, alternate: bool) -> None:
+        """Switch to the alternate screen or back to the original one.
+
+        Args:
+            alternate (bool): Whether to switch to the alternate screen.
+        """
+        if alternate and self._saved_screen is None:
+            self._saved_screen = (self._screen, self._row, self._column)
+            self._screen = self._blank_screen()
+        elif not alternate and self._saved_screen is not None:
+            self._screen, self._row, self._column = self._saved_screen
+            self._saved_screen = None
+
+
+class MissingAnswerError(LookupError):
+    """Raised by prompts answered headless that got no answer and have no
+    default."""
+
+
+# The answers given to headless, None outside of it
+_headless_answers: Optional[Mapping[str, Any]] = None
+
+
+def _load_answers(answers: Union[Mapping[str, Any], str]) -> Mapping[str, Any]:
+    """Get answers given directly or as the path of a JSON file.
+
+    Args:
+        answers (Mapping[str, Any] | str): The answers or the file.
+
+    Returns:
+        Mapping[str, Any]: The answers.
+    """
+    import json
+
+    if not isinstance(answers, str):
+        return answers
+    with open(answers, encoding="utf-8") as file:
+        return json.load(file)
+
+
+@contextlib.contextmanager
+def headless(answers: Union[Mapping[str, Any], str, None] = None) -> Iterator[None]:
+    """Answer prompts without showing them for the duration.
+
+    Every prompt using the terminal returns the answer given for its key or
+    its text at once, or its default if there is none. Nothing is drawn and
+    no key is read.
+
+    Args:
+        answers (Mapping[str, Any] | str, optional): The answers by the
+            `answer_key` or the text of the prompts, or the path of a JSON
+            file holding them.
+
+    Yields:
+        None: While prompts are answered.
+    """
+    global _headless_answers
+    previous = _headless_answers
+    _headless_answers = {} if answers is None else _load_answers(answers)
+    try:
+        yield
+    finally:
+        _headless_answers = previous
+
+
+def _is_headless() -> bool:
+    """Check whether prompts using the terminal are answered without it.
+
+    This is the case inside headless, if the environment variable
+    CUTIE_HEADLESS is set to anything but 0 and, unless it is 0, if stdin is
+    not a terminal.
+
+    Returns:
+        bool: Whether prompts are answered headless.
+    """
+    if _headless_answers is not None:
+        return True
+    setting = os.environ.get("CUTIE_HEADLESS")
+    if setting:
+        return setting != "0"
+    return sys.stdin is None or not sys.stdin.isatty()
+
+
+def _scripted_answer(answer_key: Optional[str], text: Optional[str]) -> Any:
+    """Get the answer given for a prompt.
+
+    The answers come from headless or else from the JSON file the
+    environment variable CUTIE_ANSWERS names.
+
+    Args:
+        answer_key (str, optional): The key of the prompt.
+        text (str, optional): The text of the prompt.
+
+    Returns:
+        Any: The answer, None if there is none.
+    """
+    answers = _headless_answers
+    if answers is None:
+        path = os.environ.get("CUTIE_ANSWERS")
+        answers = _load_answers(path) if path else {}
+    for key in (answer_key, text):
+        if key is not None and key in answers:
+            return answers[key]
+    return None
+
+
+def _missing_answer(
+    prompt: str, answer_key: Optional[str], text: Optional[str]
+) -> MissingAnswerError:
+    """Create the error of a headless prompt without an answer.
+
+    Args:
+        prompt (str): The name of the prompt.
+        answer_key (str, optional): The key of the prompt.
+        text (str, optional): The text of the prompt.
+
+    Returns:
+        MissingAnswerError: The error.
+    """
+    keys = [repr(key) for key in (answer_key, text) if key is not None]
+    looked_up = f" under {' or '.join(keys)}" if keys else ""
+    return MissingAnswerError(
+        f"{prompt} has no default and no answer was given{looked_up}."
+        " Give one with headless or the JSON file CUTIE_ANSWERS names, or"
+        " set CUTIE_HEADLESS=0 to ask in the terminal."
+    )
+
+
+def _answer_headless(prompt: str, core: "PromptCore", answer_key: Optional[str]) -> Any:
+    """Resolve a prompt from its scripted answer or its default.
+
+    Args:
+        prompt (str): The name of the prompt.
+        core (PromptCore): The core of the prompt.
+        answer_key (str, optional): The key of the prompt.
+
+    Returns:
+        Any: The result of the prompt.
+
+    Raises:
+        MissingAnswerError: If there is neither an answer nor a default.
+        ValueError: If the answer is not valid for the prompt.
+    """
+    answer = _scripted_answer(answer_key, core.question)
+    result = core.resolve(core.state, answer)
+    if result is None:
+        raise _missing_answer(prompt, answer_key, core.question)
+    return result
+
+
+def _time_left(stop_at: Optional[float]) -> Optional[float]:
+    """Get the seconds left until a point in time.
+
+    Args:
+        stop_at (float, optional): The point on the time.monotonic clock.
+
+    Returns:
+        Optional[float]: The seconds left, at least 0, None without a point.
+    """
+    return None if stop_at is None else max(stop_at - time.monotonic(), 0)
+
+
+def _wait_for_key(
+    backend: "Backend", stop_at: Optional[float], cancel: Optional[CancelToken]
+) -> bool:
+    """Wait until a key can be read or the prompt is dismissed.
+
+    Args:
+        backend (Backend): The backend to read the key from.
+        stop_at (float, optional): When the prompt times out.
+        cancel (CancelToken, optional): The token cancelling the prompt.
+
+    Returns:
+        bool: Whether a key can be read, False if the prompt timed out or
+            was cancelled.
+    """
+    while not (cancel is not None and cancel.cancelled):
+        time_left = _time_left(stop_at)
+        if time_left == 0:
+            break
+        if backend.wait(time_left, cancel):
+            return True
+    return False
+
+
+async def _wait_for_key_async(
+    backend: "Backend", stop_at: Optional[float], cancel: Optional[CancelToken]
+) -> bool:
+    """Wait until a key can be read or the prompt is dismissed, without
+    blocking the event loop.
+
+    Args:
+        backend (Backend): The backend to read the key from.
+        stop_at (float, optional): When the prompt times out.
+        cancel (CancelToken, optional): The token cancelling the prompt.
+
+    Returns:
+        bool: Whether a key can be read, False if the prompt timed out or
+            was cancelled.
+    """
+    while not (cancel is not None and cancel.cancelled):
+        time_left = _time_left(stop_at)
+        if time_left == 0:
+            break
+        if await backend.wait_async(time_left, cancel):
+            return True
+    return False
+
+
+def _dismissal(prompt: str, cancel: Optional[CancelToken]) -> PromptCancelledError:
+    """Create the error of a prompt that was dismissed without an answer.
+
+    Args:
+        prompt (str): The name of the prompt.
+        cancel (CancelToken, optional): The token of the prompt.
+
+    Returns:
+        PromptCancelledError: The error, a PromptTimeoutError unless the
+            prompt was cancelled.
+    """
+    if cancel is not None and cancel.cancelled:
+        return PromptCancelledError(f"{prompt} was cancelled")
+    return PromptTimeoutError(f"{prompt} timed out without an answer")
+
+
+def _answer_dismissed(
+    prompt: str,
+    core: "PromptCore",
+    state: "_PromptState",
+    cancel: Optional[CancelToken],
+) -> Any:
+    """Resolve a prompt that timed out with what confirming it would return.
+
+    Args:
+        prompt (str): The name of the prompt.
+        core (PromptCore): The core of the prompt.
+        state (_PromptState): The state the prompt is in.
+        cancel (CancelToken, optional): The token of the prompt.
+
+    Returns:
+        Any: The result of the prompt.
+
+    Raises:
+        PromptCancelledError: If the prompt was cancelled.
+        PromptTimeoutError: If there is nothing to return.
+    """
+    if cancel is not None and cancel.cancelled:
+        raise _dismissal(prompt, cancel)
+    result = core.resolve(state, None)
+    if result is None:
+        raise _dismissal(prompt, cancel)
+    return result
+
+
+class PromptCore(NamedTuple):
+    """The logic of a prompt, free of reading keys and writing output.
+
+    The state is changed only by the reducer and shown only by the renderer,
+    so the same core serves the prompts reading the terminal, those awaiting
+    it in an event loop and tests feeding it keys directly. Get the core of a
+    prompt with prompt_core. Its state is done once `state.done` is true,
+    with the answer in `state.result`.
+
+    Attributes:
+        state: The state the prompt starts in.
+        reduce (Callable[[Any, _Event], Any]): Applies a keypress to a state
+            and returns the resulting state. A terminal size lays the state
+            out for that size, which has to happen before the first frame is
+            rendered. Raises KeyboardInterrupt if the keypress interrupts the
+            prompt.
+        render (Callable[[Any], _Frame]): Gets the frame showing a state.
+        resolve (Callable[[Any, Any], Any]): Gets the result of a prompt
+            answered headless from a state and the answer given, which is
+            None if there is none. Returns None if there is no answer and no
+            default and raises ValueError if the answer is not valid.
+        farewell (str): Written after the last frame once the prompt is done.
+        question (str, optional): The text of the prompt, by which answers
+            are also looked up.
+    """
+
+    state: "_PromptState"
+    reduce: Callable[[Any, _Event], Any]
+    render: Callable[[Any], _Frame]
+    resolve: Callable[[Any, Any], Any]
+    farewell: str = ""
+    question: Optional[str] = None
+
+
+class _PromptState:
+    """The state of a prompt, changed by the reducer of its core.
+
+    Attributes:
+        done (bool): Whether the prompt has been answered.
+        result: The answer, once the prompt is done.
+    """
+
+    def __init__(self) -> None:
+        """Start an unanswered prompt."""
+        self.done = False
+        self.result: Any = None
+
+    def finish(self, result: Any) -> None:
+        """Answer the prompt.
+
+        Args:
+            result: The answer.
+        """
+        self.done = True
+        self.result = result
+
+
+def _run_prompt(
+    prompt: Callable[..., Any],
+    make_core: Callable[..., "PromptCore"],
+    args: Tuple[Any, ...],
+    on_frame: Optional[Callable[[FrameStats], None]],
+    fullscreen: bool,
+    backend: Optional[Backend],
+    answer_key: Optional[str],
+    timeout: Optional[float],
+    cancel: Optional[CancelToken],
+) -> Any:
+    """Run a prompt until it is done.
+
+    Keys are read from the backend and fed to the steps of the prompt until
+    it is done.
+
+    Prompts using the terminal are answered headless when there is none, or
+    shown by the broker of another process after forward_prompts.
+
+    Prompts given a `timeout` in seconds or a CancelToken as `cancel` wait
+    for keys with the backend, so they stop when the time is up or the token
+    is cancelled even though no key is pressed. A prompt that times out
+    returns what confirming it would return at that moment, or raises
+    PromptTimeoutError if that is not allowed, as for select_tree. Cancelled
+    prompts raise PromptCancelledError. Either way the screen is restored.
+
+    Args:
+        prompt (Callable[..., Any]): The public prompt function.
+        make_core (Callable[..., PromptCore]): Creates the core of the
+            prompt from the arguments.
+        args (Tuple[Any, ...]): The arguments of the prompt, except those
+            of running it.
+        on_frame (Callable[[FrameStats], None], optional): Called with the
+            statistics of every frame drawn.
+        fullscreen (bool): Draw the prompt on the alternate screen.
+        backend (Backend, optional): The terminal to run in.
+        answer_key (str, optional): The key of the answer when answered
+            headless.
+        timeout (float, optional): The seconds until the prompt times out.
+        cancel (CancelToken, optional): The token cancelling the prompt.
+
+    Returns:
+        Any: The result of the prompt.
+    """
+    if backend is None and _prompt_forwarder is not None:
+        return _prompt_forwarder.ask(
+            prompt,
+            *args,
+            on_frame=on_frame,
+            fullscreen=fullscreen,
+            answer_key=answer_key,
+            timeout=timeout,
+            cancel=cancel,
+        )
+    core = make_core(*args)
+    if backend is None and _is_headless():
+        return _answer_headless(prompt.__name__, core, answer_key)
+    backend = backend or TerminalBackend()
+    stop_at = None if timeout is None else time.monotonic() + timeout
+    steps = _prompt_steps(
+        prompt.__name__, core, backend, on_frame, fullscreen, stop_at, cancel
+    )
+    try:
+        wait = next(steps)
+        while True:
+            dismissed = wait and not _wait_for_key(backend, stop_at, cancel)
+            wait = steps.send(_DISMISSED if dismissed else backend.readkey())
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+# Sent to the steps of a prompt instead of a key when it is dismissed
+_DISMISSED = object()
+
+
+def _prompt_steps(
+    prompt: str,
+    core: PromptCore,
+    backend: Backend,
+    on_frame: Optional[Callable[[FrameStats], None]],
+    fullscreen: bool,
+    stop_at: Optional[float],
+    cancel: Optional[CancelToken],
+) -> Generator[bool, Any, Any]:
+    """Show a prompt, applying the keys sent in until it is done.
+
+    This is all of running a prompt but reading keys, which the synchronous
+    and the asynchronous prompts do differently. Keys are applied to the
+    state of the core until it is done. All keys typed ahead are applied
+    before the next frame is rendered and drawn, so holding a key down does
+    not make the prompt lag behind. The answer is drawn in any case. When
+    the screen is resized, its new size is applied instead of a key, which
+    lays the state out anew.
+
+    Args:
+        prompt (str): The name of the prompt.
+        core (PromptCore): The core of the prompt.
+        backend (Backend): The terminal to run in.
+        on_frame (Callable[[FrameStats], None], optional): Called with the
+            statistics of every frame drawn.
+        fullscreen (bool): Draw the prompt on the alternate screen.
+        stop_at (float, optional): When the prompt times out.
+        cancel (CancelToken, optional): The token cancelling the prompt.
+
+    Yields:
+        bool: Whether to wait for a key before reading it, as the prompt is
+            dismissed if none comes in time. A key is sent in next, None if
+            the screen was resized or _DISMISSED if the prompt was dismissed.
+
+    Returns:
+        Any: The result of the prompt.
+    """
+    dismissible = stop_at is not None or cancel is not None
+    screen = _Screen(prompt, on_frame, fullscreen, backend)
+    with backend:
+        try:
+            state = core.reduce(core.state, backend.size())
+            screen.draw(core.render(state))
+            # Whether the frames of keys typed ahead have been skipped
+            skipped = False
+            while not state.done:
+                keypress = yield dismissible and not backend.pending()
+                if keypress is _DISMISSED:
+                    result = _answer_dismissed(prompt, core, state, cancel)
+                    screen.finish(core.farewell)
+                    return result
+                if keypress is None:
+                    state = core.reduce(state, backend.size())
+                else:
+                    screen.key_applied()
+                    state = core.reduce(state, keypress)
+                if state.done:
+                    if skipped:
+                        screen.draw(core.render(state))
+                elif backend.pending():
+                    skipped = True
+                else:
+                    screen.draw(core.render(state))
+                    skipped = False
+            screen.finish(core.farewell)
+            return state.result
+        finally:
+            screen.close()
+
+
+def _prompt_async(prompt: Callable[..., _T]) -> Callable[..., Awaitable[_T]]:
+    """Create a coroutine function running a prompt in an event loop.
+
+    Keys are read without blocking the event loop, so other tasks keep
+    running while the user decides.
+
+    Args:
+        prompt (Callable[..., _T]): A prompt that has a core.
+
+    Returns:
+        Callable[..., Awaitable[_T]]: The coroutine function.
     """
 
-    interrupt: List[str] = [readchar.key.CTRL_C, readchar.key.CTRL_D]
-    select: List[str] = [readchar.key.SPACE]
-    confirm: List[str] = [readchar.key.ENTER]
-    delete: List[str] = [readchar.key.BACKSPACE]
-    down: List[str] = [readchar.key.DOWN, "j"]
-    up: List[str] = [readchar.key.UP, "k"]
+    @functools.wraps(prompt)
+    async def run_prompt(
+        *args,
+        on_frame: Optional[Callable[[FrameStats], None]] = None,
+        fullscreen: bool = False,
+        backend: Optional[Backend] = None,
+        answer_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        cancel: Optional[CancelToken] = None,
+        **kwargs,
+    ) -> _T:
+        if backend is None and _prompt_forwarder is not None:
+            ask = functools.partial(
+                _prompt_forwarder.ask,
+                prompt,
+                *args,
+                on_frame=on_frame,
+                fullscreen=fullscreen,
+                answer_key=answer_key,
+                timeout=timeout,
+                cancel=cancel,
+                **kwargs,
+            )
+            import asyncio
+
+            return await asyncio.get_event_loop().run_in_executor(None, ask)
+        core = prompt_core(prompt, *args, **kwargs)
+        if backend is None and _is_headless():
+            return _answer_headless(prompt.__name__, core, answer_key)
+        backend = backend or _AsyncTerminalBackend()
+        stop_at = None if timeout is None else time.monotonic() + timeout
+        steps = _prompt_steps(
+            prompt.__name__, core, backend, on_frame, fullscreen, stop_at, cancel
+        )
+        try:
+            wait = next(steps)
+            while True:
+                dismissed = wait and not await _wait_for_key_async(
+                    backend, stop_at, cancel
+                )
+                keypress = _DISMISSED if dismissed else await backend.readkey_async()
+                wait = steps.send(keypress)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            steps.close()
+
+    run_prompt.__name__ = run_prompt.__qualname__ = f"{prompt.__name__}_async"
+    run_prompt.__doc__ = (
+        f"Awaitable version of {prompt.__name__}, taking the same arguments."
+    )
+    return run_prompt
+
+
+def _input(prompt: str) -> str:
+    """Read a line in the original terminal mode, even during a session.
+
+    Args:
+        prompt (str): The prompt.
+
+    Returns:
+        str: The line.
+    """
+    with _key_reader().suspended():
+        return input(prompt)
+
+
+def _resolve_number(
+    answer: Any,
+    min_value: Optional[float],
+    max_value: Optional[float],
+    allow_float: bool,
+) -> Optional[float]:
+    """Check the answer given to get_number answered headless.
+
+    Args:
+        answer (float | str, optional): The answer.
+        min_value (float, optional): The [inclusive] minimum value.
+        max_value (float, optional): The [inclusive] maximum value.
+        allow_float (bool): Allow floats or force integers.
+
+    Returns:
+        Optional[float]: The number, None if there is no answer.
+
+    Raises:
+        ValueError: If the answer is not a valid number.
+    """
+    if answer is None:
+        return None
+    try:
+        value = float(answer)
+    except (TypeError, ValueError):
+        raise ValueError(f"{answer!r} is not a valid number") from None
+    if not allow_float and value != int(value):
+        raise ValueError(f"{answer!r} has to be an integer")
+    if min_value is not None and value < min_value:
+        raise ValueError(f"{answer!r} has to be at least {min_value}")
+    if max_value is not None and value > max_value:
+        raise ValueError(f"{answer!r} has to be at most {max_value}")
+    return value if allow_float else int(value)
 
 
 def get_number(
@@ -42,6 +2894,10 @@ def get_number(
     min_value: Optional[float] = None,
     max_value: Optional[float] = None,
     allow_float: bool = True,
+    backend: Optional[Backend] = None,
+    answer_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
 ) -> float:
     """Get a number from user input.
     If an invalid number is entered the user will be prompted again.
@@ -51,115 +2907,797 @@ def get_number(
         min_value (float, optional): The [inclusive] minimum value.
         max_value (float, optional): The [inclusive] maximum value.
         allow_float (bool, optional): Allow floats or force integers.
+        backend (Backend, optional): The terminal to ask in. Defaults to the
+            one the program runs in.
+        answer_key (str, optional): The key of the answer when answered
+            headless. The prompt is used otherwise.
+        timeout (float, optional): The seconds to wait for a valid number.
+        cancel (CancelToken, optional): The token cancelling the prompt.
 
     Returns:
         float: The number input by the user.
+
+    Raises:
+        PromptTimeoutError: If no valid number was entered in time.
+        PromptCancelledError: If the token was cancelled.
     """
+    if backend is None and _prompt_forwarder is not None:
+        return _prompt_forwarder.ask(
+            get_number,
+            prompt,
+            min_value,
+            max_value,
+            allow_float,
+            answer_key=answer_key,
+            timeout=timeout,
+            cancel=cancel,
+        )
+    if backend is None and _is_headless():
+        number = _resolve_number(
+            _scripted_answer(answer_key, prompt), min_value, max_value, allow_float
+        )
+        if number is None:
+            raise _missing_answer("get_number", answer_key, prompt)
+        return number
+    backend = backend or TerminalBackend()
+    stop_at = None if timeout is None else time.monotonic() + timeout
     return_value: Optional[float] = None
     while return_value is None:
-        input_value = input(prompt + " ")
+        input_value = backend.readline(prompt + " ", True, _time_left(stop_at), cancel)
         try:
             return_value = float(input_value)
         except ValueError:
-            print("Not a valid number.\033[K\033[1A\r\033[K", end="")
+            backend.write("Not a valid number.\033[K\033[1A\r\033[K")
         if not allow_float and return_value is not None:
             if return_value != int(return_value):
-                print("Has to be an integer.\033[K\033[1A\r\033[K", end="")
+                backend.write("Has to be an integer.\033[K\033[1A\r\033[K")
                 return_value = None
         if min_value is not None and return_value is not None:
             if return_value < min_value:
-                print(f"Has to be at least {min_value}.\033[K\033[1A\r\033[K", end="")
+                backend.write(f"Has to be at least {min_value}.\033[K\033[1A\r\033[K")
                 return_value = None
         if max_value is not None and return_value is not None:
             if return_value > max_value:
-                print(f"Has to be at most {max_value}.\033[1A\r\033[K", end="")
+                backend.write(f"Has to be at most {max_value}.\033[1A\r\033[K")
                 return_value = None
         if return_value is not None:
             break
-    print("\033[K", end="")
+    backend.write("\033[K")
     if allow_float:
         return return_value
     return int(return_value)
 
 
-def secure_input(prompt: str) -> str:
-    """Get secure input without showing it in the command line.
+def secure_input(
+    prompt: str,
+    backend: Optional[Backend] = None,
+    answer_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+) -> str:
+    """Get secure input without showing it in the command line.
+
+    Args:
+        prompt (str): The prompt asking the user to input.
+        backend (Backend, optional): The terminal to ask in. Defaults to the
+            one the program runs in.
+        answer_key (str, optional): The key of the answer when answered
+            headless. The prompt is used otherwise.
+        timeout (float, optional): The seconds to wait for the input.
+        cancel (CancelToken, optional): The token cancelling the prompt.
+
+    Returns:
+        str: The secure input.
+
+    Raises:
+        PromptTimeoutError: If nothing was entered in time.
+        PromptCancelledError: If the token was cancelled.
+    """
+    if backend is None and _prompt_forwarder is not None:
+        return _prompt_forwarder.ask(
+            secure_input, prompt, answer_key=answer_key, timeout=timeout, cancel=cancel
+        )
+    if backend is None and _is_headless():
+        answer = _scripted_answer(answer_key, prompt)
+        if answer is None:
+            raise _missing_answer("secure_input", answer_key, prompt)
+        return str(answer)
+    return (backend or TerminalBackend()).readline(prompt + " ", False, timeout, cancel)
+
+
+class _ListState(_PromptState):
+    """The state of a prompt choosing from a list of options.
+
+    Attributes:
+        source (_Options): The options loaded so far.
+        captions (Set[int]): The non-selectable indices.
+        search (_Filter, optional): The filter if the options are filterable.
+        keymap (Keymap): The key bindings.
+        max_height (int, optional): The maximal number of lines of options.
+        cursor (int): The index of the option under the cursor.
+        match_index (int): The position of the cursor among the matches
+            while filtering.
+        available (int): The number of lines the options may occupy.
+        height (int): The number of options shown at once.
+        top (int): The position of the first option shown.
+        windowed (bool): Whether the options scroll.
+    """
+
+    def __init__(
+        self,
+        options: _OptionSource,
+        caption_indices: Optional[List[int]],
+        cursor: int,
+        max_height: Optional[int],
+        filterable: bool,
+        keymap: Optional[Keymap],
+        has_confirm: bool = False,
+    ) -> None:
+        """Start choosing from the options.
+
+        Args:
+            options (List[str] | LazyOptions | Iterable[str] | Callable): The
+                options.
+            caption_indices (List[int], optional): Non-selectable indices.
+            cursor (int): The index the cursor starts at.
+            max_height (int, optional): The maximal number of lines.
+            filterable (bool): Whether typing filters the options.
+            keymap (Keymap, optional): The key bindings.
+            has_confirm (bool, optional): Whether a confirm button follows
+                the last option.
+        """
+        super().__init__()
+        # Sets keep the membership tests in the render loop constant time
+        self.captions = set() if caption_indices is None else set(caption_indices)
+        self.source = _Options(_as_options(options), self.captions, has_confirm)
+        self.search = _Filter(self.source, self.captions) if filterable else None
+        self.keymap = keymap or Keymap()
+        self.max_height = max_height
+        self.source.load(cursor + 1)
+        self.cursor = cursor
+        self.match_index = 0
+        self.available = 0
+        self.height = 0
+        self.top = 0
+        self.windowed = False
+
+
+def _lay_out_list(state: _ListState, event: _Event) -> None:
+    """Fit the options shown to the lines available after an event.
+
+    Args:
+        state (_ListState): The state laid out.
+        event (str | os.terminal_size): The keypress applied or the size of
+            the terminal.
+    """
+    source = state.source
+    if not isinstance(event, str):
+        # The filter line takes one of the lines
+        state.available = _available_lines(state.max_height, event) - (
+            0 if state.search is None else 1
+        )
+    source.load(state.available + 1)
+    state.height = _viewport_height(source.count, state.available)
+    state.windowed = state.height < source.count
+    matches = None if state.search is None else state.search.matches
+    if matches is None:
+        state.top = _scroll_viewport(
+            state.top, state.cursor, state.height, source.count
+        )
+        source.load(state.top + state.height + 1)
+    else:
+        state.top = max(
+            _scroll_viewport(state.top, state.match_index, state.height, len(matches)),
+            0,
+        )
+
+
+def _visible_options(state: _ListState) -> Tuple[Sequence[int], Optional[int]]:
+    """Get the options shown and how many are hidden below them.
+
+    Args:
+        state (_ListState): The state.
+
+    Returns:
+        Tuple[Sequence[int], Optional[int]]: The indices of the options shown
+            and the number of options below them, None if unknown.
+    """
+    top, height = state.top, state.height
+    if state.search is None or state.search.matches is None:
+        return range(top, top + height), _hidden_below(state.source, top + height)
+    matches = state.search.matches
+    rows = matches[top : top + height]
+    return rows, len(matches) - top - len(rows)
+
+
+def _apply_query_key(state: _ListState, keypress: str, action: Optional[str]) -> bool:
+    """Apply a keypress to the filter of a list, if it edits the query.
+
+    Args:
+        state (_ListState): The state.
+        keypress (str): The keypress.
+        action (str, optional): The action bound to the keypress.
+
+    Returns:
+        bool: Whether the keypress edited the query.
+    """
+    search = state.search
+    if search is None or not (
+        action == "delete" or _is_query_character(keypress, action)
+    ):
+        return False
+    if action == "delete":
+        search.pop()
+    else:
+        search.push(keypress)
+    state.match_index = 0
+    if search.matches:
+        state.cursor = search.matches[0]
+    return True
+
+
+def _option_index(state: _ListState, answer: Any) -> int:
+    """Get the index of the option an answer given to a prompt names.
+
+    Args:
+        state (_ListState): The state of the prompt.
+        answer (int | str): The index or the text of the option.
+
+    Returns:
+        int: The index.
+
+    Raises:
+        ValueError: If no selectable option has the index or the text.
+    """
+    source, captions = state.source, state.captions
+    if isinstance(answer, str):
+        source.load(sys.maxsize)
+        for i in range(source.count):
+            if source[i] == answer and i not in captions:
+                return i
+        raise ValueError(f"No option is {answer!r}")
+    if not isinstance(answer, int) or isinstance(answer, bool):
+        raise ValueError(f"{answer!r} is neither an index nor an option")
+    source.load(answer + 1)
+    if not 0 <= answer < source.count or answer in captions:
+        raise ValueError(f"{answer} is not the index of an option")
+    return answer
+
+
+class _SelectState(_ListState):
+    """The state of select.
+
+    The attributes not inherited are the arguments of select of the same name.
+    """
+
+    def __init__(
+        self,
+        options: _OptionSource,
+        caption_indices: Optional[List[int]],
+        deselected_prefix: str,
+        selected_prefix: str,
+        caption_prefix: str,
+        selected_index: int,
+        confirm_on_select: bool,
+        max_height: Optional[int],
+        filterable: bool,
+        filter_prefix: str,
+        keymap: Optional[Keymap],
+    ) -> None:
+        """Start the prompt, taking the arguments of select."""
+        super().__init__(
+            options, caption_indices, selected_index, max_height, filterable, keymap
+        )
+        self.deselected_prefix = deselected_prefix
+        self.selected_prefix = selected_prefix
+        self.caption_prefix = caption_prefix
+        self.confirm_on_select = confirm_on_select
+        self.filter_prefix = filter_prefix
+
+
+def _reduce_select(state: _SelectState, event: _Event) -> _SelectState:
+    """Apply a keypress to the state of select.
 
     Args:
-        prompt (str): The prompt asking the user to input.
+        state (_SelectState): The state, which is changed.
+        event (str | os.terminal_size): The keypress or the size of the
+            terminal to lay the state out for.
 
     Returns:
-        str: The secure input.
+        _SelectState: The changed state.
+    """
+    if isinstance(event, str):
+        keypress = event
+        action = state.keymap.action(keypress)
+        matches = None if state.search is None else state.search.matches
+        if _apply_query_key(state, keypress, action):
+            pass
+        elif action in _CURSOR_ACTIONS:
+            if matches is None:
+                state.cursor = _move(state.source, state.cursor, action, state.height)
+            elif matches:
+                state.match_index = _move_position(
+                    state.match_index, action, state.height, len(matches) - 1
+                )
+                state.cursor = matches[state.match_index]
+        elif action == "confirm" or state.confirm_on_select and action == "select":
+            # Nothing can be chosen while no option matches
+            if matches is None or matches:
+                state.finish(state.cursor)
+        elif action == "interrupt":
+            raise KeyboardInterrupt
+    _lay_out_list(state, event)
+    return state
+
+
+def _render_select(state: _SelectState) -> _Frame:
+    """Get the frame showing the state of select.
+
+    Args:
+        state (_SelectState): The state.
+
+    Returns:
+        _Frame: The frame.
+    """
+    source, captions = state.source, state.captions
+    rows, hidden_below = _visible_options(state)
+    lines = []
+    if state.search is not None:
+        lines.append(state.filter_prefix + state.search.query)
+    if state.windowed:
+        lines.append(_scroll_indicator(state.top, "^"))
+    for i in rows:
+        if i in captions:
+            lines.append(state.caption_prefix + source[i])
+        elif i == state.cursor:
+            lines.append(state.selected_prefix + source[i])
+        else:
+            lines.append(state.deselected_prefix + source[i])
+    lines.extend([""] * (state.height - len(rows)))
+    if state.windowed:
+        lines.append(_scroll_indicator(hidden_below, "v"))
+    return lines, None
+
+
+def _resolve_select(state: _SelectState, answer: Any) -> Optional[int]:
+    """Get the result of select answered headless.
+
+    Args:
+        state (_SelectState): The state the prompt starts in.
+        answer (int | str, optional): The index or the text of the option.
+
+    Returns:
+        Optional[int]: The index, the one selected at first by default. None
+            if the filter matches no option, as then nothing can be chosen.
     """
-    return getpass.getpass(prompt + " ")
+    if answer is not None:
+        return _option_index(state, answer)
+    if state.search is not None and state.search.matches == []:
+        return None
+    try:
+        return _option_index(state, state.cursor)
+    except ValueError:
+        return None
+
+
+def _select_core(
+    options: _OptionSource,
+    caption_indices: Optional[List[int]],
+    deselected_prefix: str,
+    selected_prefix: str,
+    caption_prefix: str,
+    selected_index: int,
+    confirm_on_select: bool,
+    max_height: Optional[int],
+    filterable: bool,
+    filter_prefix: str,
+    keymap: Optional[Keymap],
+) -> PromptCore:
+    """Create the core of select from the arguments that shape it."""
+    state = _SelectState(
+        options,
+        caption_indices,
+        deselected_prefix,
+        selected_prefix,
+        caption_prefix,
+        selected_index,
+        confirm_on_select,
+        max_height,
+        filterable,
+        filter_prefix,
+        keymap,
+    )
+    return PromptCore(state, _reduce_select, _render_select, _resolve_select)
 
 
 def select(
-    options: List[str],
+    options: _OptionSource,
     caption_indices: Optional[List[int]] = None,
     deselected_prefix: str = "\033[1m[ ]\033[0m ",
     selected_prefix: str = "\033[1m[\033[32;1mx\033[0;1m]\033[0m ",
     caption_prefix: str = "",
     selected_index: int = 0,
     confirm_on_select: bool = True,
+    max_height: Optional[int] = None,
+    filterable: bool = False,
+    filter_prefix: str = "\033[2m/\033[0m ",
+    keymap: Optional[Keymap] = None,
+    *,
+    on_frame: Optional[Callable[[FrameStats], None]] = None,
+    fullscreen: bool = False,
+    backend: Optional[Backend] = None,
+    answer_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
 ) -> int:
     """Select an option from a list.
 
     Args:
-        options (List[str]): The options to select from.
+        options (List[str] | LazyOptions | Iterable[str] | Callable): The
+            options to select from. Lazy options, iterators and page fetchers
+            as taken by LazyOptions are only loaded as far as displayed.
         caption_indices (List[int], optional): Non-selectable indices.
         deselected_prefix (str, optional): Prefix for deselected option ([ ]).
         selected_prefix (str, optional): Prefix for selected option ([x]).
         caption_prefix (str, optional): Prefix for captions ().
         selected_index (int, optional): The index to be selected at first.
         confirm_on_select (bool, optional): Select keys also confirm.
+        max_height (int, optional): The maximal number of lines the options
+            may occupy. Longer lists scroll. Defaults to the terminal height
+            minus two lines, leaving room for the question above.
+        filterable (bool, optional): Typing filters the options, showing
+            only those containing the typed characters in order. Letters are
+            no longer used for moving the cursor.
+        filter_prefix (str, optional): Prefix for the filter line (/).
+        keymap (Keymap, optional): The key bindings. Defaults to DefaultKeys.
+        on_frame (Callable[[FrameStats], None], optional): Called with the
+            statistics of every frame drawn.
+        fullscreen (bool, optional): Draw the prompt on the alternate screen
+            of the terminal, which is restored afterwards, instead of below
+            the cursor. The scrollback is not touched.
+        backend (Backend, optional): The terminal to run in. Defaults to the
+            one the program runs in.
+        answer_key (str, optional): The key of the answer when answered
+            headless.
+        timeout (float, optional): The seconds after which the prompt
+            returns the option under the cursor.
+        cancel (CancelToken, optional): The token cancelling the prompt.
 
     Returns:
         int: The index that has been selected.
     """
-    print("\n" * (len(options) - 1))
-    if caption_indices is None:
-        caption_indices = []
-    while True:
-        print(f"\033[{len(options) + 1}A")
-        for i, option in enumerate(options):
-            if i not in caption_indices:
-                print(
-                    "\033[K{}{}".format(
-                        selected_prefix if i == selected_index else deselected_prefix,
-                        option,
-                    )
-                )
-            elif i in caption_indices:
-                print("\033[K{}{}".format(caption_prefix, options[i]))
-        keypress = readchar.readkey()
-        if keypress in DefaultKeys.up:
-            new_index = selected_index
-            while new_index > 0:
-                new_index -= 1
-                if new_index not in caption_indices:
-                    selected_index = new_index
-                    break
-        elif keypress in DefaultKeys.down:
-            new_index = selected_index
-            while new_index < len(options) - 1:
-                new_index += 1
-                if new_index not in caption_indices:
-                    selected_index = new_index
-                    break
-        elif (
-            keypress in DefaultKeys.confirm
-            or confirm_on_select
-            and keypress in DefaultKeys.select
+    return _run_prompt(
+        select,
+        _select_core,
+        (
+            options,
+            caption_indices,
+            deselected_prefix,
+            selected_prefix,
+            caption_prefix,
+            selected_index,
+            confirm_on_select,
+            max_height,
+            filterable,
+            filter_prefix,
+            keymap,
+        ),
+        on_frame,
+        fullscreen,
+        backend,
+        answer_key,
+        timeout,
+        cancel,
+    )
+
+
+class _SelectMultipleState(_ListState):
+    """The state of select_multiple.
+
+    Attributes:
+        ticked (Dict[int, None]): The ticked indices in the order of ticking.
+        error_message (str): Why the last key could not be applied, if so.
+        range_start (int, optional): Where the range being ticked with shift
+            and the arrow keys started.
+        range_ticked (Set[int]): The indices the range ticked.
+
+    The other attributes not inherited are the arguments of select_multiple
+    of the same name.
+    """
+
+    def __init__(
+        self,
+        options: _OptionSource,
+        caption_indices: Optional[List[int]],
+        deselected_unticked_prefix: str,
+        deselected_ticked_prefix: str,
+        selected_unticked_prefix: str,
+        selected_ticked_prefix: str,
+        caption_prefix: str,
+        ticked_indices: Optional[List[int]],
+        cursor_index: int,
+        minimal_count: int,
+        maximal_count: Optional[int],
+        hide_confirm: bool,
+        deselected_confirm_label: str,
+        selected_confirm_label: str,
+        max_height: Optional[int],
+        filterable: bool,
+        filter_prefix: str,
+        keymap: Optional[Keymap],
+    ) -> None:
+        """Start the prompt, taking the arguments of select_multiple."""
+        super().__init__(
+            options,
+            caption_indices,
+            cursor_index,
+            max_height,
+            filterable,
+            keymap,
+            has_confirm=not hide_confirm,
+        )
+        self.deselected_unticked_prefix = deselected_unticked_prefix
+        self.deselected_ticked_prefix = deselected_ticked_prefix
+        self.selected_unticked_prefix = selected_unticked_prefix
+        self.selected_ticked_prefix = selected_ticked_prefix
+        self.caption_prefix = caption_prefix
+        self.minimal_count = minimal_count
+        self.maximal_count = maximal_count
+        self.hide_confirm = hide_confirm
+        self.deselected_confirm_label = deselected_confirm_label
+        self.selected_confirm_label = selected_confirm_label
+        self.filter_prefix = filter_prefix
+        self.ticked: Dict[int, None] = dict.fromkeys(ticked_indices or [])
+        self.error_message = ""
+        self.range_start: Optional[int] = None
+        self.range_ticked: Set[int] = set()
+
+
+def _reduce_select_multiple(
+    state: _SelectMultipleState, event: _Event
+) -> _SelectMultipleState:
+    """Apply a keypress to the state of select_multiple.
+
+    Args:
+        state (_SelectMultipleState): The state, which is changed.
+        event (str | os.terminal_size): The keypress or the size of the
+            terminal to lay the state out for.
+
+    Returns:
+        _SelectMultipleState: The changed state.
+    """
+    if not isinstance(event, str):
+        _lay_out_list(state, event)
+        return state
+    keypress = event
+    source, captions, ticked = state.source, state.captions, state.ticked
+    minimal_count, maximal_count = state.minimal_count, state.maximal_count
+    hide_confirm, height = state.hide_confirm, state.height
+    matches = None if state.search is None else state.search.matches
+    # The confirm button follows the last option
+    on_confirm = not hide_confirm and state.cursor == source.count
+    state.error_message = ""
+    action = state.keymap.action(keypress)
+    if action not in ("range_down", "range_up"):
+        state.range_start = None
+    if _apply_query_key(state, keypress, action):
+        new_matches = state.search.matches  # type: ignore
+        if new_matches is not None and not new_matches and not hide_confirm:
+            state.cursor = source.count
+    elif action in ("range_down", "range_up"):
+        if state.range_start is None:
+            state.range_start = state.cursor
+            state.range_ticked = set()
+        direction = "down" if action == "range_down" else "up"
+        if matches is None:
+            state.cursor = _move(source, state.cursor, direction, height)
+        elif matches:
+            state.match_index = _move_position(
+                state.match_index, direction, height, len(matches) - 1
+            )
+            state.cursor = matches[state.match_index]
+        span = _range_span(source, captions, matches, state.range_start, state.cursor)
+        newly_ticked = [i for i in span if i not in ticked]
+        # Options the range no longer covers are unticked again
+        state.error_message = _tick_many(
+            ticked,
+            newly_ticked,
+            state.range_ticked.difference(span),
+            minimal_count,
+            maximal_count,
+        )
+        if not state.error_message:
+            state.range_ticked = state.range_ticked.intersection(span).union(
+                newly_ticked
+            )
+    elif action in ("tick_all", "untick_all", "invert", "tick_group"):
+        # The operations apply to the options shown, i.e. the matches
+        if action == "tick_group":
+            shown: Sequence[int] = _caption_group(source, captions, state.cursor)
+            if matches is not None:
+                matched = set(matches)
+                shown = [i for i in shown if i in matched]
+        elif matches is None:
+            source.load(sys.maxsize)
+            shown = [i for i in range(source.count) if i not in captions]
+        else:
+            shown = matches
+        tick: Sequence[int]
+        untick: Sequence[int]
+        if action == "tick_all" or (
+            action == "tick_group" and any(i not in ticked for i in shown)
         ):
-            break
-        elif keypress in DefaultKeys.interrupt:
-            raise KeyboardInterrupt
-    return selected_index
+            tick, untick = shown, []
+        elif action == "invert":
+            tick = [i for i in shown if i not in ticked]
+            untick = [i for i in shown if i in ticked]
+        else:
+            tick, untick = [], shown
+        state.error_message = _tick_many(
+            ticked, tick, untick, minimal_count, maximal_count
+        )
+    elif matches is not None and action in _CURSOR_ACTIONS:
+        last_index = len(matches) - (1 if hide_confirm else 0)
+        state.match_index = _move_position(
+            state.match_index, action, height, last_index
+        )
+        if state.match_index < len(matches):
+            state.cursor = matches[state.match_index]
+        elif not hide_confirm:
+            state.cursor = source.count
+    elif action in _CURSOR_ACTIONS:
+        state.cursor = _move(source, state.cursor, action, height)
+    elif hide_confirm and action == "confirm" or on_confirm:
+        if minimal_count > len(ticked):
+            state.error_message = f"Must select at least {minimal_count} options"
+        elif maximal_count is not None and maximal_count < len(ticked):
+            state.error_message = f"Must select at most {maximal_count} options"
+        else:
+            state.finish(list(ticked))
+    elif action == "select" or not hide_confirm and action == "confirm":
+        # Nothing can be ticked while no option matches
+        if matches is not None and not matches:
+            pass
+        elif state.cursor in ticked:
+            del ticked[state.cursor]
+        else:
+            ticked[state.cursor] = None
+    elif action == "interrupt":
+        raise KeyboardInterrupt
+    _lay_out_list(state, event)
+    return state
+
+
+def _render_select_multiple(state: _SelectMultipleState) -> _Frame:
+    """Get the frame showing the state of select_multiple.
+
+    Args:
+        state (_SelectMultipleState): The state.
+
+    Returns:
+        _Frame: The frame.
+    """
+    source, captions, ticked = state.source, state.captions, state.ticked
+    rows, hidden_below = _visible_options(state)
+    lines = []
+    if state.search is not None:
+        lines.append(state.filter_prefix + state.search.query)
+    if state.windowed:
+        lines.append(_scroll_indicator(state.top, "^"))
+    for i in rows:
+        prefix = ""
+        if i in captions:
+            prefix = state.caption_prefix
+        elif i == state.cursor:
+            if i in ticked:
+                prefix = state.selected_ticked_prefix
+            else:
+                prefix = state.selected_unticked_prefix
+        else:
+            if i in ticked:
+                prefix = state.deselected_ticked_prefix
+            else:
+                prefix = state.deselected_unticked_prefix
+        lines.append(prefix + source[i])
+    lines.extend([""] * (state.height - len(rows)))
+    if state.windowed:
+        lines.append(_scroll_indicator(hidden_below, "v"))
+    if state.hide_confirm:
+        lines.append(state.error_message)
+    elif state.cursor == source.count:
+        lines.append(f"{state.selected_confirm_label} {state.error_message}")
+    else:
+        lines.append(f"{state.deselected_confirm_label} {state.error_message}")
+    return lines, len(lines) - 1
+
+
+def _resolve_select_multiple(
+    state: _SelectMultipleState, answer: Any
+) -> Optional[List[int]]:
+    """Get the result of select_multiple answered headless.
+
+    Args:
+        state (_SelectMultipleState): The state the prompt starts in.
+        answer (List[int | str], optional): The indices or the texts of the
+            options to tick.
+
+    Returns:
+        Optional[List[int]]: The indices, those ticked at first by default
+            if they are enough.
+
+    Raises:
+        ValueError: If the answer names no option or too few or many.
+    """
+    if answer is None:
+        ticked = list(state.ticked)
+    else:
+        if isinstance(answer, (int, str)):
+            answer = [answer]
+        ticked = list(dict.fromkeys(_option_index(state, i) for i in answer))
+    error_message = ""
+    if state.minimal_count > len(ticked):
+        error_message = f"Must select at least {state.minimal_count} options"
+    elif state.maximal_count is not None and state.maximal_count < len(ticked):
+        error_message = f"Must select at most {state.maximal_count} options"
+    if not error_message:
+        return ticked
+    if answer is None:
+        return None
+    raise ValueError(error_message)
+
+
+def _select_multiple_core(
+    options: _OptionSource,
+    caption_indices: Optional[List[int]],
+    deselected_unticked_prefix: str,
+    deselected_ticked_prefix: str,
+    selected_unticked_prefix: str,
+    selected_ticked_prefix: str,
+    caption_prefix: str,
+    ticked_indices: Optional[List[int]],
+    cursor_index: int,
+    minimal_count: int,
+    maximal_count: Optional[int],
+    hide_confirm: bool,
+    deselected_confirm_label: str,
+    selected_confirm_label: str,
+    max_height: Optional[int],
+    filterable: bool,
+    filter_prefix: str,
+    keymap: Optional[Keymap],
+) -> PromptCore:
+    """Create the core of select_multiple from the arguments that shape it."""
+    state = _SelectMultipleState(
+        options,
+        caption_indices,
+        deselected_unticked_prefix,
+        deselected_ticked_prefix,
+        selected_unticked_prefix,
+        selected_ticked_prefix,
+        caption_prefix,
+        ticked_indices,
+        cursor_index,
+        minimal_count,
+        maximal_count,
+        hide_confirm,
+        deselected_confirm_label,
+        selected_confirm_label,
+        max_height,
+        filterable,
+        filter_prefix,
+        keymap,
+    )
+    return PromptCore(
+        state,
+        _reduce_select_multiple,
+        _render_select_multiple,
+        _resolve_select_multiple,
+        farewell="\r\033[K",
+    )
 
 
 def select_multiple(
-    options: List[str],
+    options: _OptionSource,
     caption_indices: Optional[List[int]] = None,
     deselected_unticked_prefix: str = "\033[1m( )\033[0m ",
     deselected_ticked_prefix: str = "\033[1m(\033[32mx\033[0;1m)\033[0m ",
@@ -173,11 +3711,24 @@ def select_multiple(
     hide_confirm: bool = True,
     deselected_confirm_label: str = "\033[1m(( confirm ))\033[0m",
     selected_confirm_label: str = "\033[1;32m{{ confirm }}\033[0m",
+    max_height: Optional[int] = None,
+    filterable: bool = False,
+    filter_prefix: str = "\033[2m/\033[0m ",
+    keymap: Optional[Keymap] = None,
+    *,
+    on_frame: Optional[Callable[[FrameStats], None]] = None,
+    fullscreen: bool = False,
+    backend: Optional[Backend] = None,
+    answer_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
 ) -> List[int]:
     """Select multiple options from a list.
 
     Args:
-        options (List[str]): The options to select from.
+        options (List[str] | LazyOptions | Iterable[str] | Callable): The
+            options to select from. Lazy options, iterators and page fetchers
+            as taken by LazyOptions are only loaded as far as displayed.
         caption_indices (List[int], optional): Non-selectable indices.
         deselected_unticked_prefix (str, optional): Prefix for lines that are
             not selected and not ticked (( )).
@@ -202,90 +3753,568 @@ def select_multiple(
             if not selected ((( confirm ))).
         selected_confirm_label (str, optional): The confirm label
             if selected ({{ confirm }}).
+        max_height (int, optional): The maximal number of lines the options
+            may occupy. Longer lists scroll. Defaults to the terminal height
+            minus two lines, leaving room for the question above.
+        filterable (bool, optional): Typing filters the options, showing
+            only those containing the typed characters in order. Letters are
+            no longer used for moving the cursor.
+        filter_prefix (str, optional): Prefix for the filter line (/).
+        keymap (Keymap, optional): The key bindings. Defaults to DefaultKeys.
+        on_frame (Callable[[FrameStats], None], optional): Called with the
+            statistics of every frame drawn.
+        fullscreen (bool, optional): Draw the prompt on the alternate screen
+            of the terminal, which is restored afterwards, instead of below
+            the cursor. The scrollback is not touched.
+        backend (Backend, optional): The terminal to run in. Defaults to the
+            one the program runs in.
+        answer_key (str, optional): The key of the answer when answered
+            headless.
+        timeout (float, optional): The seconds after which the prompt
+            returns the options ticked if they are enough.
+        cancel (CancelToken, optional): The token cancelling the prompt.
 
     Returns:
         List[int]: The indices that have been selected
     """
-    print("\n" * (len(options) - 1))
-    if caption_indices is None:
-        caption_indices = []
-    if ticked_indices is None:
-        ticked_indices = []
-    max_index = len(options) - (1 if hide_confirm else 0)
-    error_message = ""
-    while True:
-        print(f"\033[{len(options) + 1}A")
-        for i, option in enumerate(options):
-            prefix = ""
-            if i in caption_indices:
-                prefix = caption_prefix
-            elif i == cursor_index:
-                if i in ticked_indices:
-                    prefix = selected_ticked_prefix
-                else:
-                    prefix = selected_unticked_prefix
-            else:
-                if i in ticked_indices:
-                    prefix = deselected_ticked_prefix
-                else:
-                    prefix = deselected_unticked_prefix
-            print("\033[K{}{}".format(prefix, option))
-        if hide_confirm:
-            print(f"{error_message}\033[K", end="", flush=True)
-        else:
-            if cursor_index == max_index:
-                print(
-                    f"{selected_confirm_label} {error_message}\033[K",
-                    end="",
-                    flush=True,
-                )
+    return _run_prompt(
+        select_multiple,
+        _select_multiple_core,
+        (
+            options,
+            caption_indices,
+            deselected_unticked_prefix,
+            deselected_ticked_prefix,
+            selected_unticked_prefix,
+            selected_ticked_prefix,
+            caption_prefix,
+            ticked_indices,
+            cursor_index,
+            minimal_count,
+            maximal_count,
+            hide_confirm,
+            deselected_confirm_label,
+            selected_confirm_label,
+            max_height,
+            filterable,
+            filter_prefix,
+            keymap,
+        ),
+        on_frame,
+        fullscreen,
+        backend,
+        answer_key,
+        timeout,
+        cancel,
+    )
+
+
+class _SelectTreeState(_PromptState):
+    """The state of select_tree.
+
+    Attributes:
+        loaded (Dict[Tuple[int, ...], List[str]]): The children of every node
+            loaded so far, the roots being the children of the empty path.
+        expanded (Set[Tuple[int, ...]]): The paths of the expanded nodes.
+        rows (List[Tuple[int, ...]]): The paths of the nodes shown, in order.
+        cursor (int): The row of the cursor.
+        available (int): The number of lines the nodes may occupy.
+        height (int): The number of rows shown at once.
+        top (int): The first row shown.
+        windowed (bool): Whether the rows scroll.
+
+    The other attributes are the arguments of select_tree of the same name.
+    """
+
+    def __init__(
+        self,
+        roots: Sequence[str],
+        children: Callable[[List[int]], Iterable[str]],
+        deselected_prefix: str,
+        selected_prefix: str,
+        collapsed_prefix: str,
+        expanded_prefix: str,
+        leaf_prefix: str,
+        indent: str,
+        branches_selectable: bool,
+        max_height: Optional[int],
+        keymap: Optional[Keymap],
+    ) -> None:
+        """Start the prompt, taking the arguments of select_tree."""
+        super().__init__()
+        self.children = children
+        self.deselected_prefix = deselected_prefix
+        self.selected_prefix = selected_prefix
+        self.collapsed_prefix = collapsed_prefix
+        self.expanded_prefix = expanded_prefix
+        self.leaf_prefix = leaf_prefix
+        self.indent = indent
+        self.branches_selectable = branches_selectable
+        self.max_height = max_height
+        self.keymap = keymap or Keymap()
+        self.loaded: Dict[Tuple[int, ...], List[str]] = {(): list(roots)}
+        self.expanded: Set[Tuple[int, ...]] = set()
+        self.rows: List[Tuple[int, ...]] = [(i,) for i in range(len(self.loaded[()]))]
+        self.cursor = 0
+        self.available = 0
+        self.height = 0
+        self.top = 0
+        self.windowed = False
+
+
+def _expand_row(state: _SelectTreeState, row: int) -> None:
+    """Show the children of the node in a row, loading them if needed.
+
+    Args:
+        state (_SelectTreeState): The state.
+        row (int): The row.
+    """
+    path = state.rows[row]
+    if path in state.expanded:
+        return
+    if path not in state.loaded:
+        state.loaded[path] = list(state.children(list(path)))
+    state.expanded.add(path)
+    children = [path + (i,) for i in range(len(state.loaded[path]))]
+    state.rows[row + 1 : row + 1] = children
+
+
+def _collapse_row(state: _SelectTreeState, row: int) -> None:
+    """Hide the descendants of the node in a row.
+
+    Args:
+        state (_SelectTreeState): The state.
+        row (int): The row.
+    """
+    rows = state.rows
+    path = rows[row]
+    end = row + 1
+    while end < len(rows) and len(rows[end]) > len(path):
+        end += 1
+    state.expanded.difference_update(rows[row:end])
+    del rows[row + 1 : end]
+
+
+def _reduce_select_tree(state: _SelectTreeState, event: _Event) -> _SelectTreeState:
+    """Apply a keypress to the state of select_tree.
+
+    Args:
+        state (_SelectTreeState): The state, which is changed.
+        event (str | os.terminal_size): The keypress or the size of the
+            terminal to lay the state out for.
+
+    Returns:
+        _SelectTreeState: The changed state.
+    """
+    rows = state.rows
+    if not isinstance(event, str):
+        state.available = _available_lines(state.max_height, event)
+    else:
+        action = state.keymap.action(event)
+        if action == "interrupt":
+            raise KeyboardInterrupt
+        path = rows[state.cursor] if rows else ()
+        if not rows:
+            pass
+        elif action in _CURSOR_ACTIONS:
+            state.cursor = _move_position(
+                state.cursor, action, state.height, len(rows) - 1
+            )
+        elif action == "expand":
+            if path in state.expanded and state.loaded[path]:
+                state.cursor += 1
             else:
-                print(
-                    f"{deselected_confirm_label} {error_message}\033[K",
-                    end="",
-                    flush=True,
-                )
-        error_message = ""
-        keypress = readchar.readkey()
-        if keypress in DefaultKeys.up:
-            new_index = cursor_index
-            while new_index > 0:
-                new_index -= 1
-                if new_index not in caption_indices:
-                    cursor_index = new_index
-                    break
-        elif keypress in DefaultKeys.down:
-            new_index = cursor_index
-            while new_index + 1 <= max_index:
-                new_index += 1
-                if new_index not in caption_indices:
-                    cursor_index = new_index
-                    break
-        elif (
-            hide_confirm
-            and keypress in DefaultKeys.confirm
-            or not hide_confirm
-            and cursor_index == max_index
-        ):
-            if minimal_count > len(ticked_indices):
-                error_message = f"Must select at least {minimal_count} options"
-            elif maximal_count is not None and maximal_count < len(ticked_indices):
-                error_message = f"Must select at most {maximal_count} options"
+                _expand_row(state, state.cursor)
+        elif action == "collapse":
+            if path in state.expanded:
+                _collapse_row(state, state.cursor)
+            elif len(path) > 1:
+                # Move to the parent, the closest row above that is shallower
+                while len(rows[state.cursor]) >= len(path):
+                    state.cursor -= 1
+        elif action == "select":
+            if path in state.expanded:
+                _collapse_row(state, state.cursor)
             else:
-                break
-        elif (
-            keypress in DefaultKeys.select
-            or not hide_confirm
-            and keypress in DefaultKeys.confirm
-        ):
-            if cursor_index in ticked_indices:
-                ticked_indices.remove(cursor_index)
+                _expand_row(state, state.cursor)
+        elif action == "confirm":
+            if state.branches_selectable:
+                state.finish(list(path))
+            elif path in state.expanded:
+                _collapse_row(state, state.cursor)
             else:
-                ticked_indices.append(cursor_index)
-        elif keypress in DefaultKeys.interrupt:
-            raise KeyboardInterrupt
-    print("\r\033[K", end="", flush=True)
-    return ticked_indices
+                _expand_row(state, state.cursor)
+                if not state.loaded[path]:
+                    state.finish(list(path))
+    # The layout follows the size of the terminal
+    state.height = _viewport_height(len(rows), state.available)
+    state.windowed = state.height < len(rows)
+    state.top = _scroll_viewport(state.top, state.cursor, state.height, len(rows))
+    return state
+
+
+def _render_select_tree(state: _SelectTreeState) -> _Frame:
+    """Get the frame showing the state of select_tree.
+
+    Args:
+        state (_SelectTreeState): The state.
+
+    Returns:
+        _Frame: The frame.
+    """
+    loaded, rows, top, height = state.loaded, state.rows, state.top, state.height
+    visible_rows = rows[top : top + height]
+    lines = []
+    if state.windowed:
+        lines.append(_scroll_indicator(top, "^"))
+    for row, path in enumerate(visible_rows, top):
+        if path in loaded and not loaded[path]:
+            marker = state.leaf_prefix
+        elif path in state.expanded:
+            marker = state.expanded_prefix
+        else:
+            marker = state.collapsed_prefix
+        if row == state.cursor:
+            prefix = state.selected_prefix
+        else:
+            prefix = state.deselected_prefix
+        label = loaded[path[:-1]][path[-1]]
+        lines.append(f"{prefix}{state.indent * (len(path) - 1)}{marker}{label}")
+    lines.extend([""] * (height - len(visible_rows)))
+    if state.windowed:
+        lines.append(_scroll_indicator(len(rows) - top - height, "v"))
+    return lines, None
+
+
+def _resolve_select_tree(state: _SelectTreeState, answer: Any) -> Optional[List[int]]:
+    """Get the result of select_tree answered headless.
+
+    Args:
+        state (_SelectTreeState): The state the prompt starts in.
+        answer (List[int | str], optional): The path of the node, made of
+            the indices or the labels of the node and its ancestors.
+
+    Returns:
+        Optional[List[int]]: The path of the node, None if there is no
+            answer.
+
+    Raises:
+        ValueError: If the answer is not the path of a node that can be
+            selected.
+    """
+    if answer is None:
+        return None
+    path: List[int] = []
+    for step in answer:
+        siblings = state.loaded.get(tuple(path))
+        if siblings is None:
+            siblings = state.loaded[tuple(path)] = list(state.children(path))
+        if isinstance(step, str) and step in siblings:
+            step = siblings.index(step)
+        if not isinstance(step, int) or not 0 <= step < len(siblings):
+            raise ValueError(f"{answer!r} is not the path of a node")
+        path.append(step)
+    if not path:
+        raise ValueError("The path of a node may not be empty")
+    if not state.branches_selectable:
+        node = tuple(path)
+        if node not in state.loaded:
+            state.loaded[node] = list(state.children(path))
+        if state.loaded[node]:
+            raise ValueError(f"{answer!r} is not the path of a leaf")
+    return path
+
+
+def _select_tree_core(
+    roots: Sequence[str],
+    children: Callable[[List[int]], Iterable[str]],
+    deselected_prefix: str,
+    selected_prefix: str,
+    collapsed_prefix: str,
+    expanded_prefix: str,
+    leaf_prefix: str,
+    indent: str,
+    branches_selectable: bool,
+    max_height: Optional[int],
+    keymap: Optional[Keymap],
+) -> PromptCore:
+    """Create the core of select_tree from the arguments that shape it."""
+    state = _SelectTreeState(
+        roots,
+        children,
+        deselected_prefix,
+        selected_prefix,
+        collapsed_prefix,
+        expanded_prefix,
+        leaf_prefix,
+        indent,
+        branches_selectable,
+        max_height,
+        keymap,
+    )
+    return PromptCore(
+        state, _reduce_select_tree, _render_select_tree, _resolve_select_tree
+    )
+
+
+def select_tree(
+    roots: Sequence[str],
+    children: Callable[[List[int]], Iterable[str]],
+    deselected_prefix: str = "\033[1m[ ]\033[0m ",
+    selected_prefix: str = "\033[1m[\033[32;1mx\033[0;1m]\033[0m ",
+    collapsed_prefix: str = "+ ",
+    expanded_prefix: str = "- ",
+    leaf_prefix: str = "  ",
+    indent: str = "  ",
+    branches_selectable: bool = False,
+    max_height: Optional[int] = None,
+    keymap: Optional[Keymap] = None,
+    *,
+    on_frame: Optional[Callable[[FrameStats], None]] = None,
+    fullscreen: bool = False,
+    backend: Optional[Backend] = None,
+    answer_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
+) -> List[int]:
+    """Select a node from a tree, loading children only when expanded.
+
+    Nodes are identified by their path, the indices of the node and its
+    ancestors among their siblings. The children of a node are loaded the
+    first time it is expanded and kept for the rest of the prompt. A node
+    without children is a leaf.
+
+    Args:
+        roots (List[str]): The nodes at the top of the tree.
+        children (Callable[[List[int]], Iterable[str]]): Gets the children of
+            the node with the given path.
+        deselected_prefix (str, optional): Prefix for deselected nodes ([ ]).
+        selected_prefix (str, optional): Prefix for the selected node ([x]).
+        collapsed_prefix (str, optional): Prefix for collapsed nodes that are
+            not known to be leaves (+).
+        expanded_prefix (str, optional): Prefix for expanded nodes (-).
+        leaf_prefix (str, optional): Prefix for leaves ().
+        indent (str, optional): Indentation per level of the tree.
+        branches_selectable (bool, optional): Confirm keys select nodes with
+            children as well instead of expanding and collapsing them.
+        max_height (int, optional): The maximal number of lines the nodes
+            may occupy. Longer trees scroll. Defaults to the terminal height
+            minus two lines, leaving room for the question above.
+        keymap (Keymap, optional): The key bindings. Defaults to DefaultKeys.
+        on_frame (Callable[[FrameStats], None], optional): Called with the
+            statistics of every frame drawn.
+        fullscreen (bool, optional): Draw the prompt on the alternate screen
+            of the terminal, which is restored afterwards, instead of below
+            the cursor. The scrollback is not touched.
+        backend (Backend, optional): The terminal to run in. Defaults to the
+            one the program runs in.
+        answer_key (str, optional): The key of the answer when answered
+            headless.
+        timeout (float, optional): The seconds after which the prompt
+            raises PromptTimeoutError.
+        cancel (CancelToken, optional): The token cancelling the prompt.
+
+    Returns:
+        List[int]: The path of the node that has been selected.
+    """
+    return _run_prompt(
+        select_tree,
+        _select_tree_core,
+        (
+            roots,
+            children,
+            deselected_prefix,
+            selected_prefix,
+            collapsed_prefix,
+            expanded_prefix,
+            leaf_prefix,
+            indent,
+            branches_selectable,
+            max_height,
+            keymap,
+        ),
+        on_frame,
+        fullscreen,
+        backend,
+        answer_key,
+        timeout,
+        cancel,
+    )
+
+
+class _YesOrNoState(_PromptState):
+    """The state of prompt_yes_or_no.
+
+    Attributes:
+        is_yes (bool): Whether yes is the answer marked.
+        is_selected (bool): Whether an answer is marked at all.
+        current_message (str): The text typed after the question.
+        yn_prompt (str): The text between the question and the typed text.
+
+    The other attributes are the arguments of prompt_yes_or_no of the same
+    name.
+    """
+
+    def __init__(
+        self,
+        question: str,
+        yes_text: str,
+        no_text: str,
+        has_to_match_case: bool,
+        enter_empty_confirms: bool,
+        default_is_yes: bool,
+        deselected_prefix: str,
+        selected_prefix: str,
+        char_prompt: bool,
+        keymap: Optional[Keymap],
+    ) -> None:
+        """Start the prompt, taking the arguments of prompt_yes_or_no."""
+        super().__init__()
+        self.question = question
+        self.yes_text = yes_text
+        self.no_text = no_text
+        self.has_to_match_case = has_to_match_case
+        self.deselected_prefix = deselected_prefix
+        self.selected_prefix = selected_prefix
+        self.keymap = keymap or Keymap()
+        self.is_yes = default_is_yes
+        self.is_selected = enter_empty_confirms
+        self.current_message = ""
+        self.yn_prompt = f" ({yes_text[0]}/{no_text[0]}) " if char_prompt else ": "
+
+
+def _reduce_yes_or_no(state: _YesOrNoState, event: _Event) -> _YesOrNoState:
+    """Apply a keypress to the state of prompt_yes_or_no.
+
+    Args:
+        state (_YesOrNoState): The state, which is changed.
+        event (str | os.terminal_size): The keypress or the size of the
+            terminal to lay the state out for.
+
+    Returns:
+        _YesOrNoState: The changed state.
+    """
+    if not isinstance(event, str):
+        return state
+    keypress = event
+    yes_text, no_text = state.yes_text, state.no_text
+    action = state.keymap.action(keypress)
+    if action in ("down", "up"):
+        state.is_yes = not state.is_yes
+        state.is_selected = True
+        state.current_message = yes_text if state.is_yes else no_text
+    elif action == "delete":
+        if state.current_message:
+            state.current_message = state.current_message[:-1]
+    elif action == "interrupt":
+        raise KeyboardInterrupt
+    elif action == "confirm":
+        if state.is_selected:
+            state.finish(state.is_yes)
+    elif keypress in "\t":
+        if state.is_selected:
+            state.current_message = yes_text if state.is_yes else no_text
+    else:
+        state.current_message += keypress
+        match_yes = yes_text
+        match_no = no_text
+        match_text = state.current_message
+        if not state.has_to_match_case:
+            match_yes = match_yes.upper()
+            match_no = match_no.upper()
+            match_text = match_text.upper()
+        if match_no.startswith(match_text):
+            state.is_selected = True
+            state.is_yes = False
+        elif match_yes.startswith(match_text):
+            state.is_selected = True
+            state.is_yes = True
+        else:
+            state.is_selected = False
+    return state
+
+
+def _render_yes_or_no(state: _YesOrNoState) -> _Frame:
+    """Get the frame showing the state of prompt_yes_or_no.
+
+    Args:
+        state (_YesOrNoState): The state.
+
+    Returns:
+        _Frame: The frame.
+    """
+    yes = state.is_yes and state.is_selected
+    no = not state.is_yes and state.is_selected
+    selected_prefix, deselected_prefix = state.selected_prefix, state.deselected_prefix
+    return (
+        [
+            f"{state.question}{state.yn_prompt}{state.current_message}",
+            f"{selected_prefix if yes else deselected_prefix}{state.yes_text}",
+            f"{selected_prefix if no else deselected_prefix}{state.no_text}",
+        ],
+        0,
+    )
+
+
+def _resolve_yes_or_no(state: _YesOrNoState, answer: Any) -> Optional[bool]:
+    """Get the result of prompt_yes_or_no answered headless.
+
+    Args:
+        state (_YesOrNoState): The state the prompt starts in.
+        answer (bool | str, optional): The answer or the text of it.
+
+    Returns:
+        Optional[bool]: The answer, the default one if enter confirms it.
+
+    Raises:
+        ValueError: If the answer is neither yes nor no.
+    """
+    if answer is None:
+        return state.is_yes if state.is_selected else None
+    if isinstance(answer, bool):
+        return answer
+    if isinstance(answer, str):
+        texts: Tuple[str, ...] = (answer, state.yes_text, state.no_text)
+        if not state.has_to_match_case:
+            texts = tuple(text.upper() for text in texts)
+        if texts[0] in texts[1:]:
+            return texts[0] == texts[1]
+    raise ValueError(f"{answer!r} is neither {state.yes_text!r} nor {state.no_text!r}")
+
+
+def _prompt_yes_or_no_core(
+    question: str,
+    yes_text: str,
+    no_text: str,
+    has_to_match_case: bool,
+    enter_empty_confirms: bool,
+    default_is_yes: bool,
+    deselected_prefix: str,
+    selected_prefix: str,
+    char_prompt: bool,
+    keymap: Optional[Keymap],
+) -> PromptCore:
+    """Create the core of prompt_yes_or_no from the arguments that shape it."""
+    state = _YesOrNoState(
+        question,
+        yes_text,
+        no_text,
+        has_to_match_case,
+        enter_empty_confirms,
+        default_is_yes,
+        deselected_prefix,
+        selected_prefix,
+        char_prompt,
+        keymap,
+    )
+    return PromptCore(
+        state,
+        _reduce_yes_or_no,
+        _render_yes_or_no,
+        _resolve_yes_or_no,
+        farewell="\033[K\n\033[K\n\033[K\n\033[3A\n",
+        question=question,
+    )
 
 
 def prompt_yes_or_no(
@@ -298,6 +4327,14 @@ def prompt_yes_or_no(
     deselected_prefix: str = "  ",
     selected_prefix: str = "\033[31m>\033[0m ",
     char_prompt: bool = True,
+    keymap: Optional[Keymap] = None,
+    *,
+    on_frame: Optional[Callable[[FrameStats], None]] = None,
+    fullscreen: bool = False,
+    backend: Optional[Backend] = None,
+    answer_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[CancelToken] = None,
 ) -> Optional[bool]:
     """Prompt the user to input yes or no.
 
@@ -311,58 +4348,460 @@ def prompt_yes_or_no(
         deselected_prefix (str, optional): Prefix if something is deselected.
         selected_prefix (str, optional): Prefix if something is selected (> )
         char_prompt (bool, optional): Add a [Y/N] to the prompt.
+        keymap (Keymap, optional): The key bindings. Defaults to DefaultKeys.
+        on_frame (Callable[[FrameStats], None], optional): Called with the
+            statistics of every frame drawn.
+        fullscreen (bool, optional): Draw the prompt on the alternate screen
+            of the terminal, which is restored afterwards, instead of below
+            the cursor. The scrollback is not touched.
+        backend (Backend, optional): The terminal to run in. Defaults to the
+            one the program runs in.
+        answer_key (str, optional): The key of the answer when answered
+            headless. The question is used otherwise.
+        timeout (float, optional): The seconds after which the prompt
+            returns the answer marked, if any.
+        cancel (CancelToken, optional): The token cancelling the prompt.
 
     Returns:
         Optional[bool]: The bool what has been selected.
     """
-    is_yes = default_is_yes
-    is_selected = enter_empty_confirms
-    current_message = ""
-    yn_prompt = f" ({yes_text[0]}/{no_text[0]}) " if char_prompt else ": "
-    print()
-    while True:
-        yes = is_yes and is_selected
-        no = not is_yes and is_selected
-        print("\033[K" f"{selected_prefix if yes else deselected_prefix}{yes_text}")
-        print("\033[K" f"{selected_prefix if no else deselected_prefix}{no_text}")
-        print(
-            "\033[3A\r\033[K" f"{question}{yn_prompt}{current_message}",
-            end="",
-            flush=True,
+    return _run_prompt(
+        prompt_yes_or_no,
+        _prompt_yes_or_no_core,
+        (
+            question,
+            yes_text,
+            no_text,
+            has_to_match_case,
+            enter_empty_confirms,
+            default_is_yes,
+            deselected_prefix,
+            selected_prefix,
+            char_prompt,
+            keymap,
+        ),
+        on_frame,
+        fullscreen,
+        backend,
+        answer_key,
+        timeout,
+        cancel,
+    )
+
+
+select_async = _prompt_async(select)
+select_multiple_async = _prompt_async(select_multiple)
+select_tree_async = _prompt_async(select_tree)
+prompt_yes_or_no_async = _prompt_async(prompt_yes_or_no)
+
+
+_core_functions: Dict[Callable[..., Any], Callable[..., PromptCore]] = {
+    select: _select_core,
+    select_multiple: _select_multiple_core,
+    select_tree: _select_tree_core,
+    prompt_yes_or_no: _prompt_yes_or_no_core,
+    select_async: _select_core,
+    select_multiple_async: _select_multiple_core,
+    select_tree_async: _select_tree_core,
+    prompt_yes_or_no_async: _prompt_yes_or_no_core,
+}
+_RUN_ARGUMENTS = (
+    "on_frame",
+    "fullscreen",
+    "backend",
+    "answer_key",
+    "timeout",
+    "cancel",
+)
+
+
+def prompt_core(prompt: Callable[..., Any], *args, **kwargs) -> PromptCore:
+    """Get the core of a prompt, which runs without a terminal.
+
+    The core holds the state the prompt starts in and the functions changing
+    and showing it, so tests and fuzzers can feed keys to a prompt directly:
+
+        core = cutie.prompt_core(cutie.select, ["a", "b"])
+        state = core.reduce(core.state, os.terminal_size((80, 24)))
+        state = core.reduce(state, readchar.key.ENTER)
+        assert state.done and state.result == 0
+
+    Args:
+        prompt (Callable[..., Any]): The prompt, as select, or its awaitable
+            version, as select_async.
+        *args: The arguments of the prompt.
+        **kwargs: The keyword arguments of the prompt. Those of running it,
+            as backend or timeout, are ignored.
+
+    Returns:
+        PromptCore: The core of the prompt.
+
+    Raises:
+        ValueError: If the prompt has no core.
+        TypeError: If the arguments do not fit the prompt.
+    """
+    import inspect
+
+    make_core = _core_functions.get(prompt)
+    if make_core is None:
+        raise ValueError(f"{prompt!r} is not a prompt with a core")
+    arguments = inspect.signature(prompt).bind(*args, **kwargs)
+    arguments.apply_defaults()
+    return make_core(
+        *(
+            value
+            for name, value in arguments.arguments.items()
+            if name not in _RUN_ARGUMENTS
         )
-        keypress = readchar.readkey()
-        if keypress in DefaultKeys.down or keypress in DefaultKeys.up:
-            is_yes = not is_yes
-            is_selected = True
-            current_message = yes_text if is_yes else no_text
-        elif keypress in DefaultKeys.delete:
-            if current_message:
-                current_message = current_message[:-1]
-        elif keypress in DefaultKeys.interrupt:
-            raise KeyboardInterrupt
-        elif keypress in DefaultKeys.confirm:
-            if is_selected:
-                break
-        elif keypress in "\t":
-            if is_selected:
-                current_message = yes_text if is_yes else no_text
-        else:
-            current_message += keypress
-            match_yes = yes_text
-            match_no = no_text
-            match_text = current_message
-            if not has_to_match_case:
-                match_yes = match_yes.upper()
-                match_no = match_no.upper()
-                match_text = match_text.upper()
-            if match_no.startswith(match_text):
-                is_selected = True
-                is_yes = False
-            elif match_yes.startswith(match_text):
-                is_selected = True
-                is_yes = True
+    )
+
+
+class PromptBroker:
+    """Shows the prompts of many threads and tasks one at a time.
+
+    Prompts shown from several threads at once would mix their output on the
+    terminal. A broker owns the terminal instead: threads and asyncio tasks
+    ask it for a prompt and get a future of the answer, so they keep running
+    until they need it. The broker shows the prompts one after another,
+    those with a higher priority first and otherwise in the order they were
+    asked for. Keys typed ahead go on to the next prompt.
+
+    The prompts are shown in a thread of the broker while it is used in a
+    `with` block, or in the thread calling `serve`. A prompt must not wait
+    for the answer of another prompt of the same broker.
+    """
+
+    def __init__(self, backend: Optional[Backend] = None) -> None:
+        """Create a broker.
+
+        Args:
+            backend (Backend, optional): The terminal the prompts are shown
+                in. Defaults to the one the program runs in.
+        """
+        import queue
+        import threading
+
+        self._backend = backend
+        self._requests: Any = queue.PriorityQueue()
+        # Makes asking and closing exclude each other, so nothing is asked
+        # for after the broker stopped
+        self._lock = threading.Lock()
+        # Keeps requests of the same priority in order
+        self._count = itertools.count()
+        self._closed = False
+        self._served: Any = None
+        self._listener: Any = None
+        self._forwarder: Optional[PromptForwarder] = None
+
+    def __enter__(self) -> "PromptBroker":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def ask(
+        self, prompt: Callable[..., _T], *args, priority: int = 0, **kwargs
+    ) -> "futures.Future[_T]":
+        """Ask for a prompt to be shown. This can be done from any thread.
+
+        Args:
+            prompt (Callable[..., _T]): The prompt, e.g. prompt_yes_or_no.
+            *args: The arguments of the prompt.
+            priority (int, optional): Prompts with a higher priority are
+                shown first.
+            **kwargs: The keyword arguments of the prompt. A `timeout`
+                counts from now on, including the time the prompt waits to
+                be shown.
+
+        Returns:
+            futures.Future[_T]: The answer, or what the prompt raised.
+
+        Raises:
+            RuntimeError: If the broker has been closed.
+        """
+        from concurrent import futures
+
+        timeout = kwargs.pop("timeout", None)
+        stop_at = None if timeout is None else time.monotonic() + timeout
+        future: Any = futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The prompt broker has been closed")
+            count = next(self._count)
+            request = (-priority, count, future, prompt, args, kwargs, stop_at)
+            self._requests.put(request)
+        return future
+
+    async def ask_async(
+        self, prompt: Callable[..., _T], *args, priority: int = 0, **kwargs
+    ) -> _T:
+        """Ask for a prompt to be shown and await the answer.
+
+        Args:
+            prompt (Callable[..., _T]): The prompt, e.g. prompt_yes_or_no.
+            *args: The arguments of the prompt.
+            priority (int, optional): Prompts with a higher priority are
+                shown first.
+            **kwargs: The keyword arguments of the prompt.
+
+        Returns:
+            _T: The answer.
+        """
+        import asyncio
+
+        future = self.ask(prompt, *args, priority=priority, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def serve(self) -> None:
+        """Show the prompts asked for in this thread until the broker is
+        closed.
+
+        Prompts whose token was cancelled while they waited are not shown.
+        """
+        with session() if self._backend is None else contextlib.ExitStack():
+            while True:
+                _, _, future, prompt, args, kwargs, stop_at = self._requests.get()
+                if future is None:
+                    return
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if stop_at is not None:
+                    kwargs = {**kwargs, "timeout": _time_left(stop_at)}
+                cancel = kwargs.get("cancel")
+                try:
+                    if cancel is not None and cancel.cancelled:
+                        raise _dismissal(prompt.__name__, cancel)
+                    result = prompt(*args, **{"backend": self._backend, **kwargs})
+                except (Exception, KeyboardInterrupt) as error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+    def forwarder(self) -> "PromptForwarder":
+        """Get a forwarder through which other processes ask for prompts.
+
+        The forwarder can be passed to processes of multiprocessing or a
+        ProcessPoolExecutor, which call forward_prompts with it. Their
+        prompts are then shown by this broker.
+
+        Returns:
+            PromptForwarder: The forwarder.
+
+        Raises:
+            RuntimeError: If the broker has been closed.
+        """
+        from concurrent import futures
+        from multiprocessing import connection
+
+        if self._closed:
+            raise RuntimeError("The prompt broker has been closed")
+        if self._forwarder is None:
+            authkey = os.urandom(32)
+            self._listener = connection.Listener(authkey=authkey)
+            self._forwarder = PromptForwarder(self._listener.address, authkey)
+            executor = futures.ThreadPoolExecutor(1, thread_name_prefix="cutie")
+            executor.submit(self._accept)
+            executor.shutdown(wait=False)
+        return self._forwarder
+
+    def _accept(self) -> None:
+        """Ask for the prompts forwarded by other processes until closed."""
+        from multiprocessing import AuthenticationError
+
+        while True:
+            try:
+                client = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A process failed to connect, or the listener was closed
+                if self._closed:
+                    return
+                continue
+            try:
+                prompt, args, kwargs, priority, cancellable = client.recv()
+            except (OSError, EOFError):
+                client.close()
+                if self._closed:
+                    return
+                continue
+            if cancellable:
+                kwargs = {**kwargs, "cancel": _ForwardedCancelToken(client)}
+            try:
+                future = self.ask(prompt, *args, priority=priority, **kwargs)
+            except RuntimeError as error:
+                self._reply(client, error)
             else:
-                is_selected = False
-        print()
-    print("\033[K\n\033[K\n\033[K\n\033[3A")
-    return is_selected and is_yes
+                future.add_done_callback(functools.partial(self._reply, client))
+
+    @staticmethod
+    def _reply(client: Any, answer: Any) -> None:
+        """Send the answer to a forwarded prompt back to its process.
+
+        Args:
+            client (Connection): The connection to the process.
+            answer (futures.Future | Exception): The answer or the error.
+        """
+        from concurrent import futures
+
+        if isinstance(answer, BaseException):
+            error, result = answer, None
+        elif answer.cancelled():
+            error, result = futures.CancelledError(), None
+        else:
+            error = answer.exception()
+            result = None if error else answer.result()
+        # The process may have ended or cancelled the prompt in the meantime
+        with contextlib.suppress(OSError), client:
+            if not client.poll():
+                client.send((error, result))
+
+    def start(self) -> None:
+        """Show the prompts asked for in a thread of the broker."""
+        from concurrent import futures
+
+        executor = futures.ThreadPoolExecutor(1, thread_name_prefix="cutie")
+        self._served = executor.submit(self.serve)
+        executor.shutdown(wait=False)
+
+    def close(self, cancel: bool = False) -> None:
+        """Stop once the prompts asked for so far have been answered.
+
+        Waits for the thread of the broker, if it was started. Prompts asked
+        for afterwards, also by other processes, raise RuntimeError.
+
+        Args:
+            cancel (bool, optional): Cancel the prompts not shown yet
+                instead of showing them.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if cancel:
+                while not self._requests.empty():
+                    self._requests.get_nowait()[2].cancel()
+            # Stopping comes after every prompt, whatever its priority
+            stop: tuple = (float("inf"), next(self._count), None, None, (), {}, None)
+            self._requests.put(stop)
+        if self._listener is not None:
+            self._stop_accepting()
+        if self._served is not None:
+            self._served.result()
+
+    def _stop_accepting(self) -> None:
+        """Stop the thread accepting forwarded prompts, without waiting for it.
+
+        The thread may have ended or be busy with a process that does not
+        answer, so it is only woken by a connection that is dropped at once.
+        """
+        from multiprocessing import connection
+
+        with contextlib.suppress(OSError):
+            connection.Client(self._listener.address).close()
+        self._listener.close()
+
+
+class _ForwardedCancelToken(CancelToken):
+    """Cancelled when the process that forwarded a prompt closes the
+    connection, because its token was cancelled or it ended."""
+
+    def __init__(self, client: Any) -> None:
+        """Watch a connection.
+
+        Args:
+            client (Connection): The connection to the process.
+        """
+        super().__init__()
+        self._client = client
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token has been cancelled."""
+        return self._cancelled or self._client.poll()
+
+    def fileno(self) -> int:
+        return self._client.fileno()
+
+
+class PromptForwarder:
+    """Asks the PromptBroker of another process for prompts.
+
+    A forwarder can be pickled and passed to other processes, which can
+    neither share the terminal of the broker nor show prompts of their own
+    without mixing their output with the prompts of the broker.
+    """
+
+    def __init__(self, address: Any, authkey: bytes) -> None:
+        """Create a forwarder.
+
+        Args:
+            address (Any): The address the broker listens at.
+            authkey (bytes): The key authenticating the processes.
+        """
+        self._address = address
+        self._authkey = authkey
+
+    def _connect(self) -> Any:
+        """Connect to the broker.
+
+        Returns:
+            Connection: The connection.
+        """
+        from multiprocessing import connection
+
+        return connection.Client(self._address, authkey=self._authkey)
+
+    def ask(self, prompt: Callable[..., _T], *args, priority: int = 0, **kwargs) -> _T:
+        """Have the broker show a prompt and wait for the answer.
+
+        The prompt, its arguments and the answer are pickled, so they have to
+        be defined at the top level of a module. A CancelToken stays in this
+        process instead. When it is cancelled, the connection to the broker
+        is closed, which cancels the prompt there.
+
+        Args:
+            prompt (Callable[..., _T]): The prompt, e.g. prompt_yes_or_no.
+            *args: The arguments of the prompt.
+            priority (int, optional): Prompts with a higher priority are
+                shown first.
+            **kwargs: The keyword arguments of the prompt.
+
+        Returns:
+            _T: The answer.
+
+        Raises:
+            RuntimeError: If the broker has been closed.
+            PromptCancelledError: If the token was cancelled.
+        """
+        from multiprocessing import connection
+
+        cancel = kwargs.pop("cancel", None)
+        with self._connect() as client:
+            client.send((prompt, args, kwargs, priority, cancel is not None))
+            if cancel is not None:
+                connection.wait([client, cancel])
+                if not client.poll():
+                    raise _dismissal(prompt.__name__, cancel)
+            error, answer = client.recv()
+        if error is not None:
+            raise error
+        return answer
+
+
+# The forwarder the prompts of this process are shown through, if any
+_prompt_forwarder: Optional[PromptForwarder] = None
+
+
+def forward_prompts(forwarder: Optional[PromptForwarder]) -> None:
+    """Show the prompts of this process through the broker of another one.
+
+    Prompts using the terminal are forwarded to the broker and answered
+    there from then on. This is meant as the initializer of the processes
+    of a pool.
+
+    Args:
+        forwarder (PromptForwarder, optional): The forwarder of the broker,
+            None to show prompts in this process again.
+    """
+    global _prompt_forwarder
+    _prompt_forwarder = forwarder
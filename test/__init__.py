@@ -1,27 +1,26 @@
+import io
+import os
+import sys
+from unittest import mock
+
 import readchar
 
 import cutie
 
+# The tests stand in for a terminal, also where they run without one, so
+# prompts must not be answered headless
+os.environ["CUTIE_HEADLESS"] = "0"
 
-def PrintCall(states):
-
-    def func(msg=None, state="selectable"):
-        state_ = states[state]
-        state_name: str
-        kwargs = {}
-        if isinstance(state_, str):
-            state_name = state_
-        elif isinstance(state_, tuple):
-            state_name = state_[0]
-            if len(state) > 1:
-                kwargs = state_[1]
+# Prompts only read keys with readchar if stdin is not a terminal
+no_terminal = mock.patch("sys.stdin", io.StringIO())
 
-        if msg:
-            return ((state_name + msg,), kwargs)
-        else:
-            return ((state_name,), kwargs)
 
-    return func
+def written_frames(mock_write):
+    """
+    Get the frames passed to a mocked `TerminalBackend.write`, which writes
+    and flushes every frame at once.
+    """
+    return [args[0] for args, _ in mock_write.call_args_list]
 
 
 def yield_input(*data, raise_on_empty=False):
@@ -47,7 +46,7 @@ def yield_input(*data, raise_on_empty=False):
 class InputContext:
     """
     Context manager to simulate keyboard input returned by `readchar.readkey`,
-    by replacing it in `cutie` with `yield_input`
+    by replacing it with `yield_input`
 
     When the supplied keystrokes are exhausted a `MockException` will be raised.
     This can be used to terminate the execution at any desired point, rather than
@@ -61,13 +60,17 @@ class InputContext:
     """
 
     def __init__(self, *data, raise_on_empty=True):
-        cutie.readchar.readkey = yield_input(*data, raise_on_empty=raise_on_empty)
+        self.readkey = readchar.readkey
+        readchar.readkey = yield_input(*data, raise_on_empty=raise_on_empty)
+        self.stdin = sys.stdin
+        sys.stdin = io.StringIO()
 
     def __enter__(self):
         pass
 
     def __exit__(self, *a):
-        cutie.readchar.readkey = readchar.readkey
+        readchar.readkey = self.readkey
+        sys.stdin = self.stdin
 
 
 class MockException(Exception):
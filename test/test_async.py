@@ -0,0 +1,109 @@
+import asyncio
+import os
+import signal
+import unittest
+from unittest import mock
+
+import readchar
+
+from . import InputContext, cutie, written_frames
+
+
+class TestAsync(unittest.TestCase):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_async(self, *m):
+        with InputContext(readchar.key.DOWN, readchar.key.ENTER):
+            selindex = asyncio.run(cutie.select_async(["foo", "bar"]))
+        self.assertEqual(selindex, 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_multiple_async(self, *m):
+        with InputContext(" ", readchar.key.DOWN, " ", readchar.key.ENTER):
+            selected_indices = asyncio.run(
+                cutie.select_multiple_async(["foo", "bar"], minimal_count=1)
+            )
+        self.assertEqual(selected_indices, [0, 1])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_prompt_yes_or_no_async(self, *m):
+        with InputContext("y", readchar.key.ENTER):
+            self.assertTrue(asyncio.run(cutie.prompt_yes_or_no_async("foo")))
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_keyboard_interrupt(self, *m):
+        with InputContext(readchar.key.CTRL_C):
+            with self.assertRaises(KeyboardInterrupt):
+                asyncio.run(cutie.select_async(["foo"]))
+
+    def test_name(self):
+        self.assertEqual(cutie.select_async.__name__, "select_async")
+
+
+@unittest.skipIf(cutie.termios is None, "requires termios")
+class TestAsyncTerminal(unittest.TestCase):
+    def setUp(self):
+        self.master, slave = os.openpty()
+        self.stdin = open(slave, "r")
+        self.addCleanup(os.close, self.master)
+        self.addCleanup(self.stdin.close)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_loop_keeps_running(self, *m):
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def main():
+            ticker = asyncio.ensure_future(tick())
+            prompt = asyncio.ensure_future(cutie.select_async(["foo", "bar", "baz"]))
+            await asyncio.sleep(0.01)
+            os.write(self.master, b"\x1b[Bj")
+            await asyncio.sleep(0.01)
+            os.write(self.master, b"\n")
+            result = await prompt
+            ticker.cancel()
+            return result
+
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(asyncio.run(main()), 2)
+        self.assertGreater(len(ticks), 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_terminal_restored(self, *m):
+        attributes = cutie.termios.tcgetattr(self.stdin.fileno())
+        os.write(self.master, b"\n")
+        with mock.patch("sys.stdin", self.stdin):
+            asyncio.run(cutie.select_async(["foo"]))
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_lone_escape_does_not_wait(self, *m):
+        keymap = cutie.Keymap(interrupt=["\x1b"])
+        os.write(self.master, b"\x1b")
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(KeyboardInterrupt):
+                asyncio.run(cutie.select_async(["foo"], keymap=keymap))
+
+    @mock.patch("cutie.shutil.get_terminal_size")
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_relayout_on_resize(self, mock_write, mock_size):
+        mock_size.return_value = os.terminal_size((80, 6))
+
+        async def main():
+            prompt = asyncio.ensure_future(cutie.select_async(["foo", "bar", "baz"]))
+            await asyncio.sleep(0.01)
+            mock_size.return_value = os.terminal_size((80, 3))
+            os.kill(os.getpid(), signal.SIGWINCH)
+            await asyncio.sleep(0.01)
+            os.write(self.master, b"\n")
+            return await prompt
+
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(asyncio.run(main()), 0)
+        frames = written_frames(mock_write)
+        self.assertEqual(len(frames), 2)
+        self.assertTrue(frames[1].startswith("\x1b[3A\r\x1b[J\n\n\n\x1b[3A\r"))
+        self.assertEqual(signal.getsignal(signal.SIGWINCH), signal.SIG_DFL)
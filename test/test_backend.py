@@ -0,0 +1,220 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import readchar
+
+from . import cutie
+
+SELECTED = "[x] "
+DESELECTED = "[ ] "
+
+
+class TestVirtualTerminal(unittest.TestCase):
+    def setUp(self):
+        self.terminal = cutie.VirtualTerminal(columns=10, lines=4)
+
+    def test_overwrite_line(self):
+        self.terminal.write("foobar\r\x1b[Kbaz")
+        self.assertEqual(self.terminal.lines, ["baz", "", "", ""])
+        self.assertEqual(self.terminal.cursor, (0, 3))
+
+    def test_colors_take_no_space(self):
+        self.terminal.write("\x1b[1;32mfoo\x1b[0m bar")
+        self.assertEqual(self.terminal.lines[0], "foo bar")
+
+    def test_scrolls_at_bottom(self):
+        self.terminal.write("a\nb\nc\nd\ne")
+        self.assertEqual(self.terminal.lines, ["b", "c", "d", "e"])
+
+    def test_cursor_movement(self):
+        self.terminal.write("foo\n\nbar\x1b[1A\rqux\x1b[3;2Hx")
+        self.assertEqual(self.terminal.lines, ["foo", "qux", "bxr", ""])
+
+    def test_wraps_and_wide_characters(self):
+        self.terminal.write("12345678界界")
+        self.assertEqual(self.terminal.lines[:2], ["12345678界", "界"])
+
+    def test_erase_below(self):
+        self.terminal.write("foo\nbar\nbaz\x1b[1A\r\x1b[J")
+        self.assertEqual(self.terminal.lines, ["foo", "", "", ""])
+
+    def test_alternate_screen(self):
+        self.terminal.write("foo\x1b[?1049h\x1b[Hbar")
+        self.assertEqual(self.terminal.lines[0], "bar")
+        self.terminal.write("\x1b[?1049l")
+        self.assertEqual(self.terminal.lines[0], "foo")
+        self.assertEqual(self.terminal.cursor, (0, 3))
+
+    def test_no_keys_left(self):
+        with self.assertRaises(EOFError):
+            self.terminal.readkey()
+
+
+class TestTerminalBackend(unittest.TestCase):
+    def test_frame_written_at_once(self):
+        with mock.patch("sys.stdout") as stdout:
+            cutie.TerminalBackend().write("foo\nbar")
+        stdout.write.assert_called_once_with("foo\nbar")
+        stdout.flush.assert_called_once_with()
+
+
+@mock.patch("cutie.TerminalBackend.write")
+class TestPromptsInVirtualTerminal(unittest.TestCase):
+    def setUp(self):
+        self.terminal = cutie.VirtualTerminal(columns=20, lines=6)
+        self.prefixes = {"deselected_prefix": DESELECTED, "selected_prefix": SELECTED}
+
+    def test_select(self, mock_write):
+        self.terminal.press(readchar.key.DOWN, readchar.key.ENTER)
+        self.assertEqual(
+            cutie.select(["foo", "bar"], backend=self.terminal, **self.prefixes), 1
+        )
+        mock_write.assert_not_called()
+
+    def test_screen_shows_last_frame(self, mock_write):
+        self.terminal.press(readchar.key.DOWN)
+        with self.assertRaises(EOFError):
+            cutie.select(["foo", "bar"], backend=self.terminal, **self.prefixes)
+        self.assertEqual(self.terminal.lines, ["[ ] foo", "[x] bar", "", "", "", ""])
+        self.assertEqual(self.terminal.cursor, (2, 0))
+
+    def test_final_frame_after_keys_typed_ahead(self, mock_write):
+        self.terminal.press(readchar.key.DOWN, readchar.key.DOWN, readchar.key.ENTER)
+        options = ["a", "b", "c", "d"]
+        self.assertEqual(
+            cutie.select(options, backend=self.terminal, **self.prefixes), 2
+        )
+        self.assertEqual(self.terminal.lines[:4], ["[ ] a", "[ ] b", "[x] c", "[ ] d"])
+
+    def test_final_ticks_after_keys_typed_ahead(self, mock_write):
+        self.terminal.press(readchar.key.DOWN, " ", readchar.key.ENTER)
+        result = asyncio.run(
+            cutie.select_multiple_async(
+                ["a", "b"],
+                backend=self.terminal,
+                deselected_ticked_prefix="[x] ",
+                deselected_unticked_prefix="[ ] ",
+                selected_unticked_prefix="[ ] ",
+                selected_ticked_prefix="[x] ",
+                hide_confirm=True,
+            )
+        )
+        self.assertEqual(result, [1])
+        self.assertEqual(self.terminal.lines[:2], ["[ ] a", "[x] b"])
+
+    def test_select_scrolls_to_terminal_height(self, mock_write):
+        options = [str(i) for i in range(10)]
+        self.terminal.press(readchar.key.END)
+        with self.assertRaises(EOFError):
+            cutie.select(options, backend=self.terminal, **self.prefixes)
+        self.assertEqual(
+            self.terminal.lines,
+            ["  ^ 8 more", "[ ] 8", "[x] 9", "", "", ""],
+        )
+
+    def test_question_stays_on_screen(self, mock_write):
+        options = [str(i) for i in range(20)]
+        for prompt in (cutie.select, cutie.select_multiple):
+            terminal = cutie.VirtualTerminal(20, 6)
+            terminal.write("question\n")
+            terminal.press(readchar.key.END)
+            with self.assertRaises(EOFError):
+                prompt(options, backend=terminal)
+            self.assertEqual(terminal.lines[0], "question")
+
+    def test_resize(self, mock_write):
+        self.terminal.resize(6, 6)
+        with self.assertRaises(EOFError):
+            cutie.select(["foobar"], backend=self.terminal, **self.prefixes)
+        self.assertEqual(self.terminal.lines[0], "[x] f…")
+
+    def test_fullscreen_restores_screen(self, mock_write):
+        self.terminal.write("before\n")
+        self.terminal.press(readchar.key.ENTER)
+        cutie.select(["foo"], backend=self.terminal, fullscreen=True)
+        self.assertEqual(self.terminal.lines[:2], ["before", ""])
+
+    def test_prompt_yes_or_no(self, mock_write):
+        self.terminal.press("y", readchar.key.ENTER)
+        self.assertTrue(cutie.prompt_yes_or_no("foo", backend=self.terminal))
+        # The answers below the question are cleared
+        self.assertEqual(self.terminal.lines[:3], ["foo (Y/N) y", "", ""])
+
+    def test_get_number(self, mock_write):
+        self.terminal.press("x", readchar.key.ENTER, "1", "3", readchar.key.BACKSPACE)
+        self.terminal.press("2", readchar.key.ENTER)
+        self.assertEqual(cutie.get_number("foo", backend=self.terminal), 12)
+        self.assertEqual(self.terminal.lines[0], "foo 12")
+
+    def test_secure_input_not_shown(self, mock_write):
+        self.terminal.press("b", "a", "r", readchar.key.ENTER)
+        self.assertEqual(cutie.secure_input("foo", backend=self.terminal), "bar")
+        self.assertEqual(self.terminal.lines[0], "foo")
+
+    def test_async(self, mock_write):
+        self.terminal.press(" ", readchar.key.ENTER)
+        result = asyncio.run(
+            cutie.select_multiple_async(["foo", "bar"], backend=self.terminal)
+        )
+        self.assertEqual(result, [0])
+        mock_write.assert_not_called()
+
+
+class TestDismissal(unittest.TestCase):
+    def setUp(self):
+        self.terminal = cutie.VirtualTerminal()
+
+    def test_timeout_returns_marked_answer(self):
+        self.terminal.press(readchar.key.DOWN)
+        self.assertEqual(
+            cutie.select(["foo", "bar"], backend=self.terminal, timeout=0.01), 1
+        )
+        self.assertFalse(
+            cutie.prompt_yes_or_no("foo", backend=self.terminal, timeout=0.01)
+        )
+
+    def test_timeout_checks_count(self):
+        self.terminal.press(" ")
+        self.assertEqual(
+            cutie.select_multiple(["foo"], backend=self.terminal, timeout=0.01), [0]
+        )
+        with self.assertRaises(cutie.PromptTimeoutError):
+            cutie.select_multiple(
+                ["foo"], minimal_count=1, backend=self.terminal, timeout=0.01
+            )
+
+    def test_timeout_without_default(self):
+        with self.assertRaises(cutie.PromptTimeoutError):
+            cutie.select_tree(
+                ["foo"], lambda path: [], backend=self.terminal, timeout=0
+            )
+        with self.assertRaises(cutie.PromptTimeoutError):
+            cutie.secure_input("foo", backend=self.terminal, timeout=0.01)
+
+    def test_timeout_without_match(self):
+        self.terminal.press(*"baz")
+        with self.assertRaises(cutie.PromptTimeoutError):
+            cutie.select(
+                ["foo", "bar"], filterable=True, backend=self.terminal, timeout=0.01
+            )
+
+    def test_cancelled(self):
+        cancel = cutie.CancelToken()
+        cancel.cancel()
+        self.assertTrue(cancel.cancelled)
+        with self.assertRaises(cutie.PromptCancelledError):
+            cutie.select(["foo"], backend=self.terminal, cancel=cancel)
+        with self.assertRaises(cutie.PromptCancelledError):
+            cutie.get_number("foo", backend=self.terminal, cancel=cancel)
+
+    def test_keys_typed_ahead_applied(self):
+        cancel = cutie.CancelToken()
+        self.terminal.press(readchar.key.DOWN, readchar.key.ENTER)
+        self.assertEqual(
+            cutie.select(["foo", "bar"], backend=self.terminal, cancel=cancel), 1
+        )
+
+    def test_screen_restored(self):
+        cutie.select(["foo"], backend=self.terminal, fullscreen=True, timeout=0)
+        self.assertEqual(self.terminal.lines, [""] * 24)
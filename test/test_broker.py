@@ -0,0 +1,172 @@
+import asyncio
+import multiprocessing
+import multiprocessing.connection
+import threading
+import time
+import unittest
+
+import readchar
+
+from . import cutie
+
+
+def deploy(host):
+    if cutie.prompt_yes_or_no(f"Restart {host}?"):
+        return host
+    return None
+
+
+class TestPromptBroker(unittest.TestCase):
+    def setUp(self):
+        self.terminal = cutie.VirtualTerminal()
+        self.broker = cutie.PromptBroker(self.terminal)
+
+    def test_answers_in_order(self):
+        first = self.broker.ask(cutie.select, ["foo", "bar"])
+        second = self.broker.ask(cutie.prompt_yes_or_no, "baz")
+        self.terminal.press(readchar.key.DOWN, readchar.key.ENTER, "y", "\n")
+        self.broker.close()
+        self.broker.serve()
+        self.assertEqual(first.result(), 1)
+        self.assertTrue(second.result())
+        self.assertFalse(self.terminal.pending())
+
+    def test_priority(self):
+        low = self.broker.ask(cutie.select, ["foo", "bar"])
+        high = self.broker.ask(cutie.select, ["foo", "bar"], priority=1)
+        self.terminal.press(readchar.key.DOWN, readchar.key.ENTER, readchar.key.ENTER)
+        self.broker.close()
+        self.broker.serve()
+        self.assertEqual(high.result(), 1)
+        self.assertEqual(low.result(), 0)
+
+    def test_exception_reaches_asker(self):
+        interrupted = self.broker.ask(cutie.select, ["foo"])
+        answered = self.broker.ask(cutie.select, ["foo"])
+        self.terminal.press(readchar.key.CTRL_C, readchar.key.ENTER)
+        self.broker.close()
+        self.broker.serve()
+        self.assertIsInstance(interrupted.exception(), KeyboardInterrupt)
+        self.assertEqual(answered.result(), 0)
+
+    def test_cancel(self):
+        future = self.broker.ask(cutie.select, ["foo"])
+        self.broker.close(cancel=True)
+        self.broker.serve()
+        self.assertTrue(future.cancelled())
+
+    def test_closed(self):
+        self.broker.close()
+        with self.assertRaises(RuntimeError):
+            self.broker.ask(cutie.select, ["foo"])
+
+    def test_timeout_counts_from_asking(self):
+        first = self.broker.ask(cutie.select, ["foo"])
+        second = self.broker.ask(cutie.select, ["foo", "bar"], timeout=0.2)
+        time.sleep(0.2)
+        self.terminal.press(readchar.key.ENTER)
+        self.broker.close()
+        start = time.monotonic()
+        self.broker.serve()
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(first.result(), 0)
+        self.assertEqual(second.result(), 0)
+
+    def test_cancelled_while_waiting(self):
+        cancel = cutie.CancelToken()
+        future = self.broker.ask(cutie.select, ["foo"], cancel=cancel)
+        cancel.cancel()
+        self.broker.close()
+        self.broker.serve()
+        self.assertIsInstance(future.exception(), cutie.PromptCancelledError)
+        self.assertEqual(self.terminal.output, [])
+
+    def test_threads(self):
+        self.terminal.press(*[readchar.key.DOWN, readchar.key.ENTER] * 8)
+        results = []
+
+        def worker():
+            results.append(self.broker.ask(cutie.select, ["foo", "bar"]).result())
+
+        with self.broker:
+            workers = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+        self.assertEqual(results, [1] * 8)
+
+    def test_async(self):
+        self.terminal.press(readchar.key.DOWN, readchar.key.ENTER)
+
+        async def ask():
+            return await self.broker.ask_async(cutie.select, ["foo", "bar"])
+
+        with self.broker:
+            self.assertEqual(asyncio.run(ask()), 1)
+
+
+class TestPromptForwarder(unittest.TestCase):
+    def setUp(self):
+        self.terminal = cutie.VirtualTerminal()
+        self.broker = cutie.PromptBroker(self.terminal)
+
+    def test_process_pool(self):
+        self.terminal.press("y", "\n", "n", "\n")
+        with self.broker:
+            forwarder = self.broker.forwarder()
+            with multiprocessing.Pool(1, cutie.forward_prompts, (forwarder,)) as pool:
+                self.assertEqual(pool.map(deploy, ["foo", "bar"]), ["foo", None])
+        self.assertFalse(self.terminal.pending())
+        self.assertEqual(
+            self.terminal.lines[:2], ["Restart foo? (Y/N) y", "Restart bar? (Y/N) n"]
+        )
+
+    def test_forward_prompts(self):
+        cutie.forward_prompts(self.broker.forwarder())
+        self.addCleanup(cutie.forward_prompts, None)
+        self.terminal.press(readchar.key.DOWN, readchar.key.ENTER, *"12\n")
+        with self.broker:
+            self.assertEqual(cutie.select(["foo", "bar"]), 1)
+            self.assertEqual(cutie.get_number("baz", allow_float=False), 12)
+
+    def test_exception_reaches_process(self):
+        self.terminal.press(readchar.key.CTRL_C)
+        with self.broker:
+            with self.assertRaises(KeyboardInterrupt):
+                self.broker.forwarder().ask(cutie.select, ["foo"])
+
+    def test_closed(self):
+        self.broker.close()
+        with self.assertRaises(RuntimeError):
+            self.broker.forwarder()
+
+    def test_cancel_token_stays_in_process(self):
+        self.terminal.press(readchar.key.ENTER)
+        with self.broker:
+            forwarder = self.broker.forwarder()
+            cancel = cutie.CancelToken()
+            self.assertEqual(forwarder.ask(cutie.select, ["foo"], cancel=cancel), 0)
+
+    def test_cancel(self):
+        cancel = cutie.CancelToken()
+        threading.Timer(0.1, cancel.cancel).start()
+        # Closing the broker waits for the prompt, which has to be cancelled
+        with self.broker:
+            forwarder = self.broker.forwarder()
+            with self.assertRaises(cutie.PromptCancelledError):
+                forwarder.ask(cutie.select, ["foo"], cancel=cancel)
+
+    def test_process_dropped_while_connecting(self):
+        self.terminal.press(readchar.key.ENTER)
+        with self.broker:
+            forwarder = self.broker.forwarder()
+            # Leaves before authenticating, like a worker killed meanwhile
+            multiprocessing.connection.Client(forwarder._address).close()
+            self.assertEqual(forwarder.ask(cutie.select, ["foo"]), 0)
+
+    def test_close_with_process_not_answering(self):
+        with self.broker:
+            forwarder = self.broker.forwarder()
+            silent = multiprocessing.connection.Client(forwarder._address)
+        silent.close()
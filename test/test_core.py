@@ -0,0 +1,194 @@
+import inspect
+import os
+import random
+import unittest
+
+import readchar
+
+from . import cutie
+
+KEYS = [
+    readchar.key.UP,
+    readchar.key.DOWN,
+    readchar.key.HOME,
+    readchar.key.END,
+    readchar.key.PAGE_UP,
+    readchar.key.PAGE_DOWN,
+    readchar.key.RIGHT,
+    readchar.key.LEFT,
+    readchar.key.BACKSPACE,
+    readchar.key.CTRL_A,
+    readchar.key.CTRL_R,
+    readchar.key.CTRL_G,
+    "\x1b[1;2B",
+    "\x1b[1;2A",
+    " ",
+    "a",
+    "o",
+    "x",
+]
+
+
+def start(prompt, *args, **kwargs):
+    """Create the core of a prompt and lay out its first state."""
+    core = cutie.prompt_core(prompt, *args, **kwargs)
+    return core, core.reduce(core.state, os.terminal_size((80, 24)))
+
+
+def press(core, state, *keys):
+    """Apply keys to the state of a core."""
+    for key in keys:
+        state = core.reduce(state, key)
+    return state
+
+
+class TestSelectCore(unittest.TestCase):
+    def test_keys_move_cursor(self):
+        core, state = start(
+            cutie.select,
+            ["foo", "bar", "baz"],
+            deselected_prefix="- ",
+            selected_prefix="* ",
+            max_height=5,
+        )
+        state = press(core, state, readchar.key.DOWN, readchar.key.DOWN)
+        self.assertFalse(state.done)
+        self.assertEqual(core.render(state), (["- foo", "- bar", "* baz"], None))
+        state = press(core, state, readchar.key.ENTER)
+        self.assertTrue(state.done)
+        self.assertEqual(state.result, 2)
+
+    def test_render_prefixes(self):
+        core, state = start(
+            cutie.select,
+            ["foo", "bar"],
+            caption_indices=[0],
+            selected_index=1,
+            deselected_prefix="- ",
+            selected_prefix="* ",
+            caption_prefix="# ",
+            max_height=5,
+        )
+        self.assertEqual(core.render(state), (["# foo", "* bar"], None))
+
+    def test_scrolls(self):
+        options = [str(i) for i in range(10)]
+        core, state = start(cutie.select, options, max_height=4)
+        state = press(core, state, readchar.key.END)
+        lines, _ = core.render(state)
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(state.top, 8)
+
+    def test_interrupt(self):
+        core, state = start(cutie.select, ["foo"], max_height=5)
+        with self.assertRaises(KeyboardInterrupt):
+            press(core, state, readchar.key.CTRL_C)
+
+
+class TestSelectMultipleCore(unittest.TestCase):
+    def test_ticks(self):
+        core, state = start(cutie.select_multiple, ["foo", "bar"], max_height=5)
+        state = press(core, state, " ", readchar.key.DOWN, " ", readchar.key.ENTER)
+        self.assertEqual(state.result, [0, 1])
+        self.assertEqual(core.farewell, "\r\x1b[K")
+
+    def test_error_message_rendered(self):
+        core, state = start(
+            cutie.select_multiple, ["foo"], minimal_count=1, max_height=5
+        )
+        state = press(core, state, readchar.key.ENTER)
+        self.assertFalse(state.done)
+        lines, cursor = core.render(state)
+        self.assertEqual(lines[-1], "Must select at least 1 options")
+        self.assertEqual(cursor, 1)
+
+
+class TestSelectTreeCore(unittest.TestCase):
+    def test_expand(self):
+        core, state = start(
+            cutie.select_tree,
+            ["etc", "usr"],
+            lambda path: ["hosts"] if path == [0] else [],
+            deselected_prefix="",
+            selected_prefix="",
+            max_height=5,
+        )
+        state = press(core, state, readchar.key.RIGHT)
+        self.assertEqual(core.render(state), (["- etc", "  + hosts", "+ usr"], None))
+        state = press(core, state, readchar.key.DOWN, readchar.key.ENTER)
+        self.assertEqual(state.result, [0, 0])
+
+
+class TestPromptYesOrNoCore(unittest.TestCase):
+    def test_typing_marks_answer(self):
+        core, state = start(cutie.prompt_yes_or_no, "foo", selected_prefix="> ")
+        state = press(core, state, "y")
+        self.assertEqual(core.render(state), (["foo (Y/N) y", "> Yes", "  No"], 0))
+        state = press(core, state, readchar.key.ENTER)
+        self.assertIs(state.result, True)
+
+
+class TestFuzz(unittest.TestCase):
+    """Random key sequences keep the states consistent."""
+
+    def setUp(self):
+        self.random = random.Random(0)
+
+    def keys(self, count):
+        return [self.random.choice(KEYS) for _ in range(count)]
+
+    def check_list(self, prompt, **kwargs):
+        captions = [3, 5, 17]
+        options = [f"option {i}" for i in range(30)]
+        for _ in range(50):
+            core, state = start(
+                prompt, options, caption_indices=captions, max_height=6, **kwargs
+            )
+            for key in self.keys(40):
+                state = core.reduce(state, key)
+                if state.done:
+                    break
+                lines, _ = core.render(state)
+                self.assertLessEqual(len(lines), 8)
+                self.assertNotIn(state.cursor, captions)
+
+    def test_select(self):
+        self.check_list(cutie.select)
+
+    def test_select_filterable(self):
+        self.check_list(cutie.select, filterable=True)
+
+    def test_select_multiple(self):
+        self.check_list(cutie.select_multiple, hide_confirm=False, maximal_count=10)
+
+
+class TestPromptCore(unittest.TestCase):
+    def test_run_arguments_ignored(self):
+        core, state = start(cutie.select, ["foo", "bar"], timeout=1.0)
+        self.assertEqual(press(core, state, readchar.key.ENTER).result, 0)
+
+    def test_async_prompt(self):
+        core, state = start(cutie.select_async, ["foo", "bar"], selected_index=1)
+        self.assertEqual(press(core, state, readchar.key.ENTER).result, 1)
+
+    def test_not_a_prompt(self):
+        with self.assertRaises(ValueError):
+            cutie.prompt_core(cutie.get_number, "Number")
+
+    def test_signatures(self):
+        for prompt, returns in [
+            (cutie.select, "int"),
+            (cutie.select_multiple, "List[int]"),
+            (cutie.select_tree, "List[int]"),
+            (cutie.prompt_yes_or_no, "Optional[bool]"),
+        ]:
+            for function in [prompt, getattr(cutie, f"{prompt.__name__}_async")]:
+                signature = inspect.signature(function)
+                for name in ["backend", "timeout", "cancel", "on_frame"]:
+                    self.assertEqual(
+                        signature.parameters[name].kind,
+                        inspect.Parameter.KEYWORD_ONLY,
+                    )
+                self.assertEqual(
+                    inspect.formatannotation(signature.return_annotation), returns
+                )
@@ -7,22 +7,22 @@ from . import MockException
 
 
 class TestCutieGetNumber(unittest.TestCase):
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_invalid_number(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_invalid_number(self, mock_write):
         with mock.patch("cutie.input", return_value="foo"):
             with self.assertRaises(MockException):
                 cutie.get_number("bar")
-            mock_print.assert_called_once_with(
-                "Not a valid number.\033[K\033[1A\r\033[K", end=""
+            mock_write.assert_called_once_with(
+                "Not a valid number.\033[K\033[1A\r\033[K"
             )
 
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_not_allow_float(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_not_allow_float(self, mock_write):
         with mock.patch("cutie.input", return_value="1.2"):
             with self.assertRaises(MockException):
                 cutie.get_number("foo", allow_float=False)
-            mock_print.assert_called_once_with(
-                "Has to be an integer.\033[K\033[1A\r\033[K", end=""
+            mock_write.assert_called_once_with(
+                "Has to be an integer.\033[K\033[1A\r\033[K"
             )
 
     def test_allow_float_returns_float(self):
@@ -37,13 +37,13 @@ class TestCutieGetNumber(unittest.TestCase):
             self.assertIsInstance(val, int)
             self.assertEqual(val, 1)
 
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_min_value_float_too_low(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_min_value_float_too_low(self, mock_write):
         with mock.patch("cutie.input", return_value="1.2"):
             with self.assertRaises(MockException):
                 cutie.get_number("foo", min_value=1.3)
-            mock_print.assert_called_once_with(
-                "Has to be at least 1.3.\033[K\033[1A\r\033[K", end=""
+            mock_write.assert_called_once_with(
+                "Has to be at least 1.3.\033[K\033[1A\r\033[K"
             )
 
     def test_min_value_float_equal(self):
@@ -54,13 +54,13 @@ class TestCutieGetNumber(unittest.TestCase):
         with mock.patch("cutie.input", return_value="1.3"):
             self.assertEqual(cutie.get_number("foo", min_value=1.2), 1.3)
 
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_min_value_int_too_low(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_min_value_int_too_low(self, mock_write):
         with mock.patch("cutie.input", return_value="1"):
             with self.assertRaises(MockException):
                 cutie.get_number("foo", min_value=2)
-            mock_print.assert_called_once_with(
-                "Has to be at least 2.\033[K\033[1A\r\033[K", end=""
+            mock_write.assert_called_once_with(
+                "Has to be at least 2.\033[K\033[1A\r\033[K"
             )
 
     def test_min_value_int_equal(self):
@@ -71,14 +71,12 @@ class TestCutieGetNumber(unittest.TestCase):
         with mock.patch("cutie.input", return_value="2"):
             self.assertEqual(cutie.get_number("foo", min_value=1), 2)
 
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_max_value_float_too_high(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_max_value_float_too_high(self, mock_write):
         with mock.patch("cutie.input", return_value="1.2"):
             with self.assertRaises(MockException):
                 cutie.get_number("foo", max_value=1.1)
-            mock_print.assert_called_once_with(
-                "Has to be at most 1.1.\033[1A\r\033[K", end=""
-            )
+            mock_write.assert_called_once_with("Has to be at most 1.1.\033[1A\r\033[K")
 
     def test_max_value_float_equal(self):
         with mock.patch("cutie.input", return_value="1.1"):
@@ -88,14 +86,12 @@ class TestCutieGetNumber(unittest.TestCase):
         with mock.patch("cutie.input", return_value="1.1"):
             self.assertEqual(cutie.get_number("foo", max_value=1.2), 1.1)
 
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_max_value_int_too_high(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_max_value_int_too_high(self, mock_write):
         with mock.patch("cutie.input", return_value="2"):
             with self.assertRaises(MockException):
                 cutie.get_number("foo", max_value=1)
-            mock_print.assert_called_once_with(
-                "Has to be at most 1.\033[1A\r\033[K", end=""
-            )
+            mock_write.assert_called_once_with("Has to be at most 1.\033[1A\r\033[K")
 
     def test_max_value_int_equal(self):
         with mock.patch("cutie.input", return_value="1"):
@@ -105,8 +101,8 @@ class TestCutieGetNumber(unittest.TestCase):
         with mock.patch("cutie.input", return_value="1"):
             self.assertEqual(cutie.get_number("foo", max_value=2), 1)
 
-    @mock.patch("cutie.print")
-    def test_print_finalize(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_finalize(self, mock_write):
         with mock.patch("cutie.input", return_value="1"):
             cutie.get_number("foo")
-        mock_print.assert_called_once_with("\033[K", end="")
+        mock_write.assert_called_once_with("\033[K")
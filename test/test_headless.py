@@ -0,0 +1,147 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import readchar
+
+from . import cutie
+
+TREE = {(): ["etc", "usr"], (0,): ["hosts"], (0, 0): [], (1,): []}
+
+
+@mock.patch("cutie.TerminalBackend.write")
+class TestHeadless(unittest.TestCase):
+    def test_select_default(self, mock_write):
+        with cutie.headless():
+            self.assertEqual(cutie.select(["foo", "bar"], selected_index=1), 1)
+        mock_write.assert_not_called()
+
+    def test_select_answers(self, mock_write):
+        with cutie.headless({"target": "bar", "index": 2}):
+            self.assertEqual(cutie.select(["foo", "bar"], answer_key="target"), 1)
+            self.assertEqual(
+                cutie.select(iter(["foo", "bar", "baz"]), answer_key="index"), 2
+            )
+
+    def test_select_invalid_answers(self, mock_write):
+        with cutie.headless({"caption": 0, "missing": "qux", "bool": True}):
+            for key in ("caption", "missing", "bool"):
+                with self.assertRaises(ValueError):
+                    cutie.select(["foo", "bar"], caption_indices=[0], answer_key=key)
+
+    def test_select_default_is_caption(self, mock_write):
+        with cutie.headless():
+            with self.assertRaises(cutie.MissingAnswerError):
+                cutie.select(["foo", "bar"], caption_indices=[0])
+
+    def test_select_multiple(self, mock_write):
+        with cutie.headless({"hosts": ["bar", 0, "bar"]}):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar"], answer_key="hosts"), [1, 0]
+            )
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar"], ticked_indices=[1]), [1]
+            )
+        mock_write.assert_not_called()
+
+    def test_select_multiple_counts(self, mock_write):
+        with cutie.headless({"hosts": ["foo"]}):
+            with self.assertRaises(ValueError):
+                cutie.select_multiple(
+                    ["foo", "bar"], minimal_count=2, answer_key="hosts"
+                )
+            with self.assertRaises(cutie.MissingAnswerError):
+                cutie.select_multiple(["foo", "bar"], minimal_count=1)
+
+    def test_prompt_yes_or_no(self, mock_write):
+        answers = {"Deploy?": "yes", "Delete?": False, "Really?": "maybe"}
+        with cutie.headless(answers):
+            self.assertTrue(cutie.prompt_yes_or_no("Deploy?"))
+            self.assertFalse(cutie.prompt_yes_or_no("Delete?"))
+            self.assertTrue(cutie.prompt_yes_or_no("Other?", default_is_yes=True))
+            with self.assertRaises(ValueError):
+                cutie.prompt_yes_or_no("Really?")
+            with self.assertRaises(cutie.MissingAnswerError):
+                cutie.prompt_yes_or_no("Other?", enter_empty_confirms=False)
+
+    def test_select_tree(self, mock_write):
+        def children(path):
+            return TREE[tuple(path)]
+
+        with cutie.headless({"leaf": ["etc", 0], "branch": [0]}):
+            self.assertEqual(
+                cutie.select_tree(TREE[()], children, answer_key="leaf"), [0, 0]
+            )
+            with self.assertRaises(ValueError):
+                cutie.select_tree(TREE[()], children, answer_key="branch")
+            self.assertEqual(
+                cutie.select_tree(
+                    TREE[()], children, branches_selectable=True, answer_key="branch"
+                ),
+                [0],
+            )
+            with self.assertRaises(cutie.MissingAnswerError):
+                cutie.select_tree(TREE[()], children)
+
+    def test_get_number(self, mock_write):
+        with cutie.headless({"Port?": "8080", "Ratio?": 0.5, "count": 3}):
+            self.assertEqual(cutie.get_number("Port?", allow_float=False), 8080)
+            self.assertEqual(cutie.get_number("Ratio?"), 0.5)
+            self.assertEqual(cutie.get_number("How many?", answer_key="count"), 3)
+            with self.assertRaises(ValueError):
+                cutie.get_number("Port?", max_value=1024)
+            with self.assertRaises(cutie.MissingAnswerError):
+                cutie.get_number("Other?")
+
+    def test_secure_input(self, mock_write):
+        with cutie.headless({"Password:": "hunter2"}):
+            self.assertEqual(cutie.secure_input("Password:"), "hunter2")
+            with self.assertRaises(cutie.MissingAnswerError):
+                cutie.secure_input("Token:")
+
+    def test_error_names_keys(self, mock_write):
+        with cutie.headless():
+            with self.assertRaisesRegex(cutie.MissingAnswerError, "'deploy'"):
+                cutie.secure_input("Password:", answer_key="deploy")
+
+    def test_async(self, mock_write):
+        with cutie.headless({"Deploy?": True}):
+            self.assertTrue(asyncio.run(cutie.prompt_yes_or_no_async("Deploy?")))
+
+    def test_backend_is_not_headless(self, mock_write):
+        terminal = cutie.VirtualTerminal()
+        terminal.press(readchar.key.ENTER)
+        with cutie.headless():
+            self.assertEqual(cutie.select(["foo", "bar"], backend=terminal), 0)
+
+
+@mock.patch("cutie.TerminalBackend.write")
+class TestHeadlessEnvironment(unittest.TestCase):
+    def setUp(self):
+        file = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        with file:
+            json.dump({"Deploy?": "no"}, file)
+        self.addCleanup(os.remove, file.name)
+        self.path = file.name
+
+    def test_answers_file(self, mock_write):
+        with cutie.headless(self.path):
+            self.assertFalse(cutie.prompt_yes_or_no("Deploy?"))
+
+    def test_no_terminal(self, mock_write):
+        environment = {"CUTIE_HEADLESS": "", "CUTIE_ANSWERS": self.path}
+        with mock.patch.dict(os.environ, environment):
+            with mock.patch("sys.stdin", io.StringIO()):
+                self.assertFalse(cutie.prompt_yes_or_no("Deploy?"))
+        mock_write.assert_not_called()
+
+    def test_forced(self, mock_write):
+        stdin = mock.Mock(**{"isatty.return_value": True})
+        environment = {"CUTIE_HEADLESS": "1", "CUTIE_ANSWERS": self.path}
+        with mock.patch.dict(os.environ, environment):
+            with mock.patch("sys.stdin", stdin):
+                self.assertFalse(cutie.prompt_yes_or_no("Deploy?"))
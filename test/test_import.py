@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import unittest
+
+import readchar
+
+from . import cutie
+
+CHECK_LAZY = """
+import sys
+import cutie
+print(
+    not any(
+        name in sys.modules
+        for name in [
+            "colorama",
+            "multiprocessing",
+            "multiprocessing.connection",
+            "readchar",
+        ]
+    )
+)
+print(
+    not any(
+        name in sys.modules
+        for name in ["asyncio", "concurrent.futures", "json", "queue"]
+    )
+)
+print(sys.stdout is sys.__stdout__)
+"""
+
+
+ASK_FROM_THREADS = """
+import threading
+import cutie
+broker = cutie.PromptBroker(cutie.VirtualTerminal())
+barrier = threading.Barrier(8)
+errors = []
+def ask():
+    barrier.wait()
+    try:
+        broker.ask(cutie.select, ["foo"])
+    except Exception as error:
+        errors.append(error)
+threads = [threading.Thread(target=ask) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+import concurrent.futures
+print(errors, concurrent.futures.ThreadPoolExecutor.__name__)
+"""
+
+
+class TestImport(unittest.TestCase):
+    def test_dependencies_load_on_first_use(self):
+        output = subprocess.run(
+            [sys.executable, "-c", CHECK_LAZY],
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+            cwd=os.path.dirname(os.path.abspath(cutie.__file__)),
+        ).stdout
+        self.assertEqual(output.split(), ["True", "True", "True"])
+
+    def test_broker_asked_from_threads_first(self):
+        output = subprocess.run(
+            [sys.executable, "-c", ASK_FROM_THREADS],
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+            cwd=os.path.dirname(os.path.abspath(cutie.__file__)),
+        ).stdout
+        self.assertEqual(output.split(), ["[]", "ThreadPoolExecutor"])
+
+    def test_default_keys(self):
+        self.assertEqual(cutie.DefaultKeys.up, [readchar.key.UP, "k"])
+        self.assertIs(cutie.DefaultKeys.up, cutie.DefaultKeys.up)
@@ -0,0 +1,136 @@
+import unittest
+from unittest import mock
+
+import readchar
+
+from . import InputContext, cutie
+
+
+class TestKeymap(unittest.TestCase):
+    def test_defaults(self):
+        keymap = cutie.Keymap()
+        self.assertEqual(keymap.action(readchar.key.UP), "up")
+        self.assertEqual(keymap.action("j"), "down")
+        self.assertEqual(keymap.action(readchar.key.END), "last")
+        self.assertIsNone(keymap.action("x"))
+
+    def test_binding_replaces_default(self):
+        keymap = cutie.Keymap(down=["n"])
+        self.assertEqual(keymap.action("n"), "down")
+        self.assertIsNone(keymap.action("j"))
+        self.assertEqual(keymap.action("k"), "up")
+
+    def test_key_of_several_actions(self):
+        keymap = cutie.Keymap(up=["x"], down=["x"])
+        self.assertEqual(keymap.action("x"), "down")
+
+    def test_binding_overrides_default_of_other_action(self):
+        keymap = cutie.Keymap(up=["j"], select=[readchar.key.ENTER])
+        self.assertEqual(keymap.action("j"), "up")
+        self.assertEqual(keymap.action(readchar.key.ENTER), "select")
+        self.assertEqual(keymap.action(readchar.key.DOWN), "down")
+
+    def test_unknown_action(self):
+        with self.assertRaises(ValueError):
+            cutie.Keymap(jump=["x"])
+
+
+class TestPromptKeymap(unittest.TestCase):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_custom_keys(self, *m):
+        keymap = cutie.Keymap(down=["n"], confirm=["q"])
+        with InputContext("n", "j", "q"):
+            self.assertEqual(cutie.select(["foo", "bar"], keymap=keymap), 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_multiple_custom_keys(self, *m):
+        keymap = cutie.Keymap(select=["t"])
+        with InputContext("t", " ", readchar.key.ENTER):
+            self.assertEqual(cutie.select_multiple(["foo"], keymap=keymap), [0])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_prompt_yes_or_no_custom_keys(self, *m):
+        keymap = cutie.Keymap(up=[readchar.key.TAB])
+        with InputContext(readchar.key.TAB, readchar.key.ENTER):
+            self.assertTrue(cutie.prompt_yes_or_no("foo", keymap=keymap))
+
+
+class TestNavigation(unittest.TestCase):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_last_and_first(self, *m):
+        options = ["foo", "bar", "baz", "qux"]
+        with InputContext(readchar.key.END, readchar.key.ENTER):
+            self.assertEqual(cutie.select(options, caption_indices=[3]), 2)
+        with InputContext(readchar.key.HOME, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select(options, caption_indices=[0], selected_index=2), 1
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_last_loads_lazy_options(self, *m):
+        options = iter(str(i) for i in range(100))
+        with InputContext(readchar.key.END, readchar.key.ENTER):
+            self.assertEqual(cutie.select(options, max_height=5), 99)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_pages(self, *m):
+        options = [str(i) for i in range(20)]
+        with InputContext(
+            readchar.key.PAGE_DOWN,
+            readchar.key.PAGE_DOWN,
+            readchar.key.PAGE_UP,
+            readchar.key.ENTER,
+        ):
+            # Five lines leave three for options between the scroll indicators
+            self.assertEqual(cutie.select(options, max_height=5), 3)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_multiple_last_is_confirm(self, *m):
+        with InputContext(" ", readchar.key.END, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar"], hide_confirm=False), [0]
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filtered_last(self, *m):
+        options = ["foo", "bar", "fob", "baz"]
+        with InputContext("f", readchar.key.END, readchar.key.ENTER):
+            self.assertEqual(cutie.select(options, filterable=True), 2)
+
+
+class TestKeyDecoder(unittest.TestCase):
+    def setUp(self):
+        self.decoder = cutie._KeyDecoder()
+
+    def test_characters(self):
+        self.assertEqual(self.decoder.feed("ab\n"), ["a", "b", "\n"])
+
+    def test_sequences_split_across_reads(self):
+        self.assertEqual(self.decoder.feed("\x1b["), [])
+        self.assertTrue(self.decoder.pending)
+        self.assertEqual(self.decoder.feed("Bx"), [readchar.key.DOWN, "x"])
+        self.assertFalse(self.decoder.pending)
+
+    def test_alternative_sequences(self):
+        self.assertEqual(
+            self.decoder.feed("\x1bOA\x1b[1~\x1b[4~\x1bOF"),
+            [readchar.key.UP, readchar.key.HOME, readchar.key.END, readchar.key.END],
+        )
+
+    def test_modifiers(self):
+        self.assertEqual(
+            self.decoder.feed("\x1b[1;5A\x1b[5;2~"), ["\x1b[1;5A", "\x1b[5;2~"]
+        )
+
+    def test_unknown_control_sequence(self):
+        self.assertEqual(self.decoder.feed("\x1b[99;1zq"), ["\x1b[99;1z", "q"])
+
+    def test_alt_key(self):
+        self.assertEqual(self.decoder.feed("\x1bx"), ["\x1bx"])
+
+    def test_flush(self):
+        self.assertEqual(self.decoder.feed("\x1b"), [])
+        self.assertEqual(self.decoder.flush(), ["\x1b"])
+        self.assertEqual(self.decoder.flush(), [])
+        self.assertEqual(self.decoder.feed("\x1b[1"), [])
+        self.assertEqual(self.decoder.flush(), ["\x1b[1"])
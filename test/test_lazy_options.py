@@ -0,0 +1,53 @@
+import unittest
+
+from . import cutie
+
+
+class TestLazyOptions(unittest.TestCase):
+    def test_fetch_known_length_by_page(self):
+        calls = []
+
+        def fetch(offset, limit):
+            calls.append((offset, limit))
+            return [str(i) for i in range(offset, offset + limit)]
+
+        options = cutie.LazyOptions(fetch, length=25, page_size=10)
+        self.assertTrue(options.complete)
+        self.assertEqual(options.load(0), 25)
+        self.assertEqual(options[24], "24")
+        self.assertEqual(options[3], "3")
+        self.assertEqual(options[21], "21")
+        self.assertEqual(calls, [(20, 5), (0, 10)])
+
+    def test_fetch_unknown_length_in_order(self):
+        calls = []
+
+        def fetch(offset, limit):
+            calls.append((offset, limit))
+            return [str(i) for i in range(offset, min(offset + limit, 25))]
+
+        options = cutie.LazyOptions(fetch, page_size=10)
+        self.assertFalse(options.complete)
+        self.assertEqual(options.load(5), 10)
+        self.assertEqual(options[15], "15")
+        self.assertFalse(options.complete)
+        self.assertEqual(options.load(100), 25)
+        self.assertTrue(options.complete)
+        self.assertEqual(calls, [(0, 10), (10, 10), (20, 10)])
+
+    def test_index_out_of_range(self):
+        options = cutie.LazyOptions.from_iterable(["foo", "bar"])
+        with self.assertRaises(IndexError):
+            options[2]
+
+    def test_from_iterable_takes_pages(self):
+        taken = []
+
+        def generate():
+            for i in range(1000):
+                taken.append(i)
+                yield str(i)
+
+        options = cutie.LazyOptions.from_iterable(generate(), page_size=10)
+        self.assertEqual(options[12], "12")
+        self.assertEqual(len(taken), 20)
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import readchar
+
+from . import InputContext, cutie, written_frames
+
+
+class TestFrameObserver(unittest.TestCase):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_stats_per_frame(self, mock_write):
+        frames = []
+        with InputContext(readchar.key.DOWN, readchar.key.ENTER):
+            cutie.select(["foo", "bar"], on_frame=frames.append)
+        self.assertEqual(len(frames), 2)
+        self.assertEqual([stats.prompt for stats in frames], ["select"] * 2)
+        self.assertEqual([stats.keys for stats in frames], [0, 1])
+        self.assertEqual(
+            [stats.bytes for stats in frames],
+            [len(frame.encode()) for frame in written_frames(mock_write)],
+        )
+        for stats in frames:
+            self.assertGreaterEqual(stats.latency, stats.render_time)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_unchanged_frame(self, *m):
+        frames = []
+        with InputContext(readchar.key.UP, readchar.key.ENTER):
+            cutie.select(["foo", "bar"], on_frame=frames.append)
+        self.assertEqual(frames[1].bytes, 0)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_async(self, *m):
+        frames = []
+        with InputContext("y", readchar.key.ENTER):
+            asyncio.run(cutie.prompt_yes_or_no_async("foo", on_frame=frames.append))
+        self.assertEqual([stats.keys for stats in frames], [0, 1])
+        self.assertEqual(frames[0].prompt, "prompt_yes_or_no")
+
+
+class TestProfile(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "profile.jsonl")
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_profile_appends_json_lines(self, *m):
+        with mock.patch.dict("os.environ", {"CUTIE_PROFILE": self.path}):
+            with InputContext(" ", readchar.key.ENTER):
+                cutie.select_multiple(["foo", "bar"])
+            with InputContext(readchar.key.ENTER):
+                cutie.select(["foo", "bar"])
+        with open(self.path, encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(
+            [record["prompt"] for record in records],
+            ["select_multiple", "select_multiple", "select"],
+        )
+        self.assertEqual(
+            set(records[0]),
+            {"time", "prompt", "render_time", "bytes", "latency", "keys"},
+        )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_profile_and_observer(self, *m):
+        frames = []
+        with mock.patch.dict("os.environ", {"CUTIE_PROFILE": self.path}):
+            with InputContext(readchar.key.ENTER):
+                cutie.select(["foo"], on_frame=frames.append)
+        self.assertEqual(len(frames), 1)
+        self.assertTrue(os.path.exists(self.path))
@@ -1,70 +1,98 @@
+import os
+import random
 import string
 import unittest
 from unittest import mock
 
 import readchar
 
-from . import InputContext, MockException, PrintCall, cutie
+from . import InputContext, MockException, cutie, no_terminal, written_frames
 
-print_call = PrintCall(
-    {
-        "selectable": "\x1b[K\x1b[1m[ ]\x1b[0m ",
-        "selected": "\x1b[K\x1b[1m[\x1b[32;1mx\x1b[0;1m]\x1b[0m ",
-        "caption": "\x1b[K",
-    }
-)
+SELECTABLE = "\x1b[1m[ ]\x1b[0m "
+SELECTED = "\x1b[1m[\x1b[32;1mx\x1b[0;1m]\x1b[0m "
 
 
 class TestSelect(unittest.TestCase):
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_print_list_newlines(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_print_list_newlines(self, mock_write):
         args_list = ["foo", "bar"]
         with self.assertRaises(MockException):
             cutie.select(args_list)
-        mock_print.assert_called_once_with("\n" * (len(args_list) - 1))
+        mock_write.assert_called_once()
+        self.assertTrue(mock_write.call_args[0][0].startswith("\n" * len(args_list)))
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_move_to_first_item(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_frame_at_once(self, mock_write, *m):
+        with self.assertRaises(MockException):
+            cutie.select([str(i) for i in range(1000)], max_height=1000)
+        mock_write.assert_called_once()
+        self.assertEqual(mock_write.call_args[1], {})
+
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_move_to_first_item(self, mock_write, *m):
         args_list = ["foo", "bar"]
         with self.assertRaises(MockException):
             cutie.select(args_list)
-        self.assertEqual(
-            mock_print.call_args_list[1], ((f"\033[{len(args_list) + 1}A",),)
-        )
+        self.assertTrue(written_frames(mock_write)[0].startswith("\n\n\x1b[2A\r"))
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [print_call("foo", "selected"), print_call("bar")]
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{SELECTED}foo"
+            f"\x1b[1B\r\x1b[K{SELECTABLE}bar"
+            "\x1b[1B\r"
+        ]
         with self.assertRaises(MockException):
             cutie.select(args_list)
-        self.assertEqual(mock_print.call_args_list[2:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options_selected_index_set(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_selected_index_set(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [print_call("foo"), print_call("bar", "selected")]
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{SELECTABLE}foo"
+            f"\x1b[1B\r\x1b[K{SELECTED}bar"
+            "\x1b[1B\r"
+        ]
         with self.assertRaises(MockException):
             cutie.select(args_list, selected_index=1)
-        self.assertEqual(mock_print.call_args_list[2:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_non_selectable(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_non_selectable(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [print_call("foo", "selected"), print_call("bar", "caption")]
+        expected_frames = [
+            "\n\n" f"\x1b[2A\r\x1b[K{SELECTED}foo" "\x1b[1B\r\x1b[Kbar" "\x1b[1B\r"
+        ]
         with self.assertRaises(MockException):
             cutie.select(args_list, caption_indices=[1])
-        self.assertEqual(mock_print.call_args_list[2:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options_custom_prefixes(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_custom_prefixes(self, mock_write, *m):
         args_list = ["foo", "bar", "baz"]
-        expected_calls = [(("\x1b[K*foo",),), (("\x1b[K+bar",),), (("\x1b[K$baz",),)]
+        expected_frames = [
+            "\n\n\n"
+            "\x1b[3A\r\x1b[K*foo"
+            "\x1b[1B\r\x1b[K+bar"
+            "\x1b[1B\r\x1b[K$baz"
+            "\x1b[1B\r"
+        ]
         with self.assertRaises(MockException):
             cutie.select(
                 args_list,
@@ -73,10 +101,60 @@ class TestSelect(unittest.TestCase):
                 deselected_prefix="+",
                 caption_prefix="$",
             )
-        self.assertEqual(mock_print.call_args_list[2:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
+
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_windowed(self, mock_write, *m):
+        args_list = ["foo", "bar", "baz", "qux"]
+        expected_frames = [
+            "\n\n\n"
+            "\x1b[3A\r\x1b[K"
+            f"\x1b[1B\r\x1b[K{SELECTED}foo"
+            "\x1b[1B\r\x1b[K\x1b[2m  v 3 more\x1b[0m"
+            "\x1b[1B\r"
+        ]
+        with self.assertRaises(MockException):
+            cutie.select(args_list, max_height=3)
+        self.assertEqual(written_frames(mock_write), expected_frames)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_scroll_windowed(self, mock_write):
+        args_list = ["foo", "bar", "baz", "qux"]
+        expected_frame = (
+            "\x1b[3A\r\x1b[K\x1b[2m  ^ 2 more\x1b[0m"
+            f"\x1b[1B\r\x1b[K{SELECTED}baz"
+            "\x1b[1B\r\x1b[K\x1b[2m  v 1 more\x1b[0m"
+            "\x1b[1B\r"
+        )
+        with InputContext(readchar.key.DOWN, readchar.key.DOWN):
+            with self.assertRaises(MockException):
+                cutie.select(args_list, max_height=3)
+        self.assertEqual(written_frames(mock_write)[-1], expected_frame)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_redraw_changed_lines_only(self, mock_write):
+        args_list = ["foo", "bar", "baz"]
+        expected_frame = (
+            f"\x1b[3A\r\x1b[K{SELECTABLE}foo"
+            f"\x1b[1B\r\x1b[K{SELECTED}bar"
+            "\x1b[2B\r"
+        )
+        with InputContext(readchar.key.DOWN):
+            with self.assertRaises(MockException):
+                cutie.select(args_list)
+        self.assertEqual(written_frames(mock_write)[-1], expected_frame)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_redraw_nothing_unchanged(self, mock_write):
+        with InputContext(readchar.key.UP):
+            with self.assertRaises(MockException):
+                cutie.select(["foo", "bar"])
+        mock_write.assert_called_once()
 
-    @mock.patch("cutie.print")
-    def test_ignore_unrecognized_key(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_ignore_unrecognized_key(self, mock_write):
         exclude = [
             "__builtins__",
             "__cached__",
@@ -96,67 +174,294 @@ class TestSelect(unittest.TestCase):
             getattr(readchar.key, k) for k in dir(readchar.key) if k not in exclude
         ]
         all_keys.extend(string.printable)
-        expected_calls = [
-            (("",),),
-            (("\x1b[2A",),),
-            (("\x1b[K\x1b[1m[\x1b[32;1mx\x1b[0;1m]\x1b[0m foo",),),
-        ]
+        expected_frame = f"\n\x1b[1A\r\x1b[K{SELECTED}foo\x1b[1B\r"
 
         for key in all_keys:
             with InputContext(readchar.key.DOWN, key, readchar.key.ENTER):
                 selindex = cutie.select(["foo"])
                 self.assertEqual(selindex, 0)
-                self.assertEqual(mock_print.call_args_list[:3], expected_calls)
-                mock_print.reset_mock()
+                self.assertEqual(written_frames(mock_write)[0], expected_frame)
+                mock_write.reset_mock()
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_move_up(self, *m):
         with InputContext(readchar.key.UP, readchar.key.ENTER):
             args_list = ["foo", "bar"]
             selindex = cutie.select(args_list, selected_index=1)
             self.assertEqual(selindex, 0)
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_move_up_skip_caption(self, *m):
         with InputContext(readchar.key.UP, readchar.key.ENTER):
             args_list = ["foo", "bar", "baz"]
             selindex = cutie.select(args_list, selected_index=2, caption_indices=[1])
             self.assertEqual(selindex, 0)
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_move_down(self, *m):
         with InputContext(readchar.key.DOWN, readchar.key.ENTER):
             args_list = ["foo", "bar"]
             selindex = cutie.select(args_list)
             self.assertEqual(selindex, 1)
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_move_down_skip_caption(self, *m):
         with InputContext(readchar.key.DOWN, readchar.key.ENTER):
             args_list = ["foo", "bar", "baz"]
             selindex = cutie.select(args_list, caption_indices=[1])
             self.assertEqual(selindex, 2)
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_down_only_captions_below(self, *m):
+        with InputContext(readchar.key.DOWN, readchar.key.ENTER):
+            args_list = ["foo", "bar", "baz"]
+            selindex = cutie.select(args_list, caption_indices=[1, 2])
+            self.assertEqual(selindex, 0)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_up_only_captions_above(self, *m):
+        with InputContext(readchar.key.UP, readchar.key.ENTER):
+            args_list = ["foo", "bar", "baz"]
+            selindex = cutie.select(args_list, selected_index=2, caption_indices=[0, 1])
+            self.assertEqual(selindex, 2)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_iterator_loaded_as_displayed(self, *m):
+        taken = []
+
+        def generate():
+            for i in range(10000):
+                taken.append(i)
+                yield str(i)
+
+        with InputContext(readchar.key.DOWN, readchar.key.ENTER):
+            selindex = cutie.select(generate(), max_height=5)
+            self.assertEqual(selindex, 1)
+        self.assertEqual(len(taken), 100)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_page_fetcher_loads_more_at_end(self, *m):
+        def fetch(offset, limit):
+            return [str(i) for i in range(offset, min(offset + limit, 4))]
+
+        keys = [readchar.key.DOWN] * 5 + [readchar.key.ENTER]
+        with InputContext(*keys):
+            selindex = cutie.select(cutie.LazyOptions(fetch, page_size=2), max_height=2)
+            self.assertEqual(selindex, 3)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_selects_first_match(self, *m):
+        with InputContext("b", "r", readchar.key.ENTER):
+            selindex = cutie.select(["foo", "bar", "baz", "bor"], filterable=True)
+            self.assertEqual(selindex, 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_matches_characters_in_order(self, *m):
+        with InputContext("B", "z", readchar.key.DOWN, readchar.key.ENTER):
+            selindex = cutie.select(["bz", "zb", "foo", "Baz", "buzz"], filterable=True)
+            self.assertEqual(selindex, 3)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_types_navigation_letters(self, *m):
+        with InputContext("k", readchar.key.ENTER):
+            selindex = cutie.select(["foo", "jay", "kay"], filterable=True)
+            self.assertEqual(selindex, 2)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_delete_widens(self, *m):
+        keys = ["b", "z", readchar.key.BACKSPACE, readchar.key.DOWN, readchar.key.ENTER]
+        with InputContext(*keys):
+            selindex = cutie.select(["bar", "baz", "foo"], filterable=True)
+            self.assertEqual(selindex, 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_cleared_keeps_selection(self, *m):
+        keys = ["f", readchar.key.BACKSPACE, readchar.key.DOWN, readchar.key.ENTER]
+        with InputContext(*keys):
+            selindex = cutie.select(["bar", "foo", "baz"], filterable=True)
+            self.assertEqual(selindex, 2)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_skips_captions(self, *m):
+        with InputContext("f", readchar.key.ENTER):
+            selindex = cutie.select(
+                ["foo", "bar", "fizz"], caption_indices=[0], filterable=True
+            )
+            self.assertEqual(selindex, 2)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_without_match_does_not_confirm(self, *m):
+        keys = ["x", readchar.key.ENTER, readchar.key.BACKSPACE, readchar.key.ENTER]
+        with InputContext(*keys):
+            selindex = cutie.select(["foo", "bar"], filterable=True)
+            self.assertEqual(selindex, 0)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_loads_lazy_options(self, *m):
+        keys = ["9", "9", readchar.key.ENTER]
+        with InputContext(*keys):
+            selindex = cutie.select(
+                (str(i) for i in range(1000)), max_height=5, filterable=True
+            )
+            self.assertEqual(selindex, 99)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_filter(self, mock_write, *m):
+        with InputContext("a", readchar.key.ENTER):
+            cutie.select(["foo", "bar"], filterable=True, filter_prefix="/ ")
+        frames = written_frames(mock_write)
+        self.assertEqual(
+            frames[1],
+            "\x1b[3A\r\x1b[K/ a"
+            "\x1b[1B\r\x1b[K" + SELECTED + "bar"
+            "\x1b[1B\r\x1b[K"
+            "\x1b[1B\r",
+        )
+
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch(
+        "cutie.shutil.get_terminal_size", return_value=os.terminal_size((10, 24))
+    )
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_cut_to_terminal_width(self, mock_write, *m):
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{SELECTED}foo b\u2026\x1b[0m"
+            f"\x1b[1B\r\x1b[K{SELECTABLE}\u4e2d\u6587"
+            "\x1b[1B\r"
+        ]
+        with self.assertRaises(MockException):
+            cutie.select(["foo bar", "\u4e2d\u6587"])
+        self.assertEqual(written_frames(mock_write), expected_frames)
+
+    @mock.patch(
+        "cutie.shutil.get_terminal_size", return_value=os.terminal_size((80, 5))
+    )
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_terminal_size_looked_up_once(self, mock_write, mock_size):
+        with InputContext(*[readchar.key.DOWN] * 5, readchar.key.ENTER):
+            self.assertEqual(cutie.select([str(i) for i in range(10)]), 5)
+        self.assertEqual(len(written_frames(mock_write)), 6)
+        mock_size.assert_called_once()
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_fullscreen(self, mock_write):
+        with InputContext(readchar.key.DOWN, readchar.key.ENTER):
+            self.assertEqual(cutie.select(["foo", "bar"], fullscreen=True), 1)
+        self.assertEqual(
+            written_frames(mock_write),
+            [
+                "\x1b[?1049h\x1b[H\x1b[2J"
+                f"\x1b[1;1H\x1b[K{SELECTED}foo"
+                f"\x1b[2;1H\x1b[K{SELECTABLE}bar"
+                "\x1b[3;1H",
+                f"\x1b[1;1H\x1b[K{SELECTABLE}foo"
+                f"\x1b[2;1H\x1b[K{SELECTED}bar"
+                "\x1b[3;1H",
+                "\x1b[?1049l",
+            ],
+        )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_fullscreen_restored_on_interrupt(self, mock_write):
+        with InputContext(readchar.key.CTRL_C):
+            with self.assertRaises(KeyboardInterrupt):
+                cutie.select(["foo"], fullscreen=True)
+        self.assertEqual(written_frames(mock_write)[-1], "\x1b[?1049l")
+
+    @mock.patch("cutie.TerminalBackend.write")
     def test_keyboard_interrupt_ctrl_c_no_input(self, *m):
         with InputContext(readchar.key.CTRL_C):
             with self.assertRaises(KeyboardInterrupt):
                 cutie.select(["foo"])
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_keyboard_interrupt_ctrl_c_selected(self, *m):
         with InputContext(readchar.key.DOWN, readchar.key.CTRL_C):
             with self.assertRaises(KeyboardInterrupt):
                 cutie.select(["foo"], selected_index=0)
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_keyboard_interrupt_ctrl_d_no_input(self, *m):
         with InputContext(readchar.key.CTRL_D):
             with self.assertRaises(KeyboardInterrupt):
                 cutie.select(["foo"])
 
-    @mock.patch("cutie.print")
+    @mock.patch("cutie.TerminalBackend.write")
     def test_keyboard_interrupt_ctrl_d_selected(self, *m):
         with InputContext(readchar.key.DOWN, readchar.key.CTRL_D):
             with self.assertRaises(KeyboardInterrupt):
                 cutie.select(["foo"], selected_index=0)
+
+
+class TestFitLine(unittest.TestCase):
+    def test_short_line_unchanged(self):
+        self.assertEqual(cutie._fit_line("foo", 3), "foo")
+
+    def test_long_line_ellipsized(self):
+        self.assertEqual(cutie._fit_line("foobar", 4), "foo\u2026")
+
+    def test_escape_sequences_take_no_space(self):
+        line = "\x1b[1mfoo\x1b[0m \x1b]8;;url\x07bar\x1b]8;;\x07"
+        self.assertEqual(cutie._fit_line(line, 7), line)
+        self.assertEqual(
+            cutie._fit_line(line, 6), "\x1b[1mfoo\x1b[0m \x1b]8;;url\x07b\u2026\x1b[0m"
+        )
+
+    def test_wide_characters_take_two_columns(self):
+        self.assertEqual(cutie._fit_line("\u4e2d\u6587\u5b57", 5), "\u4e2d\u6587\u2026")
+        self.assertEqual(cutie._fit_line("\u4e2d\u6587\u5b57", 4), "\u4e2d\u2026")
+
+    def test_combining_characters_take_no_space(self):
+        line = "e\u0301" * 3
+        self.assertEqual(cutie._fit_line(line, 3), line)
+
+
+def filter_options(options, captions=()):
+    """Create a filter over a list of options."""
+    return cutie._Filter(cutie._Options(options, set(captions)), set(captions))
+
+
+def contains_in_order(option, query):
+    """Check the way the filter matches, one character after another."""
+    rest = iter(option.lower())
+    return all(character in rest for character in query.lower())
+
+
+class TestFilter(unittest.TestCase):
+    def test_matches_like_reference(self):
+        alphabet = "abcABé中\0"
+        generator = random.Random(0)
+        for _ in range(200):
+            options = [
+                "".join(generator.choices(alphabet, k=generator.randrange(6)))
+                for _ in range(generator.randrange(1, 8))
+            ]
+            captions = {i for i in range(len(options)) if generator.random() < 0.2}
+            search = filter_options(options, captions)
+            for _ in range(6):
+                if search.query and generator.random() < 0.3:
+                    search.pop()
+                else:
+                    search.push(generator.choice(alphabet[:-1]))
+                expected = [
+                    i
+                    for i, option in enumerate(options)
+                    if i not in captions and contains_in_order(option, search.query)
+                ]
+                if not search.query:
+                    expected = None
+                self.assertEqual(search.matches, expected, (options, search.query))
+
+    def test_keys_not_narrowing_keep_matches(self):
+        options = [f"host-{i:03d}.region-{i % 7}" for i in range(1000)]
+        search = filter_options(options)
+        search.push("h")
+        matches = search.matches
+        for character in "ostregion":
+            search.push(character)
+            # Nothing is searched or copied for keys that keep every match
+            self.assertIs(search.matches, matches)
+        search.push("3")
+        self.assertEqual(len(search.matches), 143)
@@ -1,310 +1,507 @@
-import string
 import unittest
 from unittest import mock
 
 import readchar
 
-from . import InputContext, MockException, PrintCall, cutie, yield_input
+from . import InputContext, MockException, cutie, no_terminal, written_frames
 
-print_call = PrintCall(
-    {
-        "selectable": "\x1b[K\x1b[1m( )\x1b[0m ",
-        "selected": "\x1b[K\x1b[1m(\x1b[32mx\x1b[0;1m)\x1b[0m ",
-        "caption": "\x1b[K",
-        "active": "\x1b[K\x1b[32;1m{ }\x1b[0m ",
-        "active-selected": "\x1b[K\x1b[32;1m{x}\x1b[0m ",
-        "confirm": ("\x1b[1m(( confirm ))\x1b[0m \x1b[K", {"end": "", "flush": True}),
-        "confirm-active": (
-            "\x1b[1;32m{{ confirm }}\x1b[0m \x1b[K",
-            {"end": "", "flush": True},
-        ),
-        "no_confirm_line": ("\033[K", {"end": "", "flush": True}),
-    }
-)
+UNTICKED = "\x1b[1m( )\x1b[0m "
+TICKED = "\x1b[1m(\x1b[32mx\x1b[0;1m)\x1b[0m "
+ACTIVE = "\x1b[32;1m{ }\x1b[0m "
+ACTIVE_TICKED = "\x1b[32;1m{x}\x1b[0m "
+CONFIRM = "\x1b[1m(( confirm ))\x1b[0m "
+CONFIRM_ACTIVE = "\x1b[1;32m{{ confirm }}\x1b[0m "
 
-
-PRINT_CALL_END = (("\r\x1b[K",), {"end": "", "flush": True})
+FRAME_END = "\r\x1b[K"
 
 
 class TestSelectMultiplePrint(unittest.TestCase):
-    @mock.patch("cutie.print", side_effect=MockException)
-    def test_list_newlines(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write", side_effect=MockException)
+    def test_list_newlines(self, mock_write):
         args_list = ["foo", "bar"]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list)
-        mock_print.assert_called_once_with("\n" * (len(args_list) - 1))
+        mock_write.assert_called_once()
+        self.assertTrue(mock_write.call_args[0][0].startswith("\n" * len(args_list)))
+
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_frame_at_once(self, mock_write, *m):
+        with self.assertRaises(MockException):
+            cutie.select_multiple([str(i) for i in range(1000)], max_height=1000)
+        mock_write.assert_called_once()
+        self.assertEqual(mock_write.call_args[1], {})
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_move_to_first_item(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_to_first_item(self, mock_write, *m):
         args_list = ["foo", "bar"]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list)
-        self.assertEqual(
-            mock_print.call_args_list[1], ((f"\033[{len(args_list) + 1}A",),)
-        )
+        self.assertTrue(written_frames(mock_write)[0].startswith("\n\n\x1b[2A\r"))
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo", "active"),
-            print_call("bar", "selectable"),
-            print_call(state="confirm"),
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{ACTIVE}foo"
+            f"\x1b[1B\r\x1b[K{UNTICKED}bar"
+            "\x1b[1B\r\x1b[K"
         ]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options_caption_indices(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_caption_indices(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo", "caption"),
-            print_call("bar"),
-            print_call(state="no_confirm_line"),
+        expected_frames = [
+            "\n\n"
+            "\x1b[2A\r\x1b[Kfoo"
+            f"\x1b[1B\r\x1b[K{UNTICKED}bar"
+            "\x1b[1B\r\x1b[K"
         ]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list, caption_indices=[0])
-        self.assertEqual(mock_print.call_args_list[-3:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options_selected(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_selected(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo"),
-            print_call("bar", "active"),
-            print_call(state="no_confirm_line"),
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{UNTICKED}foo"
+            f"\x1b[1B\r\x1b[K{ACTIVE}bar"
+            "\x1b[1B\r\x1b[K"
         ]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list, cursor_index=1)
-        self.assertEqual(mock_print.call_args_list[-3:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options_selected_and_ticked(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_selected_and_ticked(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo", "active-selected"),
-            print_call("bar"),
-            print_call(state="no_confirm_line"),
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{ACTIVE_TICKED}foo"
+            f"\x1b[1B\r\x1b[K{UNTICKED}bar"
+            "\x1b[1B\r\x1b[K"
         ]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list, ticked_indices=[0])
-        self.assertEqual(mock_print.call_args_list[-3:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_options_deselected_unticked(self, mock_print, *m):
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_deselected_unticked(self, mock_write, *m):
         args_list = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo"),
-            print_call("bar"),
-            print_call(state="no_confirm_line"),
+        expected_frames = [
+            "\n\n"
+            f"\x1b[2A\r\x1b[K{UNTICKED}foo"
+            f"\x1b[1B\r\x1b[K{UNTICKED}bar"
+            "\x1b[1B\r\x1b[K"
         ]
         with self.assertRaises(MockException):
             cutie.select_multiple(args_list, cursor_index=2)
-        self.assertEqual(mock_print.call_args_list[-3:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_deselected_confirm(self, mock_print, *m):
-        expected_call = print_call(state="confirm")
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_deselected_confirm(self, mock_write, *m):
         with self.assertRaises(MockException):
             cutie.select_multiple([], cursor_index=1, hide_confirm=False)
-        self.assertEqual(mock_print.call_args_list[-1], expected_call)
+        self.assertEqual(written_frames(mock_write)[-1], f"\r\x1b[K{CONFIRM}")
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_selected_confirm(self, mock_print, *m):
-        expected_call = print_call(state="confirm-active")
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_selected_confirm(self, mock_write, *m):
         with self.assertRaises(MockException):
             cutie.select_multiple([], hide_confirm=False)
-        self.assertEqual(mock_print.call_args_list[-1], expected_call)
+        self.assertEqual(written_frames(mock_write)[-1], f"\r\x1b[K{CONFIRM_ACTIVE}")
 
-    @mock.patch("cutie.readchar.readkey", side_effect=MockException)
-    @mock.patch("cutie.print")
-    def test_print_show_confirm(self, mock_print, *m):
-        expected_calls = [print_call("foo", "active"), print_call(state="confirm")]
+    @no_terminal
+    @mock.patch("readchar.readkey", side_effect=MockException)
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_show_confirm(self, mock_write, *m):
+        expected_frames = [
+            f"\n\x1b[1A\r\x1b[K{ACTIVE}foo\x1b[1B\r\x1b[K{CONFIRM}",
+        ]
         with self.assertRaises(MockException):
             cutie.select_multiple(["foo"], hide_confirm=False)
-        self.assertEqual(mock_print.call_args_list[2:], expected_calls)
+        self.assertEqual(written_frames(mock_write), expected_frames)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_options_windowed(self, mock_write):
+        args_list = ["foo", "bar", "baz", "qux"]
+        expected_frame = (
+            "\x1b[3A\r\x1b[K\x1b[2m  ^ 2 more\x1b[0m"
+            f"\x1b[1B\r\x1b[K{ACTIVE}baz"
+            "\x1b[1B\r\x1b[K\x1b[2m  v 1 more\x1b[0m"
+            "\x1b[1B\r\x1b[K"
+        )
+        with InputContext(readchar.key.DOWN, readchar.key.DOWN):
+            with self.assertRaises(MockException):
+                cutie.select_multiple(args_list, max_height=3)
+        self.assertEqual(written_frames(mock_write)[-1], expected_frame)
 
 
 class TestSelectMultipleMoveAndSelect(unittest.TestCase):
-    @mock.patch("cutie.print")
-    def test_move_up(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_up(self, mock_write):
         call_args = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo", "active"),
-            print_call("bar"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[2A\r\x1b[K{ACTIVE}foo\x1b[1B\r\x1b[K{UNTICKED}bar\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(readchar.key.UP, readchar.key.ENTER):
             cutie.select_multiple(call_args, cursor_index=1)
-        self.assertEqual(mock_print.call_args_list[-4:], expected_calls)
+        self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
 
-    @mock.patch("cutie.print")
-    def test_move_up_skip_caption(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_up_skip_caption(self, mock_write):
         call_args = ["foo", "bar", "baz"]
-        expected_calls = [
-            print_call("foo", "active"),
-            print_call("bar", "caption"),
-            print_call("baz"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[3A\r\x1b[K{ACTIVE}foo\x1b[2B\r\x1b[K{UNTICKED}baz\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(readchar.key.UP, readchar.key.ENTER):
             cutie.select_multiple(call_args, cursor_index=2, caption_indices=[1])
-        self.assertEqual(mock_print.call_args_list[-5:], expected_calls)
+        self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
 
-    @mock.patch("cutie.print")
-    def test_move_down(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_down(self, mock_write):
         call_args = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo"),
-            print_call("bar", "active"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[2A\r\x1b[K{UNTICKED}foo\x1b[1B\r\x1b[K{ACTIVE}bar\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(readchar.key.DOWN, readchar.key.ENTER):
             cutie.select_multiple(call_args)
-        self.assertEqual(mock_print.call_args_list[-4:], expected_calls)
+        self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
 
-    @mock.patch("cutie.print")
-    def test_move_down_skip_caption(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_move_down_skip_caption(self, mock_write):
         call_args = ["foo", "bar", "baz"]
-        expected_calls = [
-            print_call("foo"),
-            print_call("bar", "caption"),
-            print_call("baz", "active"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[3A\r\x1b[K{UNTICKED}foo\x1b[2B\r\x1b[K{ACTIVE}baz\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(readchar.key.DOWN, readchar.key.ENTER):
             cutie.select_multiple(call_args, caption_indices=[1])
-        self.assertEqual(mock_print.call_args_list[-5:], expected_calls)
+        self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
 
-    @mock.patch("cutie.print")
-    def test_select(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select(self, mock_write):
         call_args = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo", "selected"),
-            print_call("bar", "active-selected"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[1A\r\x1b[K{ACTIVE_TICKED}bar\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(" ", readchar.key.DOWN, " ", readchar.key.ENTER):
             selected_indices = cutie.select_multiple(call_args)
-        self.assertEqual(mock_print.call_args_list[-4:], expected_calls)
+        self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
         self.assertEqual(selected_indices, [0, 1])
 
-    @mock.patch("cutie.print")
-    def test_select_min_too_few(self, mock_print):
-        call_args = ["foo"]
-        expected_call = (
-            ("Must select at least 1 options\x1b[K",),
-            {"end": "", "flush": True},
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_keeps_tick_order(self, mock_write):
+        call_args = ["foo", "bar", "baz"]
+        with InputContext(
+            " ", readchar.key.UP, readchar.key.UP, " ", readchar.key.ENTER
+        ):
+            selected_indices = cutie.select_multiple(
+                call_args, cursor_index=2, ticked_indices=[1]
+            )
+        self.assertEqual(selected_indices, [1, 2, 0])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_confirm_after_lazy_options(self, mock_write):
+        keys = [readchar.key.DOWN] * 4 + [" ", readchar.key.DOWN, readchar.key.ENTER]
+        with InputContext(*keys):
+            selected_indices = cutie.select_multiple(
+                cutie.LazyOptions.from_iterable(
+                    ["foo", "bar", "baz", "qux", "quux"], page_size=2
+                ),
+                hide_confirm=False,
+                max_height=3,
+            )
+        self.assertEqual(selected_indices, [4])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_ticks_matches(self, mock_write):
+        call_args = ["foo", "bar", "baz", "boo"]
+        keys = ["b", "a", readchar.key.DOWN, " ", readchar.key.BACKSPACE]
+        keys += [readchar.key.DOWN, readchar.key.DOWN, " ", readchar.key.ENTER]
+        with InputContext(*keys):
+            selected_indices = cutie.select_multiple(call_args, filterable=True)
+        self.assertEqual(selected_indices, [2, 3])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_reaches_confirm(self, mock_write):
+        call_args = ["foo", "bar", "baz"]
+        keys = ["f", " ", readchar.key.DOWN, readchar.key.DOWN, readchar.key.ENTER]
+        with InputContext(*keys):
+            selected_indices = cutie.select_multiple(
+                call_args, filterable=True, hide_confirm=False
+            )
+        self.assertEqual(selected_indices, [0])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_filter_without_match_does_not_tick(self, mock_write):
+        call_args = ["foo", "bar"]
+        with InputContext("x", " ", readchar.key.ENTER):
+            selected_indices = cutie.select_multiple(call_args, filterable=True)
+        self.assertEqual(selected_indices, [])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_filter(self, mock_write):
+        call_args = ["foo", "bar", "baz"]
+        expected_frame = (
+            f"\x1b[4A\r\x1b[K/ z\x1b[1B\r\x1b[K{ACTIVE}baz"
+            f"\x1b[1B\r\x1b[K\x1b[1B\r\x1b[K\x1b[1B\r\x1b[K"
         )
+        with InputContext("z", readchar.key.ENTER):
+            cutie.select_multiple(call_args, filterable=True, filter_prefix="/ ")
+        self.assertEqual(written_frames(mock_write)[1], expected_frame)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_min_too_few(self, mock_write):
+        call_args = ["foo"]
+        expected_frame = "\r\x1b[KMust select at least 1 options"
         with InputContext(readchar.key.DOWN, readchar.key.ENTER):
             with self.assertRaises(MockException):
                 cutie.select_multiple(call_args, minimal_count=1)
-            self.assertEqual(mock_print.call_args_list[-1], expected_call)
+            self.assertEqual(written_frames(mock_write)[-1], expected_frame)
 
-    @mock.patch("cutie.print")
-    def test_select_max_too_many(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_max_too_many(self, mock_write):
         call_args = ["foo"]
-        expected_call = (
-            ("Must select at most 0 options\x1b[K",),
-            {"end": "", "flush": True},
-        )
+        expected_frame = "\r\x1b[KMust select at most 0 options"
         with InputContext(readchar.key.ENTER):
             with self.assertRaises(MockException):
                 cutie.select_multiple(call_args, maximal_count=0, ticked_indices=[0])
-            self.assertEqual(mock_print.call_args_list[-1], expected_call)
+            self.assertEqual(written_frames(mock_write)[-1], expected_frame)
 
-    @mock.patch("cutie.print")
-    def test_select_min_sufficient(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_min_sufficient(self, mock_write):
         call_args = ["foo"]
-        expected_calls = [
-            print_call("foo", "active-selected"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[1A\r\x1b[K{ACTIVE_TICKED}foo\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(" ", readchar.key.ENTER):
             selected_indices = cutie.select_multiple(call_args, minimal_count=1)
-            self.assertEqual(mock_print.call_args_list[-3:], expected_calls)
+            self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
             self.assertEqual(selected_indices, [0])
 
-    @mock.patch("cutie.print")
-    def test_deselect_on_min_sufficient(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_deselect_on_min_sufficient(self, mock_write):
         call_args = ["foo", "bar"]
-        expected_calls = [
-            print_call("foo", "selectable"),
-            print_call("bar", "active-selected"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[2A\r\x1b[K{UNTICKED}foo"
+            f"\x1b[1B\r\x1b[K{ACTIVE_TICKED}bar"
+            "\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(" ", readchar.key.DOWN, readchar.key.ENTER):
             selected_indices = cutie.select_multiple(
                 call_args, minimal_count=1, ticked_indices=[0, 1]
             )
-            self.assertEqual(mock_print.call_args_list[-4:], expected_calls)
+            self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
             self.assertEqual(selected_indices, [1])
 
-    @mock.patch("cutie.print")
-    def test_select_max_okay(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_max_okay(self, mock_write):
         call_args = ["foo"]
-        expected_calls = [
-            print_call("foo", "active-selected"),
-            print_call(state="no_confirm_line"),
-            PRINT_CALL_END,
+        expected_frames = [
+            f"\x1b[1A\r\x1b[K{ACTIVE_TICKED}foo\x1b[1B\r\x1b[K",
+            FRAME_END,
         ]
         with InputContext(" ", readchar.key.ENTER):
             selected_indices = cutie.select_multiple(call_args, maximal_count=1)
-            self.assertEqual(mock_print.call_args_list[-3:], expected_calls)
+            self.assertEqual(written_frames(mock_write)[-2:], expected_frames)
             self.assertEqual(selected_indices, [0])
 
-    @mock.patch("cutie.print")
-    def test_select_min_too_few_hide_confirm(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_min_too_few_hide_confirm(self, mock_write):
         """
         This should prompt the user with an error message
         """
         call_args = ["foo"]
-        expected_call = (
-            ("Must select at least 1 options\x1b[K",),
-            {"end": "", "flush": True},
-        )
+        expected_frame = "\r\x1b[KMust select at least 1 options"
         with InputContext(readchar.key.ENTER):
             with self.assertRaises(MockException):
                 cutie.select_multiple(call_args, minimal_count=1)
-            self.assertEqual(mock_print.call_args_list[-1], expected_call)
+            self.assertEqual(written_frames(mock_write)[-1], expected_frame)
 
-    @mock.patch("cutie.print")
-    def test_select_max_too_many_show_confirm(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_max_too_many_show_confirm(self, mock_write):
         """
         This should prompt the user with an error message
         """
         call_args = ["foo"]
-        expected_call = (
-            ("\x1b[1;32m{{ confirm }}\x1b[0m Must select at most 0 options\x1b[K",),
-            {"end": "", "flush": True},
-        )
+        expected_frame = f"\r\x1b[K{CONFIRM_ACTIVE}Must select at most 0 options"
         with InputContext(readchar.key.DOWN, readchar.key.ENTER):
             with self.assertRaises(MockException):
                 cutie.select_multiple(
                     call_args, maximal_count=0, ticked_indices=[0], hide_confirm=False
                 )
-            self.assertEqual(mock_print.call_args_list[-1], expected_call)
+            self.assertEqual(written_frames(mock_write)[-1], expected_frame)
 
 
 class TestSelectMultipleMisc(unittest.TestCase):
-    @mock.patch("cutie.print")
-    def test_keyboard_interrupt(self, mock_print):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_keyboard_interrupt(self, mock_write):
         call_args = ["foo", "bar"]
         with InputContext(readchar.key.CTRL_C):
             with self.assertRaises(KeyboardInterrupt):
                 cutie.select_multiple(call_args)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_fullscreen(self, mock_write):
+        with InputContext(" ", readchar.key.ENTER):
+            self.assertEqual(cutie.select_multiple(["foo"], fullscreen=True), [0])
+        frames = written_frames(mock_write)
+        self.assertTrue(frames[0].startswith("\x1b[?1049h"))
+        self.assertIn("\x1b[2;1H", frames[0])
+        self.assertEqual(frames[-1], "\x1b[?1049l")
+
+
+SHIFT_DOWN = "\x1b[1;2B"
+SHIFT_UP = "\x1b[1;2A"
+
+
+class TestSelectMultipleBulk(unittest.TestCase):
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_tick_all_in_one_frame(self, mock_write):
+        with InputContext(readchar.key.CTRL_A, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(
+                    ["foo", "bar", "baz"], caption_indices=[1], ticked_indices=[2]
+                ),
+                [2, 0],
+            )
+        self.assertEqual(len(written_frames(mock_write)), 3)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_tick_all_loads_lazy_options(self, *m):
+        with InputContext(readchar.key.CTRL_A, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(iter(["foo", "bar", "baz"]), max_height=1),
+                [0, 1, 2],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_untick_all(self, *m):
+        with InputContext(readchar.key.CTRL_U, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar"], ticked_indices=[0, 1]), []
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_invert(self, *m):
+        with InputContext(readchar.key.CTRL_R, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar", "baz"], ticked_indices=[1]),
+                [0, 2],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_tick_group(self, *m):
+        options = ["A", "foo", "bar", "B", "baz", "qux"]
+        with InputContext(
+            readchar.key.DOWN,
+            readchar.key.DOWN,
+            readchar.key.DOWN,
+            readchar.key.CTRL_G,
+            readchar.key.ENTER,
+        ):
+            self.assertEqual(
+                cutie.select_multiple(options, caption_indices=[0, 3], cursor_index=1),
+                [4, 5],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_tick_group_unticks_full_group(self, *m):
+        options = ["A", "foo", "bar", "B", "baz"]
+        with InputContext(readchar.key.CTRL_G, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(
+                    options,
+                    caption_indices=[0, 3],
+                    cursor_index=1,
+                    ticked_indices=[1, 2, 4],
+                ),
+                [4],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_tick_matches(self, *m):
+        with InputContext("b", readchar.key.CTRL_A, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar", "baz"], filterable=True), [1, 2]
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_range(self, *m):
+        with InputContext(SHIFT_DOWN, SHIFT_DOWN, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar", "baz", "qux"]), [0, 1, 2]
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_range_shrinks(self, *m):
+        with InputContext(
+            SHIFT_DOWN, SHIFT_DOWN, SHIFT_UP, SHIFT_UP, SHIFT_UP, readchar.key.ENTER
+        ):
+            self.assertEqual(
+                cutie.select_multiple(
+                    ["foo", "bar", "baz", "qux"], cursor_index=1, ticked_indices=[2]
+                ),
+                [2, 1, 0],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_range_restarts(self, *m):
+        with InputContext(
+            SHIFT_DOWN,
+            readchar.key.DOWN,
+            readchar.key.DOWN,
+            SHIFT_UP,
+            readchar.key.ENTER,
+        ):
+            self.assertEqual(
+                cutie.select_multiple(["foo", "bar", "baz", "qux", "quux"]),
+                [0, 1, 2, 3],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_bulk_respects_maximal_count(self, mock_write):
+        with InputContext(readchar.key.CTRL_A):
+            with self.assertRaises(MockException):
+                cutie.select_multiple(["foo", "bar", "baz"], maximal_count=2)
+        self.assertIn("Must select at most 2 options", written_frames(mock_write)[-1])
+        self.assertNotIn("(x)", written_frames(mock_write)[-1])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_bulk_respects_minimal_count(self, *m):
+        with InputContext(readchar.key.CTRL_U, readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_multiple(
+                    ["foo", "bar"], ticked_indices=[0, 1], minimal_count=1
+                ),
+                [0, 1],
+            )
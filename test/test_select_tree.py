@@ -0,0 +1,150 @@
+import unittest
+from unittest import mock
+
+import readchar
+
+from . import InputContext, MockException, cutie, written_frames
+
+SELECTABLE = "\x1b[1m[ ]\x1b[0m "
+SELECTED = "\x1b[1m[\x1b[32;1mx\x1b[0;1m]\x1b[0m "
+
+TREE = {
+    (): ["etc", "usr", "README"],
+    (0,): ["hosts", "ssh"],
+    (0, 1): ["config"],
+    (1,): ["bin"],
+    (1, 0): [],
+    (0, 0): [],
+    (0, 1, 0): [],
+    (2,): [],
+}
+
+
+class TestSelectTree(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+
+    def children(self, path):
+        self.loaded.append(path)
+        return TREE[tuple(path)]
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_roots_collapsed(self, mock_write):
+        with InputContext():
+            with self.assertRaises(MockException):
+                cutie.select_tree(TREE[()], self.children)
+        self.assertEqual(
+            written_frames(mock_write),
+            [
+                "\n\n\n"
+                f"\x1b[3A\r\x1b[K{SELECTED}+ etc"
+                f"\x1b[1B\r\x1b[K{SELECTABLE}+ usr"
+                f"\x1b[1B\r\x1b[K{SELECTABLE}+ README"
+                "\x1b[1B\r"
+            ],
+        )
+        self.assertEqual(self.loaded, [])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_expanded(self, mock_write):
+        with InputContext(readchar.key.RIGHT):
+            with self.assertRaises(MockException):
+                cutie.select_tree(TREE[()], self.children)
+        # The block grows, so it is drawn anew
+        self.assertEqual(
+            written_frames(mock_write)[1],
+            "\x1b[3A\r\x1b[J\n\n\n\n\n"
+            f"\x1b[5A\r\x1b[K{SELECTED}- etc"
+            f"\x1b[1B\r\x1b[K{SELECTABLE}  + hosts"
+            f"\x1b[1B\r\x1b[K{SELECTABLE}  + ssh"
+            f"\x1b[1B\r\x1b[K{SELECTABLE}+ usr"
+            f"\x1b[1B\r\x1b[K{SELECTABLE}+ README"
+            "\x1b[1B\r",
+        )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_print_leaf(self, mock_write):
+        with InputContext(readchar.key.END, readchar.key.RIGHT):
+            with self.assertRaises(MockException):
+                cutie.select_tree(TREE[()], self.children)
+        self.assertEqual(
+            written_frames(mock_write)[-1],
+            f"\x1b[1A\r\x1b[K{SELECTED}  README\x1b[1B\r",
+        )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_children_loaded_once_when_expanded(self, *m):
+        with InputContext(
+            readchar.key.DOWN,
+            " ",
+            " ",
+            " ",
+            readchar.key.DOWN,
+            readchar.key.ENTER,
+        ):
+            self.assertEqual(cutie.select_tree(TREE[()], self.children), [1, 0])
+        self.assertEqual(self.loaded, [[1], [1, 0]])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_enter_selects_leaf(self, *m):
+        with InputContext(readchar.key.END, readchar.key.ENTER):
+            self.assertEqual(cutie.select_tree(TREE[()], self.children), [2])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_enter_expands_branch(self, *m):
+        with InputContext(
+            readchar.key.ENTER,
+            readchar.key.DOWN,
+            readchar.key.DOWN,
+            readchar.key.ENTER,
+            readchar.key.RIGHT,
+            readchar.key.ENTER,
+        ):
+            self.assertEqual(cutie.select_tree(TREE[()], self.children), [0, 1, 0])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_branches_selectable(self, *m):
+        with InputContext(readchar.key.ENTER):
+            self.assertEqual(
+                cutie.select_tree(TREE[()], self.children, branches_selectable=True),
+                [0],
+            )
+        self.assertEqual(self.loaded, [])
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_collapse_moves_to_parent(self, *m):
+        with InputContext(
+            readchar.key.RIGHT,
+            readchar.key.RIGHT,
+            readchar.key.DOWN,
+            readchar.key.LEFT,
+            readchar.key.LEFT,
+            readchar.key.DOWN,
+            readchar.key.ENTER,
+        ):
+            self.assertEqual(
+                cutie.select_tree(TREE[()], self.children, branches_selectable=True),
+                [1],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_collapse_hides_descendants(self, *m):
+        with InputContext(
+            readchar.key.RIGHT,
+            readchar.key.END,
+            readchar.key.RIGHT,
+            readchar.key.HOME,
+            " ",
+            readchar.key.END,
+            readchar.key.ENTER,
+        ):
+            self.assertEqual(
+                cutie.select_tree(TREE[()], self.children, branches_selectable=True),
+                [2],
+            )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_keyboard_interrupt(self, *m):
+        with InputContext(readchar.key.CTRL_C):
+            with self.assertRaises(KeyboardInterrupt):
+                cutie.select_tree(TREE[()], self.children)
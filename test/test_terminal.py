@@ -0,0 +1,220 @@
+import asyncio
+import io
+import os
+import signal
+import threading
+import unittest
+from unittest import mock
+
+from . import cutie, written_frames
+
+
+@unittest.skipIf(cutie.termios is None, "requires termios")
+class TestTerminal(unittest.TestCase):
+    def setUp(self):
+        self.master, slave = os.openpty()
+        self.stdin = open(slave, "r")
+        self.addCleanup(os.close, self.master)
+        self.addCleanup(self.stdin.close)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_keys_typed_ahead(self, mock_write):
+        os.write(self.master, b"\x1b[B\x1b[Bj\n")
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.select(["foo", "bar", "baz", "qux"]), 3)
+        # The first frame and the one of the answer
+        self.assertEqual(len(written_frames(mock_write)), 2)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_select_multiple_keys_typed_ahead(self, mock_write):
+        os.write(self.master, b" \x1b[B \n")
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.select_multiple(["foo", "bar"]), [0, 1])
+        self.assertEqual(len(written_frames(mock_write)), 3)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_prompt_yes_or_no_keys_typed_ahead(self, mock_write):
+        os.write(self.master, b"ye\x7fes\n")
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertTrue(cutie.prompt_yes_or_no("foo"))
+        self.assertEqual(len(written_frames(mock_write)), 3)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_application_cursor_keys(self, *m):
+        os.write(self.master, b"\x1bOB\x1bOB\x1bOA\n")
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.select(["foo", "bar", "baz"]), 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_lone_escape_does_not_wait(self, *m):
+        keymap = cutie.Keymap(interrupt=["\x1b"])
+        os.write(self.master, b"\x1b")
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(KeyboardInterrupt):
+                cutie.select(["foo"], keymap=keymap)
+
+    @mock.patch("cutie.shutil.get_terminal_size")
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_relayout_on_resize(self, mock_write, mock_size):
+        mock_size.return_value = os.terminal_size((80, 7))
+
+        def resize():
+            mock_size.return_value = os.terminal_size((6, 5))
+            os.kill(os.getpid(), signal.SIGWINCH)
+
+        resizer = threading.Timer(0.1, resize)
+        enter = threading.Timer(0.3, os.write, (self.master, b"\n"))
+        resizer.start()
+        enter.start()
+        self.addCleanup(resizer.join)
+        self.addCleanup(enter.join)
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.select(["foo", "bar", "baz", "qux", "quux"]), 0)
+        frames = written_frames(mock_write)
+        self.assertEqual(len(frames), 2)
+        # The block of five lines is cleared and three lines are drawn
+        self.assertTrue(frames[1].startswith("\x1b[5A\r\x1b[J\n\n\n\x1b[3A\r"))
+        # Six columns fit the prefix, a letter and the ellipsis
+        self.assertIn("\x1b[0m f\u2026\x1b[0m", frames[1])
+        self.assertEqual(mock_size.call_count, 2)
+        self.assertEqual(signal.getsignal(signal.SIGWINCH), signal.SIG_DFL)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_terminal_restored(self, *m):
+        attributes = cutie.termios.tcgetattr(self.stdin.fileno())
+        os.write(self.master, b"\n")
+        with mock.patch("sys.stdin", self.stdin):
+            cutie.select(["foo"])
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_frame_counts_keys_typed_ahead(self, *m):
+        frames = []
+        os.write(self.master, b"\x1b[Bj\x1b[A")
+        enter = threading.Timer(0.2, os.write, (self.master, b"\n"))
+        enter.start()
+        self.addCleanup(enter.join)
+        with mock.patch("sys.stdin", self.stdin):
+            cutie.select(["foo", "bar", "baz"], on_frame=frames.append)
+        self.assertEqual([stats.keys for stats in frames], [0, 3])
+
+
+@unittest.skipIf(cutie.termios is None, "requires termios")
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.master, slave = os.openpty()
+        self.stdin = open(slave, "r")
+        self.addCleanup(os.close, self.master)
+        self.addCleanup(self.stdin.close)
+        self.attributes = cutie.termios.tcgetattr(slave)
+
+    def echo(self):
+        return bool(
+            cutie.termios.tcgetattr(self.stdin.fileno())[3] & cutie.termios.ECHO
+        )
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_keys_typed_ahead_reach_next_prompt(self, *m):
+        os.write(self.master, b"\x1b[B\n \n")
+        with mock.patch("sys.stdin", self.stdin):
+            with cutie.session():
+                self.assertEqual(cutie.select(["foo", "bar"]), 1)
+                self.assertFalse(self.echo())
+                self.assertEqual(cutie.select_multiple(["foo", "bar"]), [0])
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), self.attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_terminal_restored_on_exception(self, *m):
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(KeyboardInterrupt):
+                with cutie.session():
+                    # Typed in canonical mode it would end the input
+                    os.write(self.master, b"\x04")
+                    cutie.select(["foo", "bar"])
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), self.attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_nested_sessions(self, *m):
+        with mock.patch("sys.stdin", self.stdin):
+            with cutie.session():
+                with cutie.session():
+                    pass
+                self.assertFalse(self.echo())
+        self.assertTrue(self.echo())
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_get_number_reads_line(self, *m):
+        os.write(self.master, b"\n12\n")
+        stdout = io.StringIO()
+        with mock.patch("sys.stdin", self.stdin), mock.patch("sys.stdout", stdout):
+            with cutie.session():
+                cutie.select(["foo"])
+                self.assertEqual(cutie.get_number("foo"), 12)
+                self.assertFalse(self.echo())
+        self.assertEqual(stdout.getvalue(), "foo ")
+
+
+@unittest.skipIf(cutie.termios is None, "requires termios")
+class TestDismissal(unittest.TestCase):
+    def setUp(self):
+        self.master, slave = os.openpty()
+        self.stdin = open(slave, "r")
+        self.addCleanup(os.close, self.master)
+        self.addCleanup(self.stdin.close)
+        self.attributes = cutie.termios.tcgetattr(slave)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_timeout_returns_option_under_cursor(self, *m):
+        os.write(self.master, b"\x1b[B")
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.select(["foo", "bar"], timeout=0.1), 1)
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), self.attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_timeout_without_answer(self, *m):
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(cutie.PromptTimeoutError):
+                cutie.prompt_yes_or_no("foo", enter_empty_confirms=False, timeout=0.1)
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), self.attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_cancel_while_waiting(self, *m):
+        cancel = cutie.CancelToken()
+        timer = threading.Timer(0.1, cancel.cancel)
+        timer.start()
+        self.addCleanup(timer.join)
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(cutie.PromptCancelledError):
+                cutie.select(["foo", "bar"], cancel=cancel)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_keys_before_timeout(self, *m):
+        enter = threading.Timer(0.1, os.write, (self.master, b"\x1b[B\n"))
+        enter.start()
+        self.addCleanup(enter.join)
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.select(["foo", "bar", "baz"], timeout=5), 1)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_get_number_timeout(self, *m):
+        os.write(self.master, b"1")
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(cutie.PromptTimeoutError):
+                cutie.get_number("foo", timeout=0.1)
+        self.assertEqual(cutie.termios.tcgetattr(self.stdin.fileno()), self.attributes)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_get_number_before_timeout(self, *m):
+        os.write(self.master, b"12\n")
+        with mock.patch("sys.stdin", self.stdin):
+            self.assertEqual(cutie.get_number("foo", timeout=5), 12)
+
+    @mock.patch("cutie.TerminalBackend.write")
+    def test_async_cancel(self, *m):
+        cancel = cutie.CancelToken()
+        timer = threading.Timer(0.1, cancel.cancel)
+        timer.start()
+        self.addCleanup(timer.join)
+        with mock.patch("sys.stdin", self.stdin):
+            with self.assertRaises(cutie.PromptCancelledError):
+                asyncio.run(cutie.select_async(["foo"], cancel=cancel))